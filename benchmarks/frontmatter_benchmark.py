@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Frontmatter parsing speed: original regex + yaml.safe_load vs report_frontmatter.
+
+Writes a few thousand entries with the logbook template's header (plus some
+headers that need the YAML fallback) to a temporary folder, parses them both
+ways and checks that the results are identical.
+
+Usage:
+    python benchmarks/frontmatter_benchmark.py --entries 5000
+"""
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "logbook"))
+
+from report_frontmatter import YamlLoader, read_frontmatter
+
+HEADERS = [
+    # template header, handled by the fast parser
+    '---\ntitle: "{title}"\ndate: 2025-01-{day:02d}\nweek: {week}\nauthor: {author}\n'
+    'team: Super Awesome Team\nhours: {hours}\ntags: [circuit-design, testing]\nstatus: completed\n---\n',
+    # unquoted title, integer hours, missing status
+    '---\ntitle: {title}\ndate: 2025-02-{day:02d}\nweek: {week}\nauthor: {author}\nhours: {week}\n---\n',
+    # block list, needs the YAML loader
+    '---\ntitle: "{title}"\ndate: 2025-03-{day:02d}\nweek: {week}\nauthor: {author}\nhours: {hours}\n'
+    'tags:\n  - motors\n  - pid\nstatus: in-progress\n---\n',
+    # invalid YAML
+    '---\ntitle: "{title}\nweek: [{week}\n---\n',
+]
+WORDS = "the motor driver circuit was tested with a 5V supply and the duty cycle measured".split()
+
+
+def write_corpus(folder, count, rng):
+    paths = []
+    for i in range(count):
+        header = rng.choices(HEADERS, weights=[80, 10, 8, 2])[0].format(
+            title=f"Entry {i} {rng.choice(WORDS)}", day=rng.randint(1, 28),
+            week=rng.randint(1, 12), author=rng.choice(["Jane Smith", "Alex Chen"]),
+            hours=round(rng.uniform(0.5, 6), 1))
+        body = "\n".join(" ".join(rng.choices(WORDS, k=12)) for _ in range(rng.randint(20, 400)))
+        path = Path(folder) / f"entry-{i:05d}.md"
+        path.write_text(header + "\n# Notes\n\n" + body + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def original(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+    if match:
+        try:
+            return yaml.safe_load(match.group(1))
+        except yaml.YAMLError:
+            return None
+    return None
+
+
+def timed(parse, paths):
+    start = time.perf_counter()
+    results = [parse(p) for p in paths]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frontmatter parsing benchmark")
+    parser.add_argument("--entries", type=int, default=5000, help="Number of entries (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_corpus(folder, args.entries, random.Random(args.seed))
+        # warm the page cache so both runs read from memory
+        timed(original, paths)
+
+        t_orig, r_orig = timed(original, paths)
+        t_fast, r_fast = timed(read_frontmatter, paths)
+
+    mismatches = sum(1 for a, b in zip(r_orig, r_fast) if a != b)
+    print(f"{args.entries} entries, YAML fallback loader: {YamlLoader.__name__}")
+    print(f"  regex + yaml.safe_load: {t_orig * 1000:8.1f} ms ({t_orig / args.entries * 1e6:6.1f} us/entry)")
+    print(f"  report_frontmatter:     {t_fast * 1000:8.1f} ms ({t_fast / args.entries * 1e6:6.1f} us/entry)")
+    print(f"  speedup: {t_orig / t_fast:.1f}x, mismatched results: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Scaling of the logbook activity report, end to end and per phase.
+
+For each corpus size a synthetic set of repositories is generated (see
+logbook_corpus.py) and graded with LogbookGrader (no cache, no git
+history), then the phases are timed separately over the same files:
+
+    walk         -- listing week folders and entries (find_entries)
+    frontmatter  -- reading and parsing the headers (read_frontmatter)
+    content      -- scanning the bodies (scan_file)
+    render       -- building the markdown report (render_report)
+
+Corpora larger than one repository (weeks x entries per week) are split,
+e.g. 100000 entries with the default 12 x 4 layout are 2084 repositories.
+
+Usage:
+    python benchmarks/grader_benchmark.py --sizes 10,100,1000,10000
+    python benchmarks/grader_benchmark.py --sizes 100000 --keep /tmp/corpus
+"""
+
+import argparse
+import math
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "logbook"))
+
+from logbook_corpus import generate_repo
+from generate_activity_report import LogbookGrader
+from report_frontmatter import read_frontmatter
+from report_scanner import scan_file
+
+PHASES = ["walk", "frontmatter", "content", "render"]
+
+
+def make_corpus(folder, entries, weeks, per_week, rng):
+    """Repositories holding `entries` entries in total; returns their paths."""
+    repo_size = weeks * per_week
+    paths = []
+    for r in range(math.ceil(entries / repo_size)):
+        path = Path(folder) / f"team-{r + 1:05d}"
+        # last repository may have fewer entries
+        generate_repo(path, weeks, per_week, rng, limit=min(repo_size, entries - r * repo_size))
+        paths.append(path)
+    return paths
+
+
+def time_end_to_end(repos):
+    start = time.perf_counter()
+    entries = 0
+    for repo in repos:
+        grader = LogbookGrader(repo, use_git=False)
+        grader.generate_report()
+        entries += grader.stats["total_entries"]
+    return time.perf_counter() - start, entries
+
+
+def time_phases(repos):
+    totals = dict.fromkeys(PHASES, 0.0)
+    files = 0
+    for repo in repos:
+        grader = LogbookGrader(repo, use_git=False)
+        start = time.perf_counter()
+        entries = grader.find_entries() or []
+        totals["walk"] += time.perf_counter() - start
+        files += len(entries)
+
+        start = time.perf_counter()
+        for path in entries:
+            read_frontmatter(path)
+        totals["frontmatter"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in entries:
+            scan_file(path)
+        totals["content"] += time.perf_counter() - start
+
+        # render from real statistics, gathered outside the timed section
+        for path in entries:
+            grader.analyze_entry(path)
+        start = time.perf_counter()
+        grader.render_report()
+        totals["render"] += time.perf_counter() - start
+    return totals, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Activity report scaling benchmark")
+    parser.add_argument("--sizes", default="10,100,1000,10000",
+                        help="Comma-separated total entry counts (default: 10,100,1000,10000)")
+    parser.add_argument("--weeks", type=int, default=12, help="Weeks per repository (default: 12)")
+    parser.add_argument("--entries-per-week", type=int, default=4,
+                        help="Entries per week (default: 4)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--keep", metavar="DIR",
+                        help="Generate the corpora in DIR and keep them (default: temporary folder)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    root = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="logbook-bench-"))
+
+    header = f"{'entries':>8} {'repos':>6} {'total s':>8} {'us/entry':>9}" + \
+        "".join(f" {p + ' s':>14}" for p in PHASES)
+    print(header)
+    print("-" * len(header))
+    try:
+        for size in sizes:
+            folder = root / f"corpus-{size}"
+            if folder.exists():
+                shutil.rmtree(folder)
+            repos = make_corpus(folder, size, args.weeks, args.entries_per_week,
+                                random.Random(args.seed))
+            # first pass warms the page cache
+            time_end_to_end(repos)
+            total, _ = time_end_to_end(repos)
+            phases, files = time_phases(repos)
+            print(f"{files:>8} {len(repos):>6} {total:>8.3f} {total / files * 1e6:>9.1f}" +
+                  "".join(f" {phases[p]:>8.3f} ({phases[p] / total * 100:>3.0f}%)" for p in PHASES),
+                  flush=True)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
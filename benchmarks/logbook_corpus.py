@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Synthetic logbook repositories for testing and benchmarking the activity report.
+
+Each repository gets a logbook/README.md and N week-XX folders with M
+entries each. Entries follow the logbook template with varied content
+(sections, calculations, images, code, tables) and lengths, and a share of
+them have the frontmatter problems the grader reports: missing fields,
+invalid hours, broken YAML or no header at all.
+
+Usage:
+    python benchmarks/logbook_corpus.py OUT_DIR --repos 20 --weeks 12 --entries-per-week 4
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+TOPICS = [
+    "motor driver", "voltage regulator", "line following", "ultrasonic sensor",
+    "servo calibration", "PID tuning", "camera mount", "battery pack",
+    "grayscale sensor", "object detection", "chassis assembly", "PWM timing",
+]
+WORDS = (
+    "the circuit was tested with a supply and the output measured on the scope "
+    "we adjusted the gain after the motor stalled under load then logged results "
+    "next step is to verify the wiring against the schematic and repeat the test"
+).split()
+AUTHORS = ["Jane Smith", "Alex Chen", "Sam Patel", "Riley Jones"]
+STATUSES = ["completed", "in-progress", "blocked"]
+SEMESTER_START = date(2025, 1, 6)
+
+# share of entries with each frontmatter problem
+FRONTMATTER_PROBLEMS = [
+    ("valid", 0.85),
+    ("missing_fields", 0.05),
+    ("invalid_hours", 0.03),
+    ("block_list", 0.03),
+    ("broken_yaml", 0.02),
+    ("no_header", 0.02),
+]
+
+
+def paragraph(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def frontmatter(rng, title, day, week, author):
+    kind = rng.choices([k for k, _ in FRONTMATTER_PROBLEMS], [w for _, w in FRONTMATTER_PROBLEMS])[0]
+    hours = round(rng.uniform(0.5, 5.0) * 2) / 2
+    status = rng.choice(STATUSES)
+    if kind == "no_header":
+        return ""
+    if kind == "broken_yaml":
+        return f'---\ntitle: "{title}\nweek: [{week}\n---\n\n'
+    if kind == "missing_fields":
+        return f'---\ntitle: "{title}"\ndate: {day}\nhours: {hours}\n---\n\n'
+    if kind == "invalid_hours":
+        hours = "about three"
+    tags = "tags:\n  - lab\n  - testing\n" if kind == "block_list" else "tags: [lab, testing]\n"
+    return (f'---\ntitle: "{title}"\ndate: {day}\nweek: {week}\nauthor: {author}\n'
+            f'team: Synthetic Team\nhours: {hours}\n{tags}status: {status}\n---\n\n')
+
+
+def entry_body(rng, title, words):
+    """Markdown body of roughly `words` words with template-like sections."""
+    parts = [f"# {title}\n", "## 🎯 Objectives\n", paragraph(rng, 20) + "\n"]
+    parts.append("## 📋 Detailed Work Log\n")
+    written = 20
+    session = 1
+    while written < words:
+        n = rng.randint(40, 160)
+        parts.append(f"### Session {session}\n")
+        parts.append(paragraph(rng, n) + "\n")
+        written += n
+        session += 1
+        roll = rng.random()
+        if roll < 0.25:
+            parts.append("**Calculations**:\n\n$$P = (V_{in} - V_{out}) \\times I$$\n")
+        elif roll < 0.35:
+            parts.append(f"Duty cycle: $D = {rng.randint(10, 90)}\\%$\n")
+        elif roll < 0.55:
+            parts.append(f"![Test setup](../../images/week-xx/setup-{session}.jpg)\n")
+        elif roll < 0.65:
+            parts.append('<img src="../../images/scope.png" width="400">\n')
+        elif roll < 0.8:
+            parts.append("```python\npx.forward(30)\ntime.sleep(0.5)\npx.stop()\n```\n")
+        elif roll < 0.9:
+            parts.append("| Voltage | Current |\n|---|---|\n| 5V | 100mA |\n")
+    parts.append("## 💭 Reflection\n")
+    parts.append(paragraph(rng, 30) + "\n")
+    return "\n".join(parts)
+
+
+def entry_words(rng):
+    # most entries a few hundred words, a long tail of very long ones
+    return int(min(rng.lognormvariate(5.7, 0.6), 20000))
+
+
+def generate_repo(path, weeks, entries_per_week, rng, limit=None):
+    """Write one synthetic repository; returns the number of entries."""
+    path = Path(path)
+    logbook = path / "logbook"
+    logbook.mkdir(parents=True, exist_ok=True)
+    (logbook / "README.md").write_text("# Logbook\n", encoding="utf-8")
+    count = 0
+    for week in range(1, weeks + 1):
+        week_dir = logbook / f"week-{week:02d}"
+        week_dir.mkdir(exist_ok=True)
+        for i in range(entries_per_week):
+            if limit is not None and count >= limit:
+                return count
+            day = SEMESTER_START + timedelta(days=7 * (week - 1) + rng.randint(0, 6))
+            topic = rng.choice(TOPICS)
+            title = f"{topic.title()} {['Design', 'Testing', 'Debugging', 'Integration'][i % 4]}"
+            text = frontmatter(rng, title, day, week, rng.choice(AUTHORS)) + \
+                entry_body(rng, title, entry_words(rng))
+            name = f"{day}_{topic.replace(' ', '-')}-{i + 1}.md"
+            (week_dir / name).write_text(text, encoding="utf-8")
+            count += 1
+    return count
+
+
+def generate_corpus(out_dir, repos, weeks, entries_per_week, seed=0):
+    """Write `repos` repositories into out_dir; returns their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for r in range(repos):
+        path = Path(out_dir) / f"team-{r + 1:03d}"
+        generate_repo(path, weeks, entries_per_week, rng)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic logbook repositories")
+    parser.add_argument("out_dir", help="Folder to create the repositories in")
+    parser.add_argument("--repos", type=int, default=10, help="Number of repositories (default: 10)")
+    parser.add_argument("--weeks", type=int, default=12, help="Weeks per repository (default: 12)")
+    parser.add_argument("--entries-per-week", type=int, default=3, help="Entries per week (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.out_dir, args.repos, args.weeks, args.entries_per_week, args.seed)
+    print(f"{len(paths)} repositories with {args.weeks * args.entries_per_week} entries each "
+          f"written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Cost of the utils/metrics.py updates, and of serving a scrape.
+
+Times each update in a tight loop and subtracts the cost of the empty loop.
+Then runs the line-following tick of 05_line_following.py on the simulated
+backend with and without its metrics (loop timer and grayscale read
+histogram), and with a client scraping /metrics as fast as it can, to show
+what the endpoint costs the control loop.
+
+Usage:
+    python benchmarks/metrics_overhead.py --calls 1000000
+"""
+
+import argparse
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sim.picarx import Picarx, SimWorld
+from utils import metrics
+from utils.actuator_coalescer import CoalescingPicarx
+
+PORT = 9119
+
+registry = metrics.Registry()
+bench_counter = registry.counter("bench_total", "Benchmark counter")
+bench_gauge = registry.gauge("bench_value", "Benchmark gauge")
+bench_histogram = registry.histogram("bench_seconds", "Benchmark histogram")
+bench_loop = metrics.LoopTimer("bench", registry)
+
+
+def per_call_ns(func, calls):
+    """Time per call of func() in ns, minus the cost of calling an empty function."""
+    def empty():
+        pass
+
+    def run(f):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            f()
+        return time.perf_counter_ns() - start
+
+    return (run(func) - run(empty)) / calls
+
+
+def use_inc():
+    bench_counter.inc()
+
+
+def use_set():
+    bench_gauge.set(0.1)
+
+
+def use_observe():
+    bench_histogram.observe(0.004)
+
+
+def use_time():
+    with bench_histogram.time():
+        pass
+
+
+UPDATES = [("Counter.inc()", use_inc), ("Gauge.set()", use_set),
+           ("Histogram.observe()", use_observe), ("Histogram.time()", use_time),
+           ("LoopTimer.tick()", bench_loop.tick)]
+
+
+def line_tick(px, loop=None, read_metric=None):
+    # loop body of 05_line_following.py
+    if loop is not None:
+        loop.tick()
+        with read_metric.time():
+            values = px.get_grayscale_data()
+    else:
+        values = px.get_grayscale_data()
+    status = px.get_line_status(values)
+    if status[1] == 1:
+        px.set_dir_servo_angle(0)
+    elif status[0] == 1:
+        px.set_dir_servo_angle(20)
+    else:
+        px.set_dir_servo_angle(-20)
+    px.forward(10)
+
+
+def tick_us(ticks, instrumented):
+    px = CoalescingPicarx(Picarx(world=SimWorld(seed=0)))
+    loop = read_metric = None
+    if instrumented:
+        loop = metrics.LoopTimer("line_following", registry)
+        read_metric = registry.histogram("picarx_sensor_read_seconds", "Sensor read time",
+                                         {"sensor": "grayscale"})
+        registry.register_stats("picarx_coalescer", px.stats)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        line_tick(px, loop, read_metric)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def scrape_loop(stop, scrapes):
+    url = f"http://127.0.0.1:{PORT}/metrics"
+    while not stop.is_set():
+        start = time.perf_counter()
+        with urllib.request.urlopen(url) as response:
+            response.read()
+        scrapes.append(time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--calls", type=int, default=1000000, help="Calls per update (default: 1000000)")
+    parser.add_argument("--ticks", type=int, default=50000, help="Line-following ticks (default: 50000)")
+    args = parser.parse_args()
+
+    for name, func in UPDATES:
+        print(f"{name:22s} {per_call_ns(func, args.calls):6.0f} ns")
+
+    print(f"\n{'line tick, no metrics':34s} {tick_us(args.ticks, False):6.1f} us")
+    print(f"{'line tick, with metrics':34s} {tick_us(args.ticks, True):6.1f} us")
+
+    server = metrics.serve(PORT, registry=registry)
+    if not server.wait_bound(5.0):
+        return
+    stop = threading.Event()
+    scrapes = []
+    scraper = threading.Thread(target=scrape_loop, args=(stop, scrapes), daemon=True)
+    scraper.start()
+    tick = tick_us(args.ticks, True)
+    stop.set()
+    scraper.join()
+    server.shutdown()
+    scrapes.sort()
+    print(f"{'line tick, with metrics, scraped':34s} {tick:6.1f} us "
+          f"({len(scrapes)} scrapes, median {scrapes[len(scrapes) // 2] * 1000:.1f} ms each)")
+    print("\nPrometheus scrapes every 1-15 s; a scrape in a tight loop is the worst case.")
+
+
+if __name__ == "__main__":
+    main()
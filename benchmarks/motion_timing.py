@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Timing accuracy of scripted servo motion: sleep loops versus MotionEngine.
+
+Plays the steering sweep of 01_move.py (0 -> 35 -> -35 -> 0 degrees, one
+degree per 10 ms, 1.4 s scheduled) on the simulated backend, once with the
+original `for angle in range(...)` / time.sleep(0.01) loops and once as a
+Trajectory on a MotionEngine. Each steering write costs --write-cost ms of
+busy time, standing in for the Robot HAT I2C transaction.
+
+For every write, the timing error is how far the written angle is behind
+the schedule, expressed in time (degrees behind / 100 deg/s). Also
+reported: the time from the first to the last write against the 1.4 s
+scheduled.
+
+Usage:
+    python benchmarks/motion_timing.py --write-cost 0.5 --runs 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sim.picarx import Picarx, SimWorld
+from utils.motion import MotionEngine, RAMP, Trajectory
+
+SPEED = 100.0   # degrees/s of the sweep
+SCHEDULED = 1.4
+
+
+def scheduled_angle(t):
+    """Angle of the 01_move.py sweep `t` seconds after its start."""
+    if t < 0.35:
+        return SPEED * t
+    if t < 1.05:
+        return 35 - SPEED * (t - 0.35)
+    return min(0.0, -35 + SPEED * (t - 1.05))
+
+
+class TimedPicarx(Picarx):
+    """Simulated Picarx with a busy-wait per steering write, recording writes."""
+
+    def __init__(self, write_cost):
+        super().__init__(world=SimWorld(stationary=True))
+        self.write_cost = write_cost
+        self.writes = []
+
+    def set_dir_servo_angle(self, value):
+        end = time.perf_counter() + self.write_cost
+        while time.perf_counter() < end:
+            pass
+        self.writes.append((time.perf_counter(), value))
+        super().set_dir_servo_angle(value)
+
+
+def legacy_sweep(px):
+    # the steering part of the original 01_move.py
+    for angle in range(0, 35):
+        px.set_dir_servo_angle(angle)
+        time.sleep(0.01)
+    for angle in range(35, -35, -1):
+        px.set_dir_servo_angle(angle)
+        time.sleep(0.01)
+    for angle in range(-35, 0):
+        px.set_dir_servo_angle(angle)
+        time.sleep(0.01)
+    px.set_dir_servo_angle(0)
+
+
+SWEEP = Trajectory.sequence([
+    (0.0, {"steering": 0}),
+    (0.35, {"steering": 35}, RAMP),
+    (0.70, {"steering": -35}, RAMP),
+    (0.35, {"steering": 0}, RAMP),
+])
+
+
+def engine_sweep(px):
+    engine = MotionEngine(px)
+    engine.start()
+    engine.play(SWEEP).wait()
+    engine.stop()
+
+
+def measure(sweep, write_cost):
+    px = TimedPicarx(write_cost)
+    sweep(px)
+    # the schedule starts with the first write (angle 0)
+    start = px.writes[0][0]
+    elapsed = px.writes[-1][0] - start
+    # a write is behind the schedule by the time the schedule took to
+    # reach the written angle's position, compared with when it was written
+    errors = []
+    for t, angle in px.writes:
+        errors.append(abs(scheduled_angle(t - start) - angle) / SPEED)
+    return elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted motion timing benchmark")
+    parser.add_argument("--write-cost", type=float, default=0.5,
+                        help="Busy time per servo write in ms (default: 0.5)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per method (default: 5)")
+    args = parser.parse_args()
+
+    write_cost = args.write_cost / 1000
+    for name, sweep in [("sleep loops", legacy_sweep), ("motion engine", engine_sweep)]:
+        durations = []
+        errors = []
+        for _ in range(args.runs):
+            elapsed, run_errors = measure(sweep, write_cost)
+            durations.append(elapsed)
+            errors.extend(run_errors)
+        errors.sort()
+        p95 = errors[min(len(errors) - 1, int(0.95 * len(errors)))]
+        print(f"{name:14s} took {sum(durations) / len(durations):.3f} s of {SCHEDULED} s scheduled, "
+              f"schedule error mean {sum(errors) / len(errors) * 1000:5.1f} ms  "
+              f"p95 {p95 * 1000:5.1f} ms  max {errors[-1] * 1000:5.1f} ms "
+              f"({len(errors) // args.runs} writes)")
+
+
+if __name__ == "__main__":
+    main()
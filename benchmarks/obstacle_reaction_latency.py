@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Reaction latency of obstacle avoidance to a change in front of the car.
+
+Compares the original blocking loop of 04_ultrasonic_obstacle_avoidance.py
+(time.sleep inside maneuvers) with the ObstacleAvoider state machine, using
+the simulated backend with the car on a stand. Two scenarios:
+
+    new obstacle  -- car is turning away from an obstacle at 30 cm when a
+                     second one appears at 10 cm; time until it backs up
+    path cleared  -- car is backing up from an obstacle at 10 cm when it is
+                     removed; time until it drives forward again
+
+Usage:
+    python benchmarks/obstacle_reaction_latency.py --trials 10
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sim.picarx import Picarx, SimWorld
+from utils.actuator_coalescer import CoalescingPicarx
+from utils.obstacle_avoidance import ObstacleAvoider
+
+POWER = 50
+SafeDistance = 40
+DangerDistance = 20
+
+
+class ProbePicarx(Picarx):
+    """Simulated Picarx that timestamps the first matching motor command."""
+
+    def __init__(self, world):
+        super().__init__(world=world)
+        self.want = None
+        self.hit = threading.Event()
+        self.hit_time = None
+
+    def arm(self, direction):
+        self.hit.clear()
+        self.want = direction
+
+    def forward(self, speed):
+        if self.want is not None and speed != 0:
+            if (speed > 0) == (self.want == "forward"):
+                self.hit_time = time.perf_counter()
+                self.want = None
+                self.hit.set()
+        super().forward(speed)
+
+
+def legacy_loop(px, running):
+    # loop body of the original example, unchanged
+    while running.is_set():
+        distance = round(px.ultrasonic.read(), 2)
+        if distance >= SafeDistance:
+            px.set_dir_servo_angle(0)
+            px.forward(POWER)
+        elif distance >= DangerDistance:
+            px.set_dir_servo_angle(30)
+            px.forward(POWER)
+            time.sleep(0.1)
+        else:
+            px.set_dir_servo_angle(-30)
+            px.backward(POWER)
+            time.sleep(0.5)
+
+
+def state_machine_loop(px, running):
+    avoider = ObstacleAvoider(CoalescingPicarx(px), power=POWER,
+                              safe_distance=SafeDistance, danger_distance=DangerDistance)
+    while running.is_set():
+        avoider.tick()
+        time.sleep(0.02)
+
+
+def run_trial(loop, scenario, rng):
+    world = SimWorld(stationary=True)
+    px = ProbePicarx(world)
+    world.place_obstacle_ahead(30 if scenario == "new obstacle" else 10)
+
+    running = threading.Event()
+    running.set()
+    thread = threading.Thread(target=loop, args=(px, running), daemon=True)
+    thread.start()
+
+    # change the scene at a random point within the running maneuver
+    time.sleep(rng.uniform(0.3, 0.8))
+    if scenario == "new obstacle":
+        px.arm("backward")
+        start = time.perf_counter()
+        world.place_obstacle_ahead(10)
+    else:
+        px.arm("forward")
+        start = time.perf_counter()
+        world.clear_obstacles()
+
+    reacted = px.hit.wait(2.0)
+    running.clear()
+    thread.join()
+    return (px.hit_time - start) if reacted else None
+
+
+def summarize(latencies):
+    ok = sorted(x * 1000 for x in latencies if x is not None)
+    if not ok:
+        return "no reaction"
+    p95 = ok[min(len(ok) - 1, int(0.95 * len(ok)))]
+    return f"mean {sum(ok) / len(ok):6.1f} ms  p95 {p95:6.1f} ms  max {ok[-1]:6.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Obstacle avoidance reaction latency benchmark")
+    parser.add_argument("--trials", type=int, default=10, help="Trials per scenario (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    loops = [("blocking loop", legacy_loop), ("state machine", state_machine_loop)]
+    for scenario in ("new obstacle", "path cleared"):
+        print(f"{scenario}:")
+        for name, loop in loops:
+            latencies = [run_trial(loop, scenario, rng) for _ in range(args.trials)]
+            print(f"  {name:14s} {summarize(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
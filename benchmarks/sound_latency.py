@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Trigger-to-output latency of the sound bank mixer, without audio hardware.
+
+Loads every clip in sound/, starts a Mixer on a NullSink (paced like a
+sound card with the same buffer as AplaySink), loops the engine sound as
+background music and triggers the horn at random intervals, as key
+presses would. Latency is measured from play() to the time the first
+sample of the clip reaches the (simulated) output.
+
+For comparison, the time robot_hat's Music.sound_play() spends before
+playback can start is dominated by opening and decoding the file, which is
+timed here as well (load_wav of the same clip).
+
+Usage:
+    python benchmarks/sound_latency.py --triggers 200 --block 256
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.sound_bank import BLOCK_FRAMES, BUFFER_TIME, Mixer, NullSink, SoundBank, load_wav
+
+SOUND_DIR = Path(__file__).parent.parent / "sound"
+EFFECT = "car-double-horn"
+MUSIC = "car-start-engine"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sound bank trigger-to-output latency")
+    parser.add_argument("--triggers", type=int, default=200, help="Number of triggers (default: 200)")
+    parser.add_argument("--block", type=int, default=BLOCK_FRAMES,
+                        help=f"Frames per mixed block (default: {BLOCK_FRAMES})")
+    parser.add_argument("--buffer", type=float, default=BUFFER_TIME,
+                        help=f"Sink buffer in seconds (default: {BUFFER_TIME})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bank = SoundBank(SOUND_DIR)
+    print(f"decoded {len(bank.clips)} clips in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    load_wav(SOUND_DIR / f"{EFFECT}.wav")
+    print(f"decoding {EFFECT}.wav on each trigger would take {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    mixer = Mixer(bank, NullSink(buffer=args.buffer), block_frames=args.block)
+    mixer.start()
+    mixer.play(MUSIC, volume=0.3, loop=True)
+    max_voices = 0
+    try:
+        for _ in range(args.triggers):
+            time.sleep(rng.uniform(0.005, 0.05))
+            mixer.play(EFFECT)
+            max_voices = max(max_voices, mixer.active)
+        # let the last trigger reach the output
+        time.sleep(mixer.latency_bound() * 2)
+    finally:
+        mixer.stop()
+
+    stats = mixer.latency_stats()
+    print(f"{stats['triggers']} triggers over looping music, up to {max_voices} voices, "
+          f"{mixer.blocks} blocks of {args.block} frames, {stats['underruns']} underruns")
+    print(f"latency ms: mean {stats['mean'] * 1000:.1f}  p50 {stats['p50'] * 1000:.1f}  "
+          f"p95 {stats['p95'] * 1000:.1f}  max {stats['max'] * 1000:.1f}  "
+          f"(bound {stats['bound'] * 1000:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of every script in examples/ and utils/, against a budget.
+
+Each script runs in a fresh interpreter on the simulated backend (sim/ first
+on the import path), with stdin closed. Measured:
+
+    import     -- time spent in the script's top-level imports
+    modules    -- modules loaded by those imports
+    first tick -- from launching the interpreter to the script's first
+                  actuator command (a Picarx motor or servo write) or first
+                  UDP packet sent, whichever comes first
+
+The script is stopped at its first tick; scripts that never tick (library
+modules, tools waiting for hardware) are reported with their import numbers
+only. Scripts that fail on a module missing on this machine are skipped.
+
+The budget (startup_budget.json next to this file) holds the numbers of a
+known-good run. --check fails when a script needs more modules than its
+budget, or more than BUDGET_SLACK over its budgeted times. Record a new
+budget on the machine the checks run on (the numbers on a Pi are several
+times higher than on a laptop) with --update.
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --check
+    python benchmarks/startup_benchmark.py --update
+"""
+
+# Only what the child side needs is imported here: the child's own start-up
+# is part of every measurement. The parent imports the rest in main().
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIM_DIR = os.path.join(ROOT, "sim")
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+TIMEOUT = 10.0
+RUNS = 5
+# allowed over the budgeted times: relative, plus an absolute allowance (ms)
+# for timer noise on the shortest scripts
+BUDGET_SLACK = 0.25
+BUDGET_SLACK_MS = 15
+# extra modules allowed over the budget, for Python version differences
+MODULE_SLACK = 5
+
+# command-line arguments the scripts need to start without hardware
+SCRIPT_ARGS = {
+    "utils/camera_calibration.py": ["--folder", "{empty_dir}"],
+}
+
+TICK_METHODS = ("set_motor_speed", "set_dir_servo_angle", "set_cam_pan_angle", "set_cam_tilt_angle")
+
+
+def scripts():
+    found = []
+    for folder in ("examples", "utils"):
+        for name in sorted(os.listdir(os.path.join(ROOT, folder))):
+            if name.endswith(".py") and name != "__init__.py":
+                found.append(f"{folder}/{name}")
+    return found
+
+
+# child side
+# ==========================================
+def child(script, launched, result_path, script_args):
+    """Run `script` as __main__ and write its startup numbers to result_path."""
+    import builtins
+    import runpy
+    import signal
+    import socket
+
+    result = {"import_ms": 0.0, "modules": 0, "first_tick_ms": None, "error": None}
+    base_modules = len(sys.modules)
+    real_import = builtins.__import__
+    depth = [0]
+    done = [False]
+
+    def finish():
+        if done[0]:
+            return
+        done[0] = True
+        with open(result_path, "w") as f:
+            json.dump(result, f)
+
+    def tick():
+        if result["first_tick_ms"] is None:
+            result["first_tick_ms"] = (time.monotonic() - launched) * 1000
+            finish()
+            os._exit(0)
+
+    def patch_picarx():
+        picarx = sys.modules.get("picarx")
+        if picarx is None or getattr(picarx, "_startup_patched", False):
+            return
+        picarx._startup_patched = True
+        for name in TICK_METHODS:
+            method = getattr(picarx.Picarx, name)
+
+            def wrapper(self, *args, _method=method, **kwargs):
+                tick()
+                return _method(self, *args, **kwargs)
+            setattr(picarx.Picarx, name, wrapper)
+
+    def timed_import(name, *args, **kwargs):
+        # only the script's own top-level imports are timed, not the
+        # imports they trigger in turn
+        if depth[0]:
+            return real_import(name, *args, **kwargs)
+        depth[0] += 1
+        start = time.perf_counter()
+        try:
+            return real_import(name, *args, **kwargs)
+        finally:
+            result["import_ms"] += (time.perf_counter() - start) * 1000
+            result["modules"] = len(sys.modules) - base_modules
+            depth[0] -= 1
+            patch_picarx()
+
+    real_sendto = socket.socket.sendto
+
+    def sendto(self, *args):
+        tick()
+        return real_sendto(self, *args)
+
+    socket.socket.sendto = sendto
+    signal.signal(signal.SIGTERM, lambda *_: (finish(), os._exit(0)))
+
+    sys.argv = [script] + script_args
+    builtins.__import__ = timed_import
+    try:
+        runpy.run_path(os.path.join(ROOT, script), run_name="__main__")
+    except ModuleNotFoundError as e:
+        result["error"] = f"missing module {e.name}"
+    except SystemExit:
+        pass
+    except BaseException as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        builtins.__import__ = real_import
+    finish()
+    os._exit(0)
+
+
+# parent side
+# ==========================================
+def measure(script, empty_dir):
+    """Startup numbers of one run of `script` in a fresh interpreter."""
+    import subprocess
+    import tempfile
+
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    script_args = [arg.format(empty_dir=empty_dir) for arg in SCRIPT_ARGS.get(script, [])]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SIM_DIR, ROOT]))
+    launched = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--child", script, repr(launched), result_path,
+         json.dumps(script_args)],
+        env=env, cwd=ROOT, stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        process.wait(TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.terminate()
+        try:
+            process.wait(1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    try:
+        with open(result_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"error": "no result (killed before reporting)"}
+    finally:
+        os.unlink(result_path)
+
+
+def measure_all(runs):
+    """{script: result}, times as the median of `runs` runs."""
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as empty_dir:
+        for script in scripts():
+            samples = [measure(script, empty_dir) for _ in range(runs)]
+            errors = [s["error"] for s in samples if s.get("error")]
+            if errors:
+                results[script] = {"error": errors[0]}
+                continue
+            result = {"modules": max(s["modules"] for s in samples)}
+            for key in ("import_ms", "first_tick_ms"):
+                values = sorted(s[key] for s in samples if s[key] is not None)
+                result[key] = round(values[len(values) // 2], 1) if values else None
+            results[script] = result
+    return results
+
+
+def interpreter_ms(runs):
+    """Median time to start and exit a bare interpreter (ms), for reference."""
+    import subprocess
+
+    times = []
+    for _ in range(runs):
+        start = time.monotonic()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append((time.monotonic() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def over_budget(result, budget):
+    """Reasons `result` exceeds `budget`, empty if it is within it."""
+    problems = []
+    if result["modules"] > budget["modules"] + MODULE_SLACK:
+        problems.append(f"{result['modules']} modules, budget {budget['modules']}")
+    for key, label in (("import_ms", "import"), ("first_tick_ms", "first tick")):
+        if result.get(key) is None or budget.get(key) is None:
+            continue
+        limit = budget[key] * (1 + BUDGET_SLACK) + BUDGET_SLACK_MS
+        if result[key] > limit:
+            problems.append(f"{label} {result[key]:.0f} ms, limit {limit:.0f} ms")
+    return problems
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _, _, script, launched, result_path, script_args = sys.argv
+        child(script, float(launched), result_path, json.loads(script_args))
+        return
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Startup time benchmark for examples/ and utils/")
+    parser.add_argument("--runs", type=int, default=RUNS, help=f"Runs per script (default: {RUNS})")
+    parser.add_argument("--check", action="store_true", help="Fail if a script is over its budget")
+    parser.add_argument("--update", action="store_true", help="Write the results to startup_budget.json")
+    args = parser.parse_args()
+
+    budget = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE) as f:
+            budget = json.load(f)
+
+    print(f"bare interpreter: {interpreter_ms(args.runs):.0f} ms\n")
+    print(f"{'script':42s} {'import':>8s} {'modules':>8s} {'first tick':>11s}")
+    results = measure_all(args.runs)
+    failed = []
+    for script, result in results.items():
+        if result.get("error"):
+            print(f"{script:42s} skipped: {result['error']}")
+            continue
+        tick = f"{result['first_tick_ms']:.0f} ms" if result["first_tick_ms"] is not None else "-"
+        line = f"{script:42s} {result['import_ms']:5.0f} ms {result['modules']:8d} {tick:>11s}"
+        if script in budget:
+            problems = over_budget(result, budget[script])
+            if problems:
+                failed.append(script)
+                line += "  OVER BUDGET: " + "; ".join(problems)
+        print(line)
+
+    if args.update:
+        budget.update({script: result for script, result in results.items() if not result.get("error")})
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nbudget written to {BUDGET_FILE}")
+    if args.check:
+        if failed:
+            print(f"\n{len(failed)} script(s) over budget")
+            sys.exit(1)
+        print("\nall scripts within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Key-event-to-actuator-command latency of keyboard teleoperation.
+
+Compares the original loop of 02_keyboard_control.py (blocking readkey,
+sleep(0.5) after each key) with Teleop + KeyReader, on the simulated
+backend. Key events arrive at random intervals like a user tapping keys,
+cycling w, a, s, d so that each one changes the motor or steering
+direction. Latency is the time from the key event until the first motor
+or steering command that moves in the key's direction; events the loop
+never acted on are counted as missed.
+
+Usage:
+    python benchmarks/teleop_latency.py --events 40
+"""
+
+import argparse
+import queue
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sim.picarx import Picarx, SimWorld
+from utils.teleop import CTRL_C, KeyReader, Teleop
+
+KEY_CYCLE = "wasd"
+# channel and direction of the command each key should cause
+EXPECTED = {"w": ("motor", 1), "s": ("motor", -1), "a": ("steering", -1), "d": ("steering", 1)}
+TIMEOUT = 1.5
+
+
+class ProbePicarx(Picarx):
+    """Simulated Picarx that timestamps the first command in an expected direction."""
+
+    def __init__(self, world):
+        super().__init__(world=world)
+        self.last = {"motor": 0, "steering": 0}
+        self.want = None
+        self.hit = threading.Event()
+        self.hit_time = None
+
+    def arm(self, key):
+        self.hit.clear()
+        self.want = EXPECTED[key]
+
+    def _command(self, channel, value):
+        if self.want is not None and self.want[0] == channel:
+            delta = value - self.last[channel]
+            if delta * self.want[1] > 0:
+                self.hit_time = time.perf_counter()
+                self.want = None
+                self.hit.set()
+        self.last[channel] = value
+
+    def forward(self, speed):
+        self._command("motor", speed)
+        super().forward(speed)
+
+    def stop(self):
+        self._command("motor", 0)
+        super().stop()
+
+    def set_dir_servo_angle(self, value):
+        self._command("steering", value)
+        super().set_dir_servo_angle(value)
+
+
+def legacy_loop(px, read_key):
+    # loop body of the original example, camera keys left out
+    while True:
+        key = read_key()
+        if key == CTRL_C:
+            break
+        if 'w' == key:
+            px.set_dir_servo_angle(0)
+            px.forward(80)
+        elif 's' == key:
+            px.set_dir_servo_angle(0)
+            px.backward(80)
+        elif 'a' == key:
+            px.set_dir_servo_angle(-30)
+            px.forward(80)
+        elif 'd' == key:
+            px.set_dir_servo_angle(30)
+            px.forward(80)
+        time.sleep(0.5)
+        px.forward(0)
+
+
+def teleop_loop(px, read_key):
+    teleop = Teleop(px)
+    reader = KeyReader(teleop.key_event, read_key=read_key)
+    reader.start()
+    teleop.run(reader.quit)
+
+
+def run(loop, events, rng):
+    px = ProbePicarx(SimWorld(stationary=True))
+    keys = queue.Queue()
+    thread = threading.Thread(target=loop, args=(px, keys.get), daemon=True)
+    thread.start()
+    time.sleep(0.1)
+
+    latencies = []
+    for i in range(events):
+        time.sleep(rng.uniform(0.1, 0.8))
+        key = KEY_CYCLE[i % len(KEY_CYCLE)]
+        px.arm(key)
+        start = time.perf_counter()
+        keys.put(key)
+        reacted = px.hit.wait(TIMEOUT)
+        latencies.append((px.hit_time - start) if reacted else None)
+    keys.put(CTRL_C)
+    thread.join()
+    return latencies
+
+
+def summarize(latencies):
+    ok = sorted(x * 1000 for x in latencies if x is not None)
+    missed = len(latencies) - len(ok)
+    if not ok:
+        return "no reaction"
+    p95 = ok[min(len(ok) - 1, int(0.95 * len(ok)))]
+    return f"mean {sum(ok) / len(ok):6.1f} ms  p95 {p95:6.1f} ms  max {ok[-1]:6.1f} ms  missed {missed}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyboard teleoperation latency benchmark")
+    parser.add_argument("--events", type=int, default=40, help="Key events per loop (default: 40)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    for name, loop in [("blocking loop", legacy_loop), ("teleop", teleop_loop)]:
+        latencies = run(loop, args.events, random.Random(args.seed))
+        print(f"{name:14s} {summarize(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
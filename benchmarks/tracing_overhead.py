@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cost of the utils/tracing.py primitives, with tracing off and on.
+
+Times each primitive in a tight loop and subtracts the cost of the empty
+loop. Then runs the instrumented tick of 05_line_following.py (grayscale
+read, decision, coalesced actuator writes) on the simulated backend, to
+show the share of a real tick that tracing takes.
+
+Usage:
+    python benchmarks/tracing_overhead.py --calls 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sim.picarx import Picarx, SimWorld
+from utils import tracing
+from utils.actuator_coalescer import CoalescingPicarx
+
+
+def per_call_ns(func, calls):
+    """Time per call of func() in ns, minus the cost of calling an empty function."""
+    def empty():
+        pass
+
+    def run(f):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            f()
+        return time.perf_counter_ns() - start
+
+    return (run(func) - run(empty)) / calls
+
+
+def use_span():
+    with tracing.span("bench.span", "bench"):
+        pass
+
+
+def use_begin_end():
+    tracing.end("bench.span", tracing.begin(), "bench")
+
+
+def use_counter():
+    tracing.counter("bench.counter", 1)
+
+
+@tracing.traced("bench")
+def use_traced():
+    pass
+
+
+PRIMITIVES = [("span()", use_span), ("begin()/end()", use_begin_end),
+              ("counter()", use_counter), ("@traced call", use_traced)]
+
+
+def line_tick(px):
+    # loop body of 05_line_following.py, without the print
+    with tracing.span("grayscale.read", "sensor"):
+        values = px.get_grayscale_data()
+    status = px.get_line_status(values)
+    with tracing.span("line.decide", "control"):
+        if status[1] == 1:
+            px.set_dir_servo_angle(0)
+        elif status[0] == 1:
+            px.set_dir_servo_angle(20)
+        else:
+            px.set_dir_servo_angle(-20)
+        px.forward(10)
+
+
+def tick_us(ticks):
+    px = CoalescingPicarx(Picarx(world=SimWorld(seed=0)))
+    start = time.perf_counter()
+    for _ in range(ticks):
+        line_tick(px)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tracing overhead benchmark")
+    parser.add_argument("--calls", type=int, default=1000000, help="Calls per primitive (default: 1000000)")
+    parser.add_argument("--ticks", type=int, default=50000, help="Line-following ticks (default: 50000)")
+    args = parser.parse_args()
+
+    results = {}
+    for state in ("off", "on"):
+        if state == "on":
+            tracing.enable()
+        results[state] = [per_call_ns(func, args.calls) for _, func in PRIMITIVES]
+        results[state].append(tick_us(args.ticks))
+        tracing.disable()
+
+    print(f"{'':16s} {'tracing off':>12s} {'tracing on':>12s}")
+    for i, (name, _) in enumerate(PRIMITIVES):
+        print(f"{name:16s} {results['off'][i]:9.0f} ns {results['on'][i]:9.0f} ns")
+    print(f"{'line tick':16s} {results['off'][-1]:9.1f} us {results['on'][-1]:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Command latency and fail-safe timing of the UDP teleop channel over loopback.
+
+A sender thread streams commands at 50 Hz, like 10_teleop_udp_client.py,
+and reverses the motor direction at random intervals; the car side runs
+the loop of 09_teleop_udp_car.py on the simulated backend. Measured:
+
+    command latency -- from sending the first packet of a new command to
+                       the first motor command in the new direction
+    stop after loss -- from the last packet before the sender goes silent
+                       to the motors being stopped
+
+Two receive loops are compared: waiting on the socket (receiver.wait, as
+in the example) and polling every tick with sleep(), the way the detection
+receiver is used. Packet loss and reordering can be simulated on the
+sending side.
+
+Usage:
+    python benchmarks/udp_teleop_latency.py --changes 40 --loss 0.05 --reorder 0.05
+"""
+
+import argparse
+import random
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sim.picarx import Picarx, SimWorld
+from utils.actuator_coalescer import CoalescingPicarx
+from utils.teleop import Command
+from utils.teleop_udp import TeleopReceiver, pack_command
+
+RATE = 50
+TICK = 0.02
+SPEED = 60
+SILENCE = 1.0
+
+
+class ProbePicarx(Picarx):
+    """Simulated Picarx that timestamps motor direction changes and stops."""
+
+    def __init__(self, world):
+        super().__init__(world=world)
+        self.want = None
+        self.hit = threading.Event()
+        self.hit_time = None
+
+    def arm(self, sign):
+        """sign: 1/-1 for the next forward/backward command, 0 for the next stop."""
+        self.hit.clear()
+        self.want = sign
+
+    def _check(self, speed):
+        if self.want is None:
+            return
+        if (self.want == 0 and speed == 0) or (self.want != 0 and speed * self.want > 0):
+            self.hit_time = time.perf_counter()
+            self.want = None
+            self.hit.set()
+
+    def forward(self, speed):
+        self._check(speed)
+        super().forward(speed)
+
+    def stop(self):
+        self._check(0)
+        super().stop()
+
+
+class ImpairedSender:
+    """Sends commands at a fixed rate, dropping and reordering packets on request."""
+
+    def __init__(self, addr, loss, reorder, rng):
+        self.addr = addr
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = rng
+        self.command = Command(0, 0, 0, 0)
+        self.silent = False
+        self.changed = None       # set to an Event to timestamp the next packet
+        self.change_time = None
+        self.last_send = None
+        self.running = True
+        self._held = None
+
+    def run(self):
+        seq = 0
+        next_send = time.monotonic()
+        while self.running:
+            if not self.silent:
+                seq += 1
+                data = pack_command(1, seq, self.command)
+                if self.changed is not None:
+                    self.change_time = time.perf_counter()
+                    self.changed.set()
+                    self.changed = None
+                self.last_send = time.perf_counter()
+                if self.rng.random() >= self.loss:
+                    if self._held is None and self.rng.random() < self.reorder:
+                        self._held = data   # goes out after the next packet
+                    else:
+                        self.sock.sendto(data, self.addr)
+                        if self._held is not None:
+                            self.sock.sendto(self._held, self.addr)
+                            self._held = None
+            next_send += 1.0 / RATE
+            time.sleep(max(0.0, next_send - time.monotonic()))
+
+
+def car_loop(receiver, car, running, use_wait):
+    # loop body of 09_teleop_udp_car.py, watchdog left out
+    while running.is_set():
+        if use_wait:
+            receiver.wait(TICK)
+        else:
+            time.sleep(TICK)
+        receiver.update()
+        command = receiver.get_command()
+        if command is None:
+            car.stop()
+            car.set_dir_servo_angle(0)
+        else:
+            car.set_dir_servo_angle(command.steering)
+            car.forward(command.speed)
+        car.flush()
+
+
+def run(use_wait, args, rng):
+    receiver = TeleopReceiver(port=0, host="127.0.0.1")
+    px = ProbePicarx(SimWorld(stationary=True))
+    car = CoalescingPicarx(px)
+    sender = ImpairedSender(receiver.sock.getsockname(), args.loss, args.reorder, rng)
+
+    running = threading.Event()
+    running.set()
+    threads = [threading.Thread(target=car_loop, args=(receiver, car, running, use_wait), daemon=True),
+               threading.Thread(target=sender.run, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    latencies = []
+    sign = 1
+    for _ in range(args.changes):
+        time.sleep(rng.uniform(0.2, 0.6))
+        px.arm(sign)
+        sent = threading.Event()
+        sender.changed = sent
+        sender.command = Command(sign * SPEED, 0, 0, 0)
+        sent.wait()
+        reacted = px.hit.wait(1.0)
+        latencies.append((px.hit_time - sender.change_time) if reacted else None)
+        sign = -sign
+
+    # link goes silent while driving
+    time.sleep(0.2)
+    px.arm(0)
+    sender.silent = True
+    stopped = px.hit.wait(SILENCE)
+    stop_latency = (px.hit_time - sender.last_send) if stopped else None
+
+    sender.running = False
+    running.clear()
+    for thread in threads:
+        thread.join()
+    receiver.sock.close()
+    return latencies, stop_latency, receiver.stats()
+
+
+def summarize(latencies):
+    ok = sorted(x * 1000 for x in latencies if x is not None)
+    missed = len(latencies) - len(ok)
+    if not ok:
+        return "no reaction"
+    p95 = ok[min(len(ok) - 1, int(0.95 * len(ok)))]
+    return f"mean {sum(ok) / len(ok):6.1f} ms  p95 {p95:6.1f} ms  max {ok[-1]:6.1f} ms  missed {missed}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP teleop loopback latency benchmark")
+    parser.add_argument("--changes", type=int, default=40, help="Command changes per loop (default: 40)")
+    parser.add_argument("--loss", type=float, default=0.0, help="Share of packets dropped (default: 0)")
+    parser.add_argument("--reorder", type=float, default=0.0, help="Share of packets delayed by one (default: 0)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    for name, use_wait in [("wait on socket", True), ("poll per tick", False)]:
+        latencies, stop_latency, stats = run(use_wait, args, random.Random(args.seed))
+        stop = f"{stop_latency * 1000:.0f} ms" if stop_latency is not None else "not stopped"
+        print(f"{name:15s} command {summarize(latencies)}")
+        print(f"{'':15s} stop after loss {stop}, packets: %(applied)s applied, "
+              f"%(dropped_old)s out of order dropped, %(dropped_stale)s stale" % stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,49 @@
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.motion import MotionEngine, Trajectory, RAMP
 from picarx import Picarx
 import time
 
+# Each test is a keyframed trajectory, played by a timer thread on an
+# absolute schedule (one degree per 10 ms, as the original loops intended)
+
+DRIVE_TEST = Trajectory.sequence([
+    # test motor
+    (0.5, {"motor": 30, "steering": 0}),
+    # test direction servo
+    (0.35, {"steering": 35}, RAMP),
+    (0.70, {"steering": -35}, RAMP),
+    (0.35, {"steering": 0}, RAMP),
+    (1.0, {"motor": 0}),
+], name="drive test")
+
+CAMERA_TEST = Trajectory.sequence([
+    (0.0, {"pan": 0, "tilt": 0}),
+    # test cam servos
+    (0.35, {"pan": 35}, RAMP),
+    (0.70, {"pan": -35}, RAMP),
+    (0.35, {"pan": 0}, RAMP),
+    (0.35, {"tilt": 35}, RAMP),
+    (0.70, {"tilt": -35}, RAMP),
+    (0.35, {"tilt": 0}, RAMP),
+], name="camera test")
+
 
 if __name__ == "__main__":
+    # init picarx
+    px = Picarx()
+    engine = MotionEngine(px)
+    engine.start()
     try:
-        # init picarx
-        px = Picarx()
-
-        # test motor
-        px.forward(30)
-        time.sleep(0.5)
-        # test direction servo
-        for angle in range(0, 35):
-            px.set_dir_servo_angle(angle)
-            time.sleep(0.01)
-        for angle in range(35, -35, -1):
-            px.set_dir_servo_angle(angle)
-            time.sleep(0.01)
-        for angle in range(-35, 0):
-            px.set_dir_servo_angle(angle)
-            time.sleep(0.01)
-        px.stop()
-        time.sleep(1)
-        # test cam servos
-        for angle in range(0, 35):
-            px.set_cam_pan_angle(angle)
-            time.sleep(0.01)
-        for angle in range(35, -35, -1):
-            px.set_cam_pan_angle(angle)
-            time.sleep(0.01)        
-        for angle in range(-35, 0):
-            px.set_cam_pan_angle(angle)
-            time.sleep(0.01)
-        for angle in range(0, 35):
-            px.set_cam_tilt_angle(angle)
-            time.sleep(0.01)
-        for angle in range(35, -35,-1):
-            px.set_cam_tilt_angle(angle)
-            time.sleep(0.01)        
-        for angle in range(-35, 0):
-            px.set_cam_tilt_angle(angle)
-            time.sleep(0.01)
+        for trajectory in (DRIVE_TEST, CAMERA_TEST):
+            engine.play(trajectory).wait()
+        stats = engine.timing_stats()
+        print(f"{stats['ticks']} ticks, late by {stats['mean_tick_error'] * 1000:.2f} ms on average, "
+              f"{stats['max_tick_error'] * 1000:.2f} ms at most")
     finally:
+        engine.stop()
         px.stop()
         time.sleep(0.2)
-
-
@@ -1,9 +1,15 @@
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import metrics
+from utils.teleop import Teleop, KeyReader
 from picarx import Picarx
 from time import sleep
-import readchar
 
 manual = '''
-Press keys on keyboard to control PiCar-X!
+Hold keys on keyboard to control PiCar-X!
     w: Forward
     a: Turn left
     s: Backward
@@ -12,7 +18,10 @@ Press keys on keyboard to control PiCar-X!
     k: Head down
     j: Turn head left
     l: Turn head right
-    ctrl+c: Press twice to exit the program
+    ctrl+c: Exit the program
+
+The car drives while w/s is held and stops shortly after it is released;
+hold a/d together with w/s to turn while driving.
 '''
 
 def show_info():
@@ -21,59 +30,20 @@ def show_info():
 
 
 if __name__ == "__main__":
+    px = Picarx()
+    # keys are read on their own thread, the motors are commanded 50 times
+    # a second from the held keys, with smoothed speed and steering
+    teleop = Teleop(px, speed=80, steer_angle=30)
+    reader = KeyReader(teleop.key_event)
+    # loop rate and bus writes on http://localhost:9110/metrics
+    metrics.register_stats("picarx_coalescer", teleop.px.stats)
+    metrics.register_stats("picarx_teleop", teleop.stats)
+    metrics.serve()
     try:
-        pan_angle = 0
-        tilt_angle = 0
-        px = Picarx()
         show_info()
-        while True:
-            key = readchar.readkey()
-            key = key.lower()
-            if key in('wsadikjl'): 
-                if 'w' == key:
-                    px.set_dir_servo_angle(0)
-                    px.forward(80)
-                elif 's' == key:
-                    px.set_dir_servo_angle(0)
-                    px.backward(80)
-                elif 'a' == key:
-                    px.set_dir_servo_angle(-30)
-                    px.forward(80)
-                elif 'd' == key:
-                    px.set_dir_servo_angle(30)
-                    px.forward(80)
-                elif 'i' == key:
-                    tilt_angle+=5
-                    if tilt_angle>30:
-                        tilt_angle=30
-                elif 'k' == key:
-                    tilt_angle-=5
-                    if tilt_angle<-30:
-                        tilt_angle=-30
-                elif 'l' == key:
-                    pan_angle+=5
-                    if pan_angle>30:
-                        pan_angle=30
-                elif 'j' == key:
-                    pan_angle-=5
-                    if pan_angle<-30:
-                        pan_angle=-30                 
-
-                px.set_cam_tilt_angle(tilt_angle)
-                px.set_cam_pan_angle(pan_angle)      
-                show_info()                     
-                sleep(0.5)
-                px.forward(0)
-          
-            elif key == readchar.key.CTRL_C:
-                print("\n Quit")
-                break
-
+        reader.start()
+        teleop.run(reader.quit)
+        print("\n Quit")
     finally:
-        px.set_cam_tilt_angle(0)
-        px.set_cam_pan_angle(0)  
-        px.set_dir_servo_angle(0)  
-        px.stop()
+        teleop.shutdown()
         sleep(.2)
-
-
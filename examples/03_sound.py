@@ -1,5 +1,10 @@
-from time import sleep
-from robot_hat import Music, TTS
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.sound_bank import SoundBank, Mixer, AplaySink
+from utils.tts_cache import TTSCache
 import readchar
 from os import geteuid
 import os
@@ -7,57 +12,102 @@ import os
 if geteuid() != 0:
     print(f"\033[0;33m{'The program needs to be run using sudo, otherwise there may be no sound.'}\033[0m")
 
-music = Music()
-tts = TTS()
+try:
+    # the speaker amplifier is switched on by robot_hat's Music(), which
+    # this example no longer uses
+    from robot_hat.utils import enable_speaker
+    enable_speaker()
+except ImportError:
+    pass
 
 manual = '''
 Input key to call the function!
     space: Play sound effect (Car horn)
-    c: Play sound effect with threads
+    c: Play sound effect (Engine start), overlaps with other sounds
     t: Text to speak
+    a: Next taxi announcement
     q: Play/Stop Music
+    l: Show trigger-to-output latency
 '''
 
 # Get the absolute path to the sound folder
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SOUND_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "sound")
-CAR_HORN_PATH = os.path.join(SOUND_DIR, "car-double-horn.wav")
-MUSIC_PATH = os.path.join(SOUND_DIR, "autonomous_in_quackston.mp3")
+# Clips are looked up by file name without extension; every .wav in
+# sound/ is decoded once at startup. For the music, convert the mp3 with
+# e.g. `ffmpeg -i autonomous_in_quackston.mp3 sound/autonomous_in_quackston.wav`
+CAR_HORN = "car-double-horn"
+CAR_START = "car-start-engine"
+MUSIC = "autonomous_in_quackston"
+MUSIC_VOLUME = 0.2
+
+# Phrases rendered at startup (or loaded from the cache in ~/.cache/picarx-tts),
+# so speaking them starts at once
+GREETING = "Hello ducks, I am your autonomous taxi!"
+ANNOUNCEMENTS = [
+    "Please fasten your seatbelt.",
+    "Next stop, the pond.",
+    "We have arrived at your destination.",
+    "Thank you for riding with us!",
+]
+
+bank = SoundBank(SOUND_DIR)
+mixer = Mixer(bank, AplaySink(rate=bank.rate, channels=bank.channels))
+tts = TTSCache(mixer, lang="en-US")
 
 def main():
     print(manual)
 
-    flag_bgm = False
-    music.music_set_volume(20)
-    tts.lang("en-US")
-
-    while True:
-        key = readchar.readkey()
-        key = key.lower()
-        if key == "q":
-            flag_bgm = not flag_bgm
-            if flag_bgm is True:
-                print('Play Music')
-                music.music_play(MUSIC_PATH)
-            else:
-                print('Stop Music')
-                music.music_stop()
-
-        elif key == readchar.key.SPACE:
-            print('Beep beep beep !')
-            music.sound_play(CAR_HORN_PATH)
-            sleep(0.1)
-
-        elif key == "c":
-            print('Beep beep beep !')
-            music.sound_play_threading(CAR_HORN_PATH)
-            sleep(0.1)
-
-        elif key == "t":
-            words = "Hello ducks, I am your autonomous taxi!"
-            print(f'{words}')
-            tts.say(words)
-            sleep(0.1)
+    music = None
+    announcement = 0
+    mixer.start()
+    tts.prewarm([GREETING] + ANNOUNCEMENTS)
+
+    try:
+        while True:
+            key = readchar.readkey()
+            key = key.lower()
+            if key == "q":
+                if music is None:
+                    if MUSIC not in bank:
+                        print(f'No sound/{MUSIC}.wav found')
+                        continue
+                    print('Play Music')
+                    music = mixer.play(MUSIC, volume=MUSIC_VOLUME, loop=True)
+                else:
+                    print('Stop Music')
+                    mixer.stop_voice(music)
+                    music = None
+
+            elif key == readchar.key.SPACE:
+                print('Beep beep beep !')
+                mixer.play(CAR_HORN)
+
+            elif key == "c":
+                print('Vroom !')
+                mixer.play(CAR_START)
+
+            elif key == "t":
+                print(f'{GREETING}')
+                tts.say(GREETING)
+
+            elif key == "a":
+                words = ANNOUNCEMENTS[announcement % len(ANNOUNCEMENTS)]
+                announcement += 1
+                print(f'{words}')
+                tts.say(words)
+
+            elif key == "l":
+                stats = mixer.latency_stats()
+                if "mean" in stats:
+                    print(f"{stats['triggers']} sounds, latency mean {stats['mean'] * 1000:.1f} ms, "
+                          f"max {stats['max'] * 1000:.1f} ms (bound {stats['bound'] * 1000:.1f} ms), "
+                          f"{stats['underruns']} underruns")
+
+            elif key == readchar.key.CTRL_C:
+                break
+    finally:
+        mixer.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,3 +1,11 @@
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import metrics
+from utils.actuator_coalescer import CoalescingPicarx
+from utils.obstacle_avoidance import ObstacleAvoider
 from picarx import Picarx
 import time
 
@@ -5,29 +13,34 @@ POWER = 50
 SafeDistance = 40   # > 40 safe
 DangerDistance = 20 # > 20 && < 40 turn around, 
                     # < 20 backward
+TICK = 0.02         # seconds between distance reads
 
 def main():
     try:
-        px = Picarx()
-        # px = Picarx(ultrasonic_pins=['D2','D3']) # tring, echo
-       
+        px = CoalescingPicarx(Picarx())
+        # px = CoalescingPicarx(Picarx(ultrasonic_pins=['D2','D3'])) # tring, echo
+        avoider = ObstacleAvoider(px, power=POWER,
+                                  safe_distance=SafeDistance,
+                                  danger_distance=DangerDistance)
+
+        # loop rate, read times and bus writes on http://localhost:9110/metrics
+        loop = metrics.LoopTimer("obstacle_avoidance")
+        metrics.register_stats("picarx_coalescer", px.stats)
+        metrics.serve()
+
+        # maneuvers are timed by the state machine, so the distance is
+        # still read every tick while turning or backing up
+        last_state = None
         while True:
-            distance = round(px.ultrasonic.read(), 2)
-            print("distance: ",distance)
-            if distance >= SafeDistance:
-                px.set_dir_servo_angle(0)
-                px.forward(POWER)
-            elif distance >= DangerDistance:
-                px.set_dir_servo_angle(30)
-                px.forward(POWER)
-                time.sleep(0.1)
-            else:
-                px.set_dir_servo_angle(-30)
-                px.backward(POWER)
-                time.sleep(0.5)
+            loop.tick()
+            state = avoider.tick()
+            if state != last_state:
+                print("distance: ", avoider.distance, "->", state)
+                last_state = state
+            time.sleep(TICK)
 
     finally:
-        px.forward(0)
+        px.stop(force=True)
 
 
 if __name__ == "__main__":
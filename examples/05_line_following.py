@@ -12,11 +12,19 @@
         and the background gray value.
 
 '''
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import metrics, tracing
+from utils.actuator_coalescer import CoalescingPicarx
 from picarx import Picarx
 from time import sleep
 
-px = Picarx()
-# px = Picarx(grayscale_pins=['A0', 'A1', 'A2'])
+# Only send steering/motor commands to the Robot HAT when they change
+px = CoalescingPicarx(Picarx())
+# px = CoalescingPicarx(Picarx(grayscale_pins=['A0', 'A1', 'A2']))
 
 # Please run ./calibration/grayscale_calibration.py to Auto calibrate grayscale values
 # or manual modify reference value by follow code
@@ -27,6 +35,12 @@ px_power = 10
 offset = 20
 last_state = "stop"
 
+# loop rate, read times and bus writes on http://localhost:9110/metrics,
+# instead of printing every reading
+loop = metrics.LoopTimer("line_following")
+read_metric = metrics.histogram("picarx_sensor_read_seconds", "Sensor read time", {"sensor": "grayscale"})
+metrics.register_stats("picarx_coalescer", px.stats)
+
 def outHandle():
     global last_state, current_state
     if last_state == 'left':
@@ -36,7 +50,8 @@ def outHandle():
         px.set_dir_servo_angle(30)
         px.backward(10)
     while True:
-        gm_val_list = px.get_grayscale_data()
+        with tracing.span("grayscale.read", "sensor"), read_metric.time():
+            gm_val_list = px.get_grayscale_data()
         gm_state = get_status(gm_val_list)
         print("outHandle gm_val_list: %s, %s"%(gm_val_list, gm_state))
         currentSta = gm_state
@@ -56,27 +71,36 @@ def get_status(val_list):
         return 'left'
 
 if __name__=='__main__':
+    metrics.serve()
+    printed_state = None
     try:
         while True:
-            gm_val_list = px.get_grayscale_data()
+            loop.tick()
+            with tracing.span("grayscale.read", "sensor"), read_metric.time():
+                gm_val_list = px.get_grayscale_data()
             gm_state = get_status(gm_val_list)
-            print("gm_val_list: %s, %s"%(gm_val_list, gm_state))
+            if gm_state != printed_state:
+                # printing every tick slowed the loop down
+                print("gm_val_list: %s, %s"%(gm_val_list, gm_state))
+                printed_state = gm_state
 
             if gm_state != "stop":
                 last_state = gm_state
 
-            if gm_state == 'forward':
-                px.set_dir_servo_angle(0)
-                px.forward(px_power) 
-            elif gm_state == 'left':
-                px.set_dir_servo_angle(offset)
-                px.forward(px_power) 
-            elif gm_state == 'right':
-                px.set_dir_servo_angle(-offset)
-                px.forward(px_power) 
-            else:
+            with tracing.span("line.decide", "control", {"state": gm_state}):
+                if gm_state == 'forward':
+                    px.set_dir_servo_angle(0)
+                    px.forward(px_power) 
+                elif gm_state == 'left':
+                    px.set_dir_servo_angle(offset)
+                    px.forward(px_power) 
+                elif gm_state == 'right':
+                    px.set_dir_servo_angle(-offset)
+                    px.forward(px_power) 
+            if gm_state == 'stop':
                 outHandle()
     finally:
-        px.stop()
+        px.stop(force=True)
         print("stop and exit")
+        print("bus writes: %(writes)s of %(calls)s commands (%(saved)s saved)" % px.stats())
         sleep(0.1)
@@ -3,18 +3,34 @@ from pathlib import Path
 # Add parent directory to path so we can import utils module
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from utils import metrics, tracing
 from utils.detection_receiver import DetectionReceiver
+from utils.actuator_coalescer import CoalescingPicarx
+from utils.watchdog import MotorWatchdog
 from picarx import Picarx
 import time
 import pprint
 
-car = Picarx()
+# Only send steering/motor commands to the Robot HAT when they change
+car = CoalescingPicarx(Picarx())
 detector = DetectionReceiver()
 
 last_print = 0.0
 PRINT_PERIOD = 0.5  # seconds
 
+# Stops the car if this loop stalls, even if it never gets back to car.stop()
+watchdog = MotorWatchdog(car, deadline=0.25, stop=lambda: car.stop(force=True))
+watchdog.start()
+
+# loop rate, detection age and bus writes on http://localhost:9110/metrics
+loop = metrics.LoopTimer("detections")
+metrics.register_stats("picarx_coalescer", car.stats)
+metrics.register_stats("picarx_watchdog", watchdog.stats)
+metrics.serve()
+
 while True:
+    loop.tick()
+    watchdog.feed()
     detector.update()
     detections = detector.get_latest()
 
@@ -25,15 +41,18 @@ while True:
             print("No detections (missing or stale)")
         else:
             pprint.pprint(detections)
+        print("bus writes: %(writes)s of %(calls)s commands (%(saved)s saved)" % car.stats())
+        print("watchdog: %(trips)s trips, last stop latency %(last_stop_latency)s s" % watchdog.stats())
         last_print = now
 
-    if detections is None:
-        car.stop()  # fail-safe
-    else:
-        objects = detections["objects"]
-        if objects:
-            car.set_dir_servo_angle(-10)
+    with tracing.span("detections.decide", "control"):
+        if detections is None:
+            car.stop()  # fail-safe
         else:
-            car.set_dir_servo_angle(0)
+            objects = detections["objects"]
+            if objects:
+                car.set_dir_servo_angle(-10)
+            else:
+                car.set_dir_servo_angle(0)
 
     time.sleep(0.05)
\ No newline at end of file
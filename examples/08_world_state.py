@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import metrics, tracing
+from utils.actuator_coalescer import CoalescingPicarx
+from utils.detection_receiver import DetectionReceiver
+from utils.world_state import WorldStateAggregator
+from utils.watchdog import MotorWatchdog
+from picarx import Picarx
+import time
+
+# Follows the line, stops for obstacles and slows down when ducks are seen,
+# using one world-state snapshot per tick instead of polling each sensor
+
+POWER = 10
+SLOW_POWER = 5
+OFFSET = 20
+STOP_DISTANCE = 20  # cm
+TICK = 0.02         # seconds
+PRINT_PERIOD = 0.5  # seconds
+
+px = CoalescingPicarx(Picarx())
+world = WorldStateAggregator(px, DetectionReceiver(), rate=50)
+watchdog = MotorWatchdog(px, deadline=0.25, stop=lambda: px.stop(force=True))
+
+if __name__ == "__main__":
+    world.start()
+    watchdog.start()
+    # loop rates, read times, detection age and bus writes on http://localhost:9110/metrics
+    loop = metrics.LoopTimer("world_state_control")
+    metrics.register_stats("picarx_coalescer", px.stats)
+    metrics.register_stats("picarx_watchdog", watchdog.stats)
+    metrics.serve()
+    last_print = 0.0
+    try:
+        while True:
+            loop.tick()
+            watchdog.feed()
+            state = world.get()
+
+            now = time.monotonic()
+            if now - last_print > PRINT_PERIOD:
+                print(f"snapshot {state.seq}: grayscale={state.grayscale} "
+                      f"distance={state.distance} ducks={bool(state.detections and state.detections['objects'])} "
+                      f"ages: grayscale={state.grayscale_age} distance={state.distance_age} detections={state.detections_age}")
+                last_print = now
+
+            with tracing.span("world.decide", "control"):
+                if state.line_status is None or state.line_status == [0, 0, 0]:
+                    px.stop()
+                elif state.distance is not None and state.distance < STOP_DISTANCE:
+                    px.stop()
+                else:
+                    power = SLOW_POWER if state.detections and state.detections["objects"] else POWER
+                    if state.line_status[1] == 1:
+                        px.set_dir_servo_angle(0)
+                    elif state.line_status[0] == 1:
+                        px.set_dir_servo_angle(-OFFSET)
+                    else:
+                        px.set_dir_servo_angle(OFFSET)
+                    px.forward(power)
+
+            time.sleep(TICK)
+    finally:
+        watchdog.stop()
+        world.stop()
+        px.stop(force=True)
+        time.sleep(0.1)
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import metrics, tracing
+from utils.teleop_udp import TeleopReceiver, DEFAULT_PORT
+from utils.actuator_coalescer import CoalescingPicarx
+from utils.watchdog import MotorWatchdog
+from picarx import Picarx
+import argparse
+import os
+import time
+
+# Runs on the car: drives from the commands sent by 10_teleop_udp_client.py
+# on another computer, and stops when they stop arriving
+
+TICK = 0.02         # seconds, longest wait between control updates
+PRINT_PERIOD = 2.0  # seconds
+
+# Smooth speed and steering changes, write to the Robot HAT only on change
+car = CoalescingPicarx(Picarx(), slew_rates={"motor": 400, "steering": 300})
+
+# Stops the car if this loop stalls, even if it never gets back to car.stop()
+watchdog = MotorWatchdog(car, deadline=0.25, stop=lambda: car.stop(force=True))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UDP teleoperation, car side")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"UDP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--key", default=os.environ.get("PICARX_TELEOP_KEY"),
+                        help="Shared key the client signs commands with (default: $PICARX_TELEOP_KEY)")
+    parser.add_argument("--peer", action="append",
+                        help="Only accept commands from this IP address (repeatable)")
+    args = parser.parse_args()
+
+    # anyone on the network could drive the car, so only listen beyond this
+    # machine when commands are signed or limited to known addresses
+    host = "0.0.0.0" if args.key or args.peer else "127.0.0.1"
+    receiver = TeleopReceiver(args.port, host, timeout=0.3, key=args.key, peers=args.peer)
+    print(f"Listening for teleop commands on {host}, UDP port {receiver.addr[1]}")
+    if host == "127.0.0.1":
+        print("Set PICARX_TELEOP_KEY (or pass --key / --peer) to accept commands from another computer")
+    watchdog.start()
+    # loop rate, packet counts and bus writes on http://localhost:9110/metrics
+    loop = metrics.LoopTimer("teleop_udp")
+    metrics.register_stats("picarx_teleop_receiver", receiver.stats)
+    metrics.register_stats("picarx_coalescer", car.stats)
+    metrics.register_stats("picarx_watchdog", watchdog.stats)
+    metrics.serve()
+    last_print = 0.0
+    try:
+        while True:
+            loop.tick()
+            watchdog.feed()
+            # returns as soon as a packet arrives, so commands are applied
+            # without waiting for the next tick
+            receiver.wait(TICK)
+            receiver.update()
+            command = receiver.get_command()
+
+            with tracing.span("teleop.apply", "control"):
+                if command is None:
+                    car.stop()  # fail-safe: no recent commands
+                    car.set_dir_servo_angle(0)
+                else:
+                    car.set_dir_servo_angle(command.steering)
+                    car.forward(command.speed)
+                    car.set_cam_pan_angle(command.pan)
+                    car.set_cam_tilt_angle(command.tilt)
+                car.flush()
+
+            now = time.monotonic()
+            if now - last_print > PRINT_PERIOD:
+                print(f"command {command}, packets: %(applied)s applied, %(dropped_old)s out of order, "
+                      f"%(dropped_stale)s stale, %(bad)s bad, %(rejected)s rejected" % receiver.stats())
+                last_print = now
+    finally:
+        watchdog.stop()
+        car.stop(force=True)
+        car.set_dir_servo_angle(0)
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.teleop import KeyCommands, KeyReader, Command
+from utils.teleop_udp import UdpTeleopSender, DEFAULT_PORT
+import argparse
+import os
+import time
+
+# Runs on a laptop: sends the held keys to 09_teleop_udp_car.py on the car,
+# 50 times a second, instead of driving over SSH
+
+RATE = 50  # packets per second
+
+manual = '''
+Hold keys on keyboard to drive the PiCar-X over the network!
+    w/s: Forward/Backward
+    a/d: Steer left/right (hold with w/s)
+    i/k: Head up/down
+    j/l: Turn head left/right
+    ctrl+c: Exit the program
+'''
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UDP teleoperation client")
+    parser.add_argument("host", help="IP address of the car")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"UDP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--key", default=os.environ.get("PICARX_TELEOP_KEY"),
+                        help="Shared key the car was started with (default: $PICARX_TELEOP_KEY)")
+    args = parser.parse_args()
+
+    sender = UdpTeleopSender((args.host, args.port), key=args.key)
+    commands = KeyCommands(speed=80, steer_angle=30)
+    reader = KeyReader(commands.key_event)
+    print(manual)
+    reader.start()
+
+    period = 1.0 / RATE
+    next_send = time.monotonic()
+    try:
+        while not reader.quit.is_set():
+            command = commands.command()
+            if command is None:
+                # no keys pressed lately: keep sending, so the car knows
+                # the link is alive, but ask it to stop
+                pan, tilt = commands.camera()
+                sender.send(Command(0, 0, pan, tilt), stop=True)
+            else:
+                sender.send(command)
+            next_send += period
+            reader.quit.wait(max(0.0, next_send - time.monotonic()))
+    finally:
+        for _ in range(3):
+            sender.send(Command(0, 0, 0, 0), stop=True)
+        print("\n Quit")
@@ -9,30 +9,67 @@ It checks for:
 - YAML frontmatter completeness
 - Entry frequency and consistency
 - Technical content quality indicators
-- Image usage and documentation
+- Image usage and documentation (broken links, oversized or duplicate images)
+- Near-duplicate entries, within a repository and (in batch mode) across teams
+- Commit timelines from the git history (bursts, backfilled entries)
 
 Usage:
-    python generate_grading_report.py <repo_path> [--output report.md]
+    python generate_grading_report.py <repo_path> [--output report.md] [--json]
+    python generate_grading_report.py <repo_path> --watch [--output report.md]
+    python generate_grading_report.py --batch <repos_dir> [--output-dir reports] [--jobs N]
+    python generate_grading_report.py --manifest <repos.txt> [--output-dir reports] [--jobs N]
 
 Example:
     python generate_grading_report.py ../student-repos/team-alpha --output team-alpha-report.md
+    python generate_grading_report.py --batch ../student-repos --output-dir reports
 """
 
+import io
 import os
 import sys
-import yaml
+import time
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 import argparse
 
+from report_cache import EntryCache
+from report_model import RepoResult, ResultWriter, write_json
+from report_images import ImageChecker
+from report_git import BURST_MIN_ENTRIES, BURST_WINDOW, GitActivity, parse_date, to_day
+from report_frontmatter import split_frontmatter, load_frontmatter
+from report_scanner import scan_stream
+from report_similarity import MinHasher, SimilarityIndex, find_pairs
+from report_watch import POLL_INTERVAL, ReportWatcher
+
 
 class LogbookGrader:
-    def __init__(self, repo_path):
+    def __init__(self, repo_path, cache_path=None, use_git=True, git_history=None):
         self.repo_path = Path(repo_path)
         self.logbook_path = self.repo_path / "logbook"
+        # Optional persistent cache of per-entry analysis results
+        self.cache = EntryCache(cache_path, self.repo_path) if cache_path else None
+        # Image header/stat results are cached next to the entry cache
+        self.image_checker = ImageChecker(
+            self.repo_path, Path(cache_path).with_suffix('.images.json') if cache_path else None)
+        self.image_references = []
+        self.image_problems = {"broken": 0, "oversized": 0, "duplicate": 0}
+        self.image_refs_checked = 0
+        # Entry path (relative to the repo) -> MinHash signature of its body
+        self.signatures = {}
+        self.duplicates = []
+        self.use_git = use_git
+        # Already loaded GitActivity to use instead of reading the history
+        self.git_history = git_history
+        self.git = None
+        self.backfilled = []
+        self.bursts = []
+        # Entry path (relative to the repo) -> date from its header
+        self.entry_dates = {}
         self.issues = []
         self.warnings = []
+        self.suggestions = []
         self.stats = {
             "total_entries": 0,
             "total_hours": 0.0,
@@ -44,13 +81,8 @@ class LogbookGrader:
     
     def parse_frontmatter(self, content):
         """Extract YAML frontmatter from markdown content."""
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            try:
-                return yaml.safe_load(match.group(1))
-            except yaml.YAMLError as e:
-                return None
-        return None
+        # Only the header lines are looked at; simple headers skip the YAML loader
+        return load_frontmatter(split_frontmatter(io.StringIO(content)))
     
     def check_file_structure(self):
         """Verify logbook directory structure."""
@@ -70,63 +102,198 @@ class LogbookGrader:
     
     def analyze_entry(self, entry_path):
         """Analyze a single logbook entry."""
+        if self.cache is not None:
+            result = self.cache.get_or_analyze(entry_path, self.analyze_file)
+        else:
+            result = self.analyze_file(entry_path)
+        
+        self.add_entry_result(entry_path, result)
+    
+    def analyze_file(self, entry_path):
+        """Analyze one entry file in a single streaming pass."""
         with open(entry_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+            return self.analyze_stream(f)
+    
+    def analyze_content(self, content):
+        """Analyze the text of one entry."""
+        return self.analyze_stream(io.StringIO(content))
+    
+    def analyze_stream(self, f):
+        """
+        Analyze one entry read from an open text stream.
+        
+        Returns a JSON-serializable dict that add_entry_result() folds into the
+        statistics; it does not depend on the file name, so it can be cached.
+        """
+        minhash = MinHasher()
+        frontmatter_text, scanner = scan_stream(f, minhash=minhash)
+        result = {"valid": False, "warnings": [], "minhash": minhash.signature()}
         
         # Check frontmatter
-        frontmatter = self.parse_frontmatter(content)
+        frontmatter = load_frontmatter(frontmatter_text)
         if not frontmatter:
-            self.warnings.append(f"⚠️  {entry_path.name}: Missing or invalid YAML frontmatter")
-            return
+            result["warnings"].append("Missing or invalid YAML frontmatter")
+            return result
+        result["valid"] = True
         
         # Required fields
         required_fields = ['title', 'date', 'week', 'author', 'hours', 'status']
         missing_fields = [field for field in required_fields if field not in frontmatter]
         if missing_fields:
-            self.warnings.append(
-                f"⚠️  {entry_path.name}: Missing frontmatter fields: {', '.join(missing_fields)}"
-            )
+            result["warnings"].append(f"Missing frontmatter fields: {', '.join(missing_fields)}")
         
-        # Update statistics
-        self.stats["total_entries"] += 1
+        result["hours"] = 0.0
         if 'hours' in frontmatter:
             try:
-                self.stats["total_hours"] += float(frontmatter['hours'])
+                result["hours"] = float(frontmatter['hours'])
             except (ValueError, TypeError):
-                self.warnings.append(f"⚠️  {entry_path.name}: Invalid hours value")
+                result["warnings"].append("Invalid hours value")
         
         if 'week' in frontmatter:
-            self.stats["weeks_with_entries"].add(frontmatter['week'])
+            week = frontmatter['week']
+            result["week"] = week if isinstance(week, (int, float, str)) else str(week)
         
-        # Content analysis
-        if '![' in content or '<img' in content:
-            self.stats["entries_with_images"] += 1
+        if 'date' in frontmatter:
+            result["date"] = str(frontmatter['date'])
         
-        if '$$' in content or '\\[' in content or '\\(' in content:
-            self.stats["entries_with_calculations"] += 1
+        # Content analysis
+        result["has_images"] = scanner.has_images
+        result["has_calculations"] = scanner.has_calculations
+        result["image_refs"] = scanner.image_refs
+        result["image_targets"] = scanner.image_targets
+        result["math_blocks"] = scanner.math_blocks
+        result["code_blocks"] = scanner.code_fences
+        result["headings"] = scanner.headings
         
         # Count words (approximate content length)
-        words = len(re.findall(r'\w+', content))
-        self.stats["avg_entry_length"] += words
+        result["words"] = scanner.words
+        return result
     
-    def scan_logbook(self):
-        """Scan all logbook entries."""
-        if not self.check_file_structure():
+    def add_entry_result(self, entry_path, result):
+        """Update statistics and warnings from one analyze_content() result."""
+        for warning in result["warnings"]:
+            self.warnings.append(f"⚠️  {entry_path.name}: {warning}")
+        relpath = entry_path.relative_to(self.repo_path).as_posix()
+        if result.get("minhash") is not None:
+            self.signatures[relpath] = result["minhash"]
+        if not result["valid"]:
             return
         
+        self.entry_dates[relpath] = parse_date(result["date"]) if "date" in result else None
+        self.stats["total_entries"] += 1
+        self.stats["total_hours"] += result["hours"]
+        if "week" in result:
+            self.stats["weeks_with_entries"].add(result["week"])
+        if result["has_images"]:
+            self.stats["entries_with_images"] += 1
+        if result.get("image_targets"):
+            self.image_references.append((entry_path, result["image_targets"]))
+        if result["has_calculations"]:
+            self.stats["entries_with_calculations"] += 1
+        self.stats["avg_entry_length"] += result["words"]
+    
+    def find_entries(self):
+        """List the entry files in week-* directories; None if there are none."""
+        if not self.check_file_structure():
+            return None
+        
         # Find all markdown files in week-* directories
         week_dirs = sorted([d for d in self.logbook_path.iterdir() 
                            if d.is_dir() and d.name.startswith('week-')])
         
         if not week_dirs:
             self.warnings.append("⚠️  No week directories found (week-01, week-02, etc.)")
-            return
+            return None
         
+        entries = []
         for week_dir in week_dirs:
             md_files = list(week_dir.glob('*.md'))
-            for md_file in md_files:
-                if md_file.name != 'README.md':
-                    self.analyze_entry(md_file)
+            entries += [md_file for md_file in md_files if md_file.name != 'README.md']
+        return entries
+    
+    def scan_logbook(self):
+        """Scan all logbook entries."""
+        entries = self.find_entries()
+        if entries is None:
+            return
+        
+        for md_file in entries:
+            self.analyze_entry(md_file)
+        self.check_images()
+        self.check_duplicates()
+        
+        if self.cache is not None:
+            self.cache.save()
+        
+        if self.use_git:
+            self.check_git_activity()
+    
+    def check_images(self):
+        """Verify the images referenced by the scanned entries."""
+        if not self.image_references:
+            return
+        problems, self.image_refs_checked = self.image_checker.check(self.image_references)
+        for entry_path, kind, message in problems:
+            self.image_problems[kind] += 1
+            if entry_path is None:
+                self.warnings.append(f"⚠️  {message}")
+            else:
+                self.warnings.append(f"⚠️  {entry_path.name}: {message}")
+    
+    def check_duplicates(self):
+        """Flag entries whose text mostly repeats another entry of this repository."""
+        self.duplicates = find_pairs(self.signatures)
+        for a, b, similarity in self.duplicates:
+            self.warnings.append(f"⚠️  {Path(a).name}: near-duplicate of {b} ({similarity:.0%} similar)")
+    
+    def check_git_activity(self):
+        """Load the logbook's commit history and flag backfilled entries."""
+        self.git = self.git_history or GitActivity.load(self.repo_path)
+        if self.git is None or not self.git.commits:
+            self.git = None
+            return
+        self.backfilled = self.git.backfilled(self.entry_dates)
+        self.bursts = self.git.bursts(self.entry_dates)
+        for path, delay in self.backfilled:
+            self.warnings.append(f"⚠️  {Path(path).name}: first committed {delay} days after its date")
+    
+    def git_activity_section(self):
+        """Markdown section with the commit timelines."""
+        git = self.git
+        entries = sorted(self.entry_dates)
+        bursts = self.bursts
+        never = [p for p in entries if git.entry_timeline(p) is None]
+        
+        lines = [
+            "## 🕒 Commit Activity",
+            "",
+            f"- **Commits to Logbook:** {len(git.commits)}",
+            f"- **Entries Never Committed:** {len(never)}",
+            f"- **Last-Minute Bursts:** {len(bursts)} "
+            f"({sum(len(paths) for _, paths in bursts)} entries first committed "
+            f"{BURST_MIN_ENTRIES}+ at a time within {BURST_WINDOW // 3600} h)",
+        ]
+        for start, paths in bursts:
+            lines.append(f"  - {datetime.fromtimestamp(start).strftime('%Y-%m-%d %H:%M')}: "
+                         f"{', '.join(Path(p).name for p in paths)}")
+        
+        lines += ["", "| Author | Commits | Active Days | Longest Streak | First | Last |",
+                  "|---|---:|---:|---:|---|---|"]
+        for author, a in sorted(self.git.author_summary().items()):
+            lines.append(f"| {author} | {a['commits']} | {a['active_days']} | "
+                         f"{a['longest_streak']} days | {a['first']} | {a['last']} |")
+        
+        lines += ["", "| Entry | Date | First Commit | Last Commit | Commits |",
+                  "|---|---|---|---|---:|"]
+        for path in entries:
+            timeline = git.entry_timeline(path)
+            entry_date = self.entry_dates[path] or "-"
+            if timeline is None:
+                lines.append(f"| {Path(path).name} | {entry_date} | - | - | 0 |")
+                continue
+            first, last, commits = timeline
+            lines.append(f"| {Path(path).name} | {entry_date} | {to_day(first)} | {to_day(last)} | {commits} |")
+        return "\n".join(lines) + "\n\n"
     
     def calculate_grade_suggestions(self):
         """Provide grading suggestions based on analysis."""
@@ -152,18 +319,28 @@ class LogbookGrader:
         if self.stats["entries_with_calculations"] == 0 and self.stats["total_entries"] > 0:
             suggestions.append("⚠️  No mathematical calculations found. Verify technical depth.")
         
+        # Check commit history
+        if self.git is not None and self.entry_dates:
+            burst_entries = sum(len(paths) for _, paths in self.bursts)
+            if burst_entries * 2 > len(self.entry_dates):
+                suggestions.append("⚠️  Most entries were committed in last-minute bursts. "
+                                   "Verify they were written during the work.")
+        
         return suggestions
     
     def generate_report(self):
         """Generate a markdown grading report."""
         self.scan_logbook()
-        
+        return self.render_report()
+    
+    def render_report(self):
+        """Build the markdown report from the scanned statistics; call once."""
         if self.stats["total_entries"] > 0:
             self.stats["avg_entry_length"] /= self.stats["total_entries"]
         
-        suggestions = self.calculate_grade_suggestions()
+        self.suggestions = self.calculate_grade_suggestions()
         
-        report = f"""# Logbook Grading Report
+        parts = [f"""# Logbook Grading Report
 
 **Repository:** `{self.repo_path.name}`  
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
@@ -177,33 +354,59 @@ class LogbookGrader:
 - **Entries with Calculations:** {self.stats['entries_with_calculations']}
 - **Average Entry Length:** {self.stats['avg_entry_length']:.0f} words
 
-## 🔍 Issues Found
-
-"""
+"""]
         
+        if self.git is not None:
+            parts.append(self.git_activity_section())
+        
+        parts.append("## 🔍 Issues Found\n\n")
         if self.issues:
-            for issue in self.issues:
-                report += f"{issue}\n"
+            parts += [f"{issue}\n" for issue in self.issues]
         else:
-            report += "✅ No critical issues found\n"
-        
-        report += "\n## ⚠️  Warnings\n\n"
+            parts.append("✅ No critical issues found\n")
         
+        parts.append("\n## ⚠️  Warnings\n\n")
         if self.warnings:
-            for warning in self.warnings:
-                report += f"{warning}\n"
+            parts += [f"{warning}\n" for warning in self.warnings]
         else:
-            report += "✅ No warnings\n"
+            parts.append("✅ No warnings\n")
         
-        report += "\n## 💡 Grading Suggestions\n\n"
-        
-        if suggestions:
-            for suggestion in suggestions:
-                report += f"{suggestion}\n"
+        parts.append("\n## 💡 Grading Suggestions\n\n")
+        if self.suggestions:
+            parts += [f"{suggestion}\n" for suggestion in self.suggestions]
         else:
-            report += "✅ Repository meets minimum standards\n"
+            parts.append("✅ Repository meets minimum standards\n")
         
-        report += """\n---
+        parts.append(GRADING_CRITERIA)
+        return "".join(parts)
+    
+    def result(self, report_path="", seconds=0.0):
+        """Structured summary of the last generate_report() run."""
+        git = self.git
+        return RepoResult(
+            repo=self.repo_path.name,
+            entries=self.stats["total_entries"],
+            hours=self.stats["total_hours"],
+            weeks=sorted(self.stats["weeks_with_entries"]),
+            images=self.stats["entries_with_images"],
+            calculations=self.stats["entries_with_calculations"],
+            avg_words=self.stats["avg_entry_length"],
+            issues=list(self.issues),
+            warnings=list(self.warnings),
+            suggestions=list(self.suggestions),
+            image_refs=self.image_refs_checked,
+            broken_images=self.image_problems["broken"],
+            oversized_images=self.image_problems["oversized"],
+            near_duplicates=len(self.duplicates),
+            commits=len(git.commits) if git is not None else None,
+            burst_entries=sum(len(p) for _, p in self.bursts) if git is not None else None,
+            backfilled_entries=len(self.backfilled) if git is not None else None,
+            report=str(report_path),
+            seconds=seconds,
+        )
+
+
+GRADING_CRITERIA = """\n---
 
 ## 📝 Grading Criteria Reference
 
@@ -231,280 +434,170 @@ class LogbookGrader:
 - Minimal technical content
 - Poor documentation practices
 """
-        
-        return report
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Generate grading reports for student logbook repositories'
-    )
-    parser.add_argument(
-        'repo_path',
-        help='Path to student repository'
-    )
-    parser.add_argument(
-        '-o', '--output',
-        default='grading_report.md',
-        help='Output file path (default: grading_report.md)'
-    )
-    
-    args = parser.parse_args()
-    
-    if not os.path.exists(args.repo_path):
-        print(f"Error: Repository path '{args.repo_path}' does not exist")
-        sys.exit(1)
-    
-    grader = LogbookGrader(args.repo_path)
-    report = grader.generate_report()
-    
-    # Write report
-    with open(args.output, 'w', encoding='utf-8') as f:
-        f.write(report)
-    
-    print(f"✅ Report generated: {args.output}")
-    print(f"\nQuick Summary:")
-    print(f"  Entries: {grader.stats['total_entries']}")
-    print(f"  Hours: {grader.stats['total_hours']:.1f}")
-    print(f"  Issues: {len(grader.issues)}")
-    print(f"  Warnings: {len(grader.warnings)}")
-
-
-if __name__ == '__main__':
-    main()#!/usr/bin/env python3
-"""
-Logbook Grading Report Generator
-
-This script analyzes student logbook repositories and generates grading reports for TAs.
-It checks for:
-- Proper file structure and naming conventions
-- YAML frontmatter completeness
-- Entry frequency and consistency
-- Technical content quality indicators
-- Image usage and documentation
+def cache_path_for(output_path):
+    """Analysis cache file kept next to a report."""
+    return Path(output_path).with_suffix('.cache.json')
 
-Usage:
-    python generate_grading_report.py <repo_path> [--output report.md]
-
-Example:
-    python generate_grading_report.py ../student-repos/team-alpha --output team-alpha-report.md
-"""
 
-import os
-import sys
-import yaml
-import re
-from datetime import datetime
-from pathlib import Path
-import argparse
+def grade_repo(repo_path, output_path, use_cache=True, use_git=True):
+    """Grade one repository, write its report and JSON result and return the result."""
+    return _grade_repo(repo_path, output_path, use_cache, use_git)[0]
 
 
-class LogbookGrader:
-    def __init__(self, repo_path):
-        self.repo_path = Path(repo_path)
-        self.logbook_path = self.repo_path / "logbook"
-        self.issues = []
-        self.warnings = []
-        self.stats = {
-            "total_entries": 0,
-            "total_hours": 0.0,
-            "weeks_with_entries": set(),
-            "entries_with_images": 0,
-            "entries_with_calculations": 0,
-            "avg_entry_length": 0,
-        }
+def _grade_repo(repo_path, output_path, use_cache=True, use_git=True, name=None):
+    # batch workers also return the entry signatures for the class index;
+    # name replaces the folder name when two batch repos share it
+    start = time.perf_counter()
+    grader = LogbookGrader(repo_path, cache_path_for(output_path) if use_cache else None, use_git)
+    report = grader.generate_report()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(report)
     
-    def parse_frontmatter(self, content):
-        """Extract YAML frontmatter from markdown content."""
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            try:
-                return yaml.safe_load(match.group(1))
-            except yaml.YAMLError as e:
-                return None
-        return None
+    result = grader.result(output_path, time.perf_counter() - start)
+    if name:
+        result.repo = name
+    write_json(result, Path(output_path).with_suffix('.json'))
+    return result, grader.signatures
+
+
+def find_repos(batch_dir=None, manifest=None):
+    """List repositories from a directory of repos or a manifest file."""
+    repos = []
+    if batch_dir:
+        repos += sorted(d for d in Path(batch_dir).iterdir()
+                        if d.is_dir() and not d.name.startswith('.'))
+    if manifest:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    repos.append(Path(line))
+    # a repository listed twice would be graded twice into the same report
+    unique = {}
+    for repo in repos:
+        unique.setdefault(repo.resolve(), repo)
+    return list(unique.values())
+
+
+def report_names(repos):
+    """
+    A distinct name per repository for its report files: the folder name,
+    with parent folders prepended (team-a, 2024-team-a) only where names clash.
+    """
+    parts = [Path(repo).resolve().parts[1:] for repo in repos]
+    depth = [1] * len(repos)
+    while True:
+        names = ['-'.join(p[-d:]) for p, d in zip(parts, depth)]
+        clashes = {n for n in names if names.count(n) > 1}
+        if not clashes:
+            return names
+        grown = False
+        for i, name in enumerate(names):
+            if name in clashes and depth[i] < len(parts[i]):
+                depth[i] += 1
+                grown = True
+        if not grown:
+            raise ValueError(f"Repositories cannot be told apart: {', '.join(sorted(clashes))}")
+
+
+def summary_table(results):
+    """Build a markdown table with one row per repository."""
+    lines = [
+        "# Logbook Activity Summary",
+        "",
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  ",
+        f"**Repositories:** {len(results)}  ",
+        "",
+        "| Repository | Entries | Hours | Weeks | Images | Calculations | Avg Words | Issues | Warnings |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for r in sorted(results, key=lambda r: r.repo):
+        lines.append(
+            f"| [{r.repo}]({Path(r.report).name}) | {r.entries} | {r.hours:.1f} | {len(r.weeks)} "
+            f"| {r.images} | {r.calculations} | {r.avg_words:.0f} | {len(r.issues)} | {len(r.warnings)} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def duplicates_table(pairs):
+    """Markdown list of near-duplicate entries between repositories."""
+    lines = [
+        "# Near-Duplicate Entries Between Teams",
+        "",
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  ",
+        f"**Pairs:** {len(pairs)}  ",
+        "",
+    ]
+    if not pairs:
+        lines.append("✅ No near-duplicate entries found")
+        return "\n".join(lines) + "\n"
+    lines += ["| Similarity | Repository | Entry | Repository | Entry |", "|---:|---|---|---|---|"]
+    for (repo_a, entry_a), (repo_b, entry_b), similarity in pairs:
+        lines.append(f"| {similarity:.0%} | {repo_a} | {entry_a} | {repo_b} | {entry_b} |")
+    return "\n".join(lines) + "\n"
+
+
+def run_batch(repos, output_dir, jobs=None, use_cache=True, use_git=True):
+    """
+    Grade many repositories in a process pool.
     
-    def check_file_structure(self):
-        """Verify logbook directory structure."""
-        if not self.logbook_path.exists():
-            self.issues.append("❌ Missing logbook directory")
-            return False
-        
-        required_files = [
-            self.logbook_path / "README.md",
-        ]
-        
-        for req_file in required_files:
-            if not req_file.exists():
-                self.warnings.append(f"⚠️  Missing {req_file.relative_to(self.repo_path)}")
-        
-        return True
+    Writes a report and JSON result per repository, summary.md, and every
+    result as it completes to results.jsonl and results.csv. Entry
+    signatures are kept in similarity.idx, and near-duplicates between
+    teams are listed in duplicates.md.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
     
-    def analyze_entry(self, entry_path):
-        """Analyze a single logbook entry."""
-        with open(entry_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Check frontmatter
-        frontmatter = self.parse_frontmatter(content)
-        if not frontmatter:
-            self.warnings.append(f"⚠️  {entry_path.name}: Missing or invalid YAML frontmatter")
-            return
-        
-        # Required fields
-        required_fields = ['title', 'date', 'week', 'author', 'hours', 'status']
-        missing_fields = [field for field in required_fields if field not in frontmatter]
-        if missing_fields:
-            self.warnings.append(
-                f"⚠️  {entry_path.name}: Missing frontmatter fields: {', '.join(missing_fields)}"
-            )
-        
-        # Update statistics
-        self.stats["total_entries"] += 1
-        if 'hours' in frontmatter:
+    start = time.perf_counter()
+    results = []
+    failed = []
+    # not .json: the folder's .json files are loaded as results by report_aggregate.py
+    index = SimilarityIndex(output_dir / "similarity.idx")
+    with ProcessPoolExecutor(max_workers=jobs) as pool, \
+            ResultWriter(output_dir / "results.jsonl") as jsonl, \
+            ResultWriter(output_dir / "results.csv") as table:
+        futures = {
+            pool.submit(_grade_repo, str(repo), str(output_dir / f"{name}-report.md"),
+                        use_cache, use_git, name): repo
+            for repo, name in zip(repos, report_names(repos))
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            repo = futures[future]
             try:
-                self.stats["total_hours"] += float(frontmatter['hours'])
-            except (ValueError, TypeError):
-                self.warnings.append(f"⚠️  {entry_path.name}: Invalid hours value")
-        
-        if 'week' in frontmatter:
-            self.stats["weeks_with_entries"].add(frontmatter['week'])
-        
-        # Content analysis
-        if '![' in content or '<img' in content:
-            self.stats["entries_with_images"] += 1
-        
-        if '$$' in content or '\\[' in content or '\\(' in content:
-            self.stats["entries_with_calculations"] += 1
-        
-        # Count words (approximate content length)
-        words = len(re.findall(r'\w+', content))
-        self.stats["avg_entry_length"] += words
+                result, signatures = future.result()
+            except Exception as e:
+                failed.append(repo)
+                print(f"[{done}/{len(repos)}] ❌ {repo.name}: {e}")
+                continue
+            results.append(result)
+            index.update(result.repo, signatures)
+            jsonl.write(result)
+            table.write(result)
+            print(f"[{done}/{len(repos)}] {result.repo}: {result.entries} entries "
+                  f"({result.seconds:.2f}s)")
     
-    def scan_logbook(self):
-        """Scan all logbook entries."""
-        if not self.check_file_structure():
-            return
-        
-        # Find all markdown files in week-* directories
-        week_dirs = sorted([d for d in self.logbook_path.iterdir() 
-                           if d.is_dir() and d.name.startswith('week-')])
-        
-        if not week_dirs:
-            self.warnings.append("⚠️  No week directories found (week-01, week-02, etc.)")
-            return
-        
-        for week_dir in week_dirs:
-            md_files = list(week_dir.glob('*.md'))
-            for md_file in md_files:
-                if md_file.name != 'README.md':
-                    self.analyze_entry(md_file)
+    summary_path = output_dir / "summary.md"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        f.write(summary_table(results))
     
-    def calculate_grade_suggestions(self):
-        """Provide grading suggestions based on analysis."""
-        suggestions = []
-        
-        # Check entry frequency
-        if self.stats["total_entries"] == 0:
-            suggestions.append("❌ **CRITICAL**: No logbook entries found")
-        elif self.stats["total_entries"] < 3:
-            suggestions.append("⚠️  **LOW**: Very few entries (<3). Encourage more frequent logging.")
-        
-        # Check hours logged
-        if self.stats["total_hours"] < 5:
-            suggestions.append("⚠️  Low time investment logged. Verify with student.")
-        
-        # Check content quality
-        if self.stats["total_entries"] > 0:
-            avg_length = self.stats["avg_entry_length"] / self.stats["total_entries"]
-            if avg_length < 100:
-                suggestions.append("⚠️  Entries appear brief. Encourage more detailed documentation.")
-        
-        # Check for technical content
-        if self.stats["entries_with_calculations"] == 0 and self.stats["total_entries"] > 0:
-            suggestions.append("⚠️  No mathematical calculations found. Verify technical depth.")
-        
-        return suggestions
+    # teams graded earlier stay in the index, so new entries are checked
+    # against the whole class
+    index.save()
+    pairs = index.find_pairs(repos=[r.repo for r in results])
+    duplicates_path = output_dir / "duplicates.md"
+    with open(duplicates_path, 'w', encoding='utf-8') as f:
+        f.write(duplicates_table(pairs))
     
-    def generate_report(self):
-        """Generate a markdown grading report."""
-        self.scan_logbook()
-        
-        if self.stats["total_entries"] > 0:
-            self.stats["avg_entry_length"] /= self.stats["total_entries"]
-        
-        suggestions = self.calculate_grade_suggestions()
-        
-        report = f"""# Logbook Grading Report
-
-**Repository:** `{self.repo_path.name}`  
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
-
-## 📊 Statistics
-
-- **Total Entries:** {self.stats['total_entries']}
-- **Total Hours Logged:** {self.stats['total_hours']:.1f} hours
-- **Weeks with Entries:** {len(self.stats['weeks_with_entries'])} (Weeks: {', '.join(map(str, sorted(self.stats['weeks_with_entries'])))})
-- **Entries with Images:** {self.stats['entries_with_images']}
-- **Entries with Calculations:** {self.stats['entries_with_calculations']}
-- **Average Entry Length:** {self.stats['avg_entry_length']:.0f} words
-
-## 🔍 Issues Found
-
-"""
-        
-        if self.issues:
-            for issue in self.issues:
-                report += f"{issue}\n"
-        else:
-            report += "✅ No critical issues found\n"
-        
-        report += "\n## ⚠️  Warnings\n\n"
-        
-        if self.warnings:
-            for warning in self.warnings:
-                report += f"{warning}\n"
-        else:
-            report += "✅ No warnings\n"
-        
-        report += "\n## 💡 Grading Suggestions\n\n"
-        
-        if suggestions:
-            for suggestion in suggestions:
-                report += f"{suggestion}\n"
-        else:
-            report += "✅ Repository meets minimum standards\n"
-        
-        report += """\n---
-
-## 📝 Grading Criteria Reference
-
-### Excellent (90-100%)
-- Regular entries (3+ per week)
-- Detailed technical documentation with calculations
-- Proper use of images/diagrams
-- Complete YAML frontmatter
-- Clear reflection on challenges and solutions
-
-### Good (80-89%)
-- Consistent entries (2-3 per week)
-- Technical content with some calculations
-- Some visual documentation
-- Minor frontmatter issues
-
-### Satisfactory (70-79%)
-- Some entries (1-2 per week)
-- Basic technical documentation
-- Limited calculations or visuals
-- Missing some frontmatter fields
-
-### Needs Improvement (<70%)
-- Infrequent or missing entries
-- Minimal technical content
-- Poor documentation practices
-"""
-        
-        return report
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {len(results)} reports generated in {output_dir}, summary: {summary_path}")
+    print(f"🔁 {len(pairs)} near-duplicate entry pairs between teams: {duplicates_path}")
+    if failed:
+        print(f"❌ {len(failed)} repositories failed: {', '.join(r.name for r in failed)}")
+    print(f"Total wall time: {elapsed:.2f}s")
+    return results
 
 
 def main():
@@ -513,6 +606,7 @@ def main():
     )
     parser.add_argument(
         'repo_path',
+        nargs='?',
         help='Path to student repository'
     )
     parser.add_argument(
@@ -520,14 +614,86 @@ def main():
         default='grading_report.md',
         help='Output file path (default: grading_report.md)'
     )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Also write the results as JSON next to the report (<output>.json)'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and regenerate the report whenever an entry changes'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=POLL_INTERVAL,
+        help=f'Polling interval for --watch in seconds (default: {POLL_INTERVAL})'
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='DIR',
+        help='Grade every repository in this directory'
+    )
+    parser.add_argument(
+        '--manifest',
+        metavar='FILE',
+        help='Grade the repositories listed in this file, one path per line'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='reports',
+        help='Output folder for batch reports (default: reports)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Worker processes for batch mode (default: number of CPUs)'
+    )
+    parser.add_argument(
+        '--cache',
+        metavar='FILE',
+        help='Entry analysis cache file (default: next to the report, <output>.cache.json)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-analyze every entry and do not write a cache'
+    )
+    parser.add_argument(
+        '--no-git',
+        action='store_true',
+        help='Skip the commit history analysis'
+    )
     
     args = parser.parse_args()
     
+    if args.batch or args.manifest:
+        repos = find_repos(args.batch, args.manifest)
+        missing = [r for r in repos if not r.exists()]
+        if missing:
+            print(f"Error: Repository path '{missing[0]}' does not exist")
+            sys.exit(1)
+        if not repos:
+            print("Error: No repositories found")
+            sys.exit(1)
+        run_batch(repos, args.output_dir, args.jobs, not args.no_cache, not args.no_git)
+        return
+    
+    if args.repo_path is None:
+        parser.error('repo_path is required unless --batch or --manifest is given')
+    
     if not os.path.exists(args.repo_path):
         print(f"Error: Repository path '{args.repo_path}' does not exist")
         sys.exit(1)
     
-    grader = LogbookGrader(args.repo_path)
+    if args.watch:
+        ReportWatcher(LogbookGrader, args.repo_path, args.output, not args.no_git, args.interval).run()
+        return
+    
+    cache_path = None if args.no_cache else (args.cache or cache_path_for(args.output))
+    grader = LogbookGrader(args.repo_path, cache_path, not args.no_git)
     report = grader.generate_report()
     
     # Write report
@@ -535,12 +701,18 @@ def main():
         f.write(report)
     
     print(f"✅ Report generated: {args.output}")
+    if args.json:
+        json_path = Path(args.output).with_suffix('.json')
+        write_json(grader.result(args.output), json_path)
+        print(f"✅ Results written: {json_path}")
     print(f"\nQuick Summary:")
     print(f"  Entries: {grader.stats['total_entries']}")
     print(f"  Hours: {grader.stats['total_hours']:.1f}")
     print(f"  Issues: {len(grader.issues)}")
     print(f"  Warnings: {len(grader.warnings)}")
+    if grader.cache is not None:
+        print(f"  Cache: {grader.cache.hits} entries reused, {grader.cache.misses} analyzed")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
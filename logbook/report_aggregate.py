@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Class-wide view of many activity report results.
+
+Loads the structured results written by generate_activity_report.py
+(per-repository .json files, or the results.jsonl of a batch run) and
+computes distributions across teams without re-analyzing any repository.
+
+Usage:
+    python report_aggregate.py reports/results.jsonl [--output class-summary.md]
+    python report_aggregate.py reports/ --output class-summary.md
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from report_model import load_results
+
+# (field, label, format) of the numbers summarized across teams
+METRICS = [
+    ("entries", "Entries", "{:.0f}"),
+    ("hours", "Hours Logged", "{:.1f}"),
+    ("weeks", "Weeks with Entries", "{:.0f}"),
+    ("images", "Entries with Images", "{:.0f}"),
+    ("calculations", "Entries with Calculations", "{:.0f}"),
+    ("avg_words", "Average Entry Length", "{:.0f}"),
+    ("broken_images", "Broken Image Links", "{:.0f}"),
+    ("oversized_images", "Oversized Images", "{:.0f}"),
+    ("near_duplicates", "Near-Duplicate Entry Pairs", "{:.0f}"),
+    ("issues", "Issues", "{:.0f}"),
+    ("warnings", "Warnings", "{:.0f}"),
+    ("commits", "Commits to Logbook", "{:.0f}"),
+    ("burst_entries", "Entries in Last-Minute Bursts", "{:.0f}"),
+    ("backfilled_entries", "Backfilled Entries", "{:.0f}"),
+]
+
+
+def metric_value(result, name):
+    value = getattr(result, name)
+    return len(value) if isinstance(value, list) else value
+
+
+def week_order(week):
+    # numeric weeks in order, then anything else by name
+    if isinstance(week, (int, float)):
+        return (0, week, "")
+    return (1, 0, str(week))
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of a sorted list, q in [0, 1]."""
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def distribution(values):
+    """min, quartiles, max and mean of a list of numbers."""
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "min": values[0],
+        "p25": percentile(values, 0.25),
+        "median": percentile(values, 0.5),
+        "p75": percentile(values, 0.75),
+        "max": values[-1],
+        "mean": sum(values) / len(values),
+    }
+
+
+def aggregate(results):
+    """Distributions per metric and the number of teams with entries in each week."""
+    distributions = {}
+    for name, _, _ in METRICS:
+        values = [metric_value(r, name) for r in results]
+        values = [v for v in values if v is not None]
+        if values:
+            distributions[name] = distribution(values)
+
+    week_coverage = {}
+    for r in results:
+        for week in r.weeks:
+            week_coverage[week] = week_coverage.get(week, 0) + 1
+    return distributions, week_coverage
+
+
+def render(results):
+    """Markdown dashboard for a list of results."""
+    distributions, week_coverage = aggregate(results)
+    lines = [
+        "# Logbook Activity: Class Overview",
+        "",
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  ",
+        f"**Repositories:** {len(results)}  ",
+        "",
+        "## 📊 Distributions",
+        "",
+        "| Metric | Teams | Min | 25% | Median | 75% | Max | Mean |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for name, label, fmt in METRICS:
+        d = distributions.get(name)
+        if d is None:
+            continue
+        cells = [fmt.format(d[k]) for k in ("min", "p25", "median", "p75", "max", "mean")]
+        lines.append(f"| {label} | {d['count']} | " + " | ".join(cells) + " |")
+
+    lines += ["", "## 📅 Teams with Entries per Week", "", "| Week | Teams |", "|---|---:|"]
+    for week in sorted(week_coverage, key=week_order):
+        lines.append(f"| {week} | {week_coverage[week]} |")
+
+    needs_attention = [r for r in results if r.issues or r.entries < 3]
+    lines += ["", "## ⚠️  Needs Attention", ""]
+    if needs_attention:
+        for r in sorted(needs_attention, key=lambda r: r.repo):
+            lines.append(f"- **{r.repo}**: {r.entries} entries, {len(r.issues)} issues")
+    else:
+        lines.append("✅ Every repository has at least 3 entries and no critical issues")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Summarize activity report results across repositories'
+    )
+    parser.add_argument(
+        'results',
+        nargs='+',
+        help='Result files (.json, .jsonl) or folders of per-repository .json files'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Output markdown file (default: print to the console)'
+    )
+
+    args = parser.parse_args()
+
+    results = load_results(args.results)
+    if not results:
+        print("Error: No results found")
+        sys.exit(1)
+
+    overview = render(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(overview)
+        print(f"✅ Overview of {len(results)} repositories written to {args.output}")
+    else:
+        print(overview)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Persistent cache of per-entry analysis results for the activity report.
+
+Entries rarely change after the week they are written, so the analysis of
+each file is stored in a compact JSON file and reused on the next run.
+A cached row is reused when:
+- the path, size and modification time all match (no read needed), or
+- the content hash matches (file touched, or renamed/moved).
+Rows for files that were not seen during a run are dropped on save, so
+deleted and renamed entries do not linger.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+# Bump when the analysis result format changes to invalidate old caches
+CACHE_VERSION = 5
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files modified this close to a cache save may change again within the
+# file system's timestamp resolution without changing size or mtime, so
+# their rows are always re-checked by hash
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class EntryCache:
+    def __init__(self, cache_path, repo_path):
+        self.cache_path = Path(cache_path)
+        self.repo_path = Path(repo_path)
+        self.entries = {}
+        self.seen = {}
+        self.by_hash = None
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def _key(self, entry_path):
+        try:
+            return Path(entry_path).relative_to(self.repo_path).as_posix()
+        except ValueError:
+            return Path(entry_path).as_posix()
+
+    def _find_by_hash(self, digest):
+        # built lazily, only needed when a file's size/mtime changed
+        if self.by_hash is None:
+            self.by_hash = {row["sha1"]: row for row in self.entries.values()}
+        return self.by_hash.get(digest)
+
+    def get_or_analyze(self, entry_path, analyze):
+        """
+        Return the analysis result for entry_path, from the cache if valid.
+
+        analyze: function taking the entry path and returning a result dict
+        """
+        key = self._key(entry_path)
+        st = os.stat(entry_path)
+        row = self.entries.get(key)
+        if row and row["size"] == st.st_size and row["mtime_ns"] == st.st_mtime_ns \
+                and not row.get("racy"):
+            self.hits += 1
+            self.seen[key] = row
+            return row["result"]
+
+        sha1 = hashlib.sha1()
+        with open(entry_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha1.update(block)
+        digest = sha1.hexdigest()
+        cached = row if row and row["sha1"] == digest else self._find_by_hash(digest)
+        if cached is not None:
+            self.hits += 1
+            result = cached["result"]
+        else:
+            self.misses += 1
+            result = analyze(entry_path)
+
+        self.seen[key] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha1": digest,
+            "result": result,
+        }
+        return result
+
+    def save(self):
+        """Write the rows seen during this run, dropping all others."""
+        now_ns = time.time_ns()
+        for row in self.seen.values():
+            row["racy"] = now_ns - row["mtime_ns"] < RACY_WINDOW_NS
+        data = {"version": CACHE_VERSION, "entries": self.seen}
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
+        self.entries = self.seen
+        self.seen = {}
+        self.by_hash = None
@@ -0,0 +1,189 @@
+"""
+Fast YAML frontmatter reading for logbook entries.
+
+Entries start with a small flat header (title, date, week, author, hours,
+status, ...). Instead of matching a regex over the whole file and running
+the pure-Python YAML loader, this module:
+- reads only the leading lines of the file, up to the closing `---`
+- parses flat `key: value` headers with a small hand-rolled parser that uses
+  PyYAML's own implicit type rules, so results are identical
+- falls back to the C-accelerated YAML loader (or the pure-Python one when
+  libyaml is not available) for anything outside that subset
+"""
+
+import datetime
+import io
+import re
+
+import yaml
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+try:
+    YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    YamlLoader = yaml.SafeLoader
+
+# Same expression the activity report has always used to find the header
+FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+OPENING_LINE_RE = CLOSING_LINE_RE = re.compile(r'---\s*\n')
+BLANK_LINE_RE = re.compile(r'\s*\n')
+
+KEY_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_-]*):(?:[ ]+(.*?))?[ ]*\n?')
+DECIMAL_INT_RE = re.compile(r'[-+]?(?:0|[1-9][0-9]*)')
+SIMPLE_FLOAT_RE = re.compile(r'[-+]?[0-9]+\.[0-9]+')
+DATE_RE = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})')
+
+# Characters YAML treats specially at the start of a plain scalar
+INDICATORS = set('-?:,[]{}#&*!|>\'"%@`')
+# Characters allowed unescaped in a YAML stream
+NON_PRINTABLE_RE = re.compile(r'[^\x09\x0A\x0D\x20-\x7E\x85\xA0-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]')
+
+
+class _Fallback(Exception):
+    """Header uses YAML features outside the fast subset."""
+
+
+def split_frontmatter(lines):
+    """
+    Return the frontmatter text from an iterable of lines, or None.
+
+    Only consumes lines up to the closing `---`, and gives the same result
+    as FRONTMATTER_RE applied to the whole text.
+    """
+    lines = iter(lines)
+    first = next(lines, '')
+    if not OPENING_LINE_RE.fullmatch(first):
+        return None
+    head = [first]
+
+    # The regex's opening `---\s*\n` greedily takes any blank lines that
+    # follow, and the body then needs a newline of its own before the
+    # closing `---`. So the first non-blank line can never close the header
+    # unless nothing else does, in which case the whole text decides.
+    skip_first_candidate = True
+    for line in lines:
+        head.append(line)
+        if skip_first_candidate:
+            if BLANK_LINE_RE.fullmatch(line):
+                continue
+            skip_first_candidate = False
+            continue
+        if CLOSING_LINE_RE.fullmatch(line):
+            return FRONTMATTER_RE.match(''.join(head)).group(1)
+
+    match = FRONTMATTER_RE.match(''.join(head))
+    return match.group(1) if match else None
+
+
+def read_frontmatter_text(path):
+    """Read only the header of a markdown file; returns its text or None."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return split_frontmatter(f)
+
+
+def _resolve_plain(value):
+    """Convert an unquoted scalar the way PyYAML's SafeLoader would."""
+    if not value:
+        return None
+    if value[0] in INDICATORS or ': ' in value or ' #' in value or value.endswith(':') \
+            or '\t' in value:
+        raise _Fallback()
+    for tag, regexp in Resolver.yaml_implicit_resolvers.get(value[0], []):
+        if not regexp.match(value):
+            continue
+        if tag == 'tag:yaml.org,2002:bool':
+            return SafeConstructor.bool_values[value.lower()]
+        if tag == 'tag:yaml.org,2002:null':
+            return None
+        if tag == 'tag:yaml.org,2002:int' and DECIMAL_INT_RE.fullmatch(value):
+            return int(value)
+        if tag == 'tag:yaml.org,2002:float' and SIMPLE_FLOAT_RE.fullmatch(value):
+            return float(value)
+        date = DATE_RE.fullmatch(value)
+        if tag == 'tag:yaml.org,2002:timestamp' and date:
+            try:
+                return datetime.date(*map(int, date.groups()))
+            except ValueError:
+                # let YAML report the bad date the way it always has
+                raise _Fallback()
+        raise _Fallback()
+    return value
+
+
+def _parse_value(value):
+    if not value:
+        return None
+    if value[0] == '"':
+        if len(value) > 1 and value.endswith('"') and '"' not in value[1:-1] \
+                and '\\' not in value:
+            return value[1:-1]
+        raise _Fallback()
+    if value[0] == "'":
+        if len(value) > 1 and value.endswith("'") and "'" not in value[1:-1]:
+            return value[1:-1]
+        raise _Fallback()
+    if value[0] == '[':
+        if not value.endswith(']'):
+            raise _Fallback()
+        inner = value[1:-1].strip()
+        if not inner:
+            return []
+        items = []
+        for item in inner.split(','):
+            item = item.strip()
+            if not item or set(item) & set('[]{}"\':#'):
+                raise _Fallback()
+            items.append(_resolve_plain(item))
+        return items
+    return _resolve_plain(value)
+
+
+def parse_simple(text):
+    """
+    Parse a flat `key: value` header without the YAML loader.
+
+    Raises _Fallback if the header uses anything else.
+    """
+    if NON_PRINTABLE_RE.search(text):
+        raise _Fallback()
+    data = {}
+    for line in io.StringIO(text):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        match = KEY_RE.fullmatch(line)
+        if not match:
+            raise _Fallback()
+        key = _resolve_plain(match.group(1))
+        if not isinstance(key, str):
+            raise _Fallback()
+        data[key] = _parse_value(match.group(2))
+    if not data:
+        raise _Fallback()
+    return data
+
+
+def load_frontmatter(text):
+    """
+    Parse frontmatter text; returns the loaded object or None if invalid.
+
+    Matches yaml.safe_load() for every input.
+    """
+    if text is None:
+        return None
+    try:
+        return parse_simple(text)
+    except _Fallback:
+        pass
+    # libyaml accepts some tab placements the pure-Python loader rejects
+    loader = yaml.SafeLoader if '\t' in text else YamlLoader
+    try:
+        return yaml.load(text, Loader=loader)
+    except yaml.YAMLError:
+        return None
+
+
+def read_frontmatter(path):
+    """Read and parse the frontmatter of a markdown file."""
+    return load_frontmatter(read_frontmatter_text(path))
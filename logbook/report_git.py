@@ -0,0 +1,151 @@
+"""
+Commit timelines for the activity report, read from the repository's git
+history in one bulk pass.
+
+A single `git log --name-only` over the logbook folder gives every commit
+with its author, time and the entry files it touched. From that:
+- per-entry timelines (first and last commit, number of commits)
+- per-author timelines (commits, active days, longest daily streak)
+- last-minute bursts: several entries first committed within a few hours
+- backfilled entries: first committed long after the date in their header
+"""
+
+import subprocess
+from collections import defaultdict
+from datetime import date, datetime
+
+# An entry first committed this many days after its own date is backfilled
+BACKFILL_DAYS = 7
+# This many entries first committed within BURST_WINDOW seconds is a burst
+BURST_MIN_ENTRIES = 3
+BURST_WINDOW = 6 * 3600
+
+RECORD_SEP = '\x1e'
+FIELD_SEP = '\x1f'
+LOG_FORMAT = f'--format={RECORD_SEP}%at{FIELD_SEP}%aN'
+
+
+def parse_log(output):
+    """Parse `git log -z --name-only` output into (timestamp, author, paths) tuples."""
+    commits = []
+    for record in output.split(RECORD_SEP):
+        if not record:
+            continue
+        header, _, names = record.partition('\0')
+        timestamp, author = header.split(FIELD_SEP, 1)
+        paths = [name for name in names.lstrip('\n').split('\0') if name]
+        commits.append((int(timestamp), author, paths))
+    return commits
+
+
+def to_day(timestamp):
+    return datetime.fromtimestamp(timestamp).date()
+
+
+def parse_date(value):
+    """Entry date from a header value; None if it is not an ISO date."""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def longest_streak(days):
+    """Longest run of consecutive days in a sorted list of dates."""
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    return longest
+
+
+class GitActivity:
+    def __init__(self, commits):
+        """commits: (timestamp, author, paths) tuples, in any order"""
+        self.commits = sorted(commits, key=lambda c: c[0])
+        self.entries = defaultdict(list)   # path -> commit timestamps
+        self.authors = defaultdict(list)   # author -> commit timestamps
+        for timestamp, author, paths in self.commits:
+            self.authors[author].append(timestamp)
+            for path in paths:
+                self.entries[path].append(timestamp)
+
+    @classmethod
+    def load(cls, repo_path, path='logbook'):
+        """
+        Read the history of path (relative to repo_path).
+
+        Returns None when repo_path is not a git checkout or git is missing.
+        """
+        cmd = ['git', '-C', str(repo_path), '-c', 'core.quotepath=off', 'log',
+               '--no-merges', '--relative', '--name-only', '-z', LOG_FORMAT, '--', path]
+        try:
+            result = subprocess.run(cmd, capture_output=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return cls(parse_log(result.stdout.decode('utf-8', 'replace')))
+
+    def first_commit(self, path):
+        timeline = self.entries.get(path)
+        return timeline[0] if timeline else None
+
+    def entry_timeline(self, path):
+        """(first, last, commits) for one entry, or None if it was never committed."""
+        timeline = self.entries.get(path)
+        if not timeline:
+            return None
+        return timeline[0], timeline[-1], len(timeline)
+
+    def author_summary(self):
+        """Per-author commits, active days, longest streak and first/last day."""
+        summary = {}
+        for author, timeline in self.authors.items():
+            days = sorted({to_day(t) for t in timeline})
+            summary[author] = {
+                "commits": len(timeline),
+                "active_days": len(days),
+                "longest_streak": longest_streak(days),
+                "first": days[0],
+                "last": days[-1],
+            }
+        return summary
+
+    def bursts(self, paths, min_entries=BURST_MIN_ENTRIES, window=BURST_WINDOW):
+        """
+        Groups of entries first committed close together.
+
+        Returns (start timestamp, [paths]) tuples, oldest first.
+        """
+        firsts = sorted((self.entries[p][0], p) for p in paths if self.entries.get(p))
+        found = []
+        i = 0
+        while i < len(firsts):
+            j = i
+            while j < len(firsts) and firsts[j][0] - firsts[i][0] <= window:
+                j += 1
+            if j - i >= min_entries:
+                found.append((firsts[i][0], [p for _, p in firsts[i:j]]))
+                i = j
+            else:
+                i += 1
+        return found
+
+    def backfilled(self, entry_dates, days=BACKFILL_DAYS):
+        """
+        Entries first committed more than `days` after their own date.
+
+        entry_dates: {path: date}; returns (path, days late) tuples.
+        """
+        late = []
+        for path, entry_date in entry_dates.items():
+            first = self.first_commit(path)
+            if first is None or entry_date is None:
+                continue
+            delay = (to_day(first) - entry_date).days
+            if delay > days:
+                late.append((path, delay))
+        return sorted(late)
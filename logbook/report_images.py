@@ -0,0 +1,238 @@
+"""
+Verification of the images referenced by logbook entries.
+
+For every image target found by the content scanner:
+- the path is resolved (relative to the entry, or to the repository root
+  for paths starting with `/`); web links and data URIs are skipped
+- the files are stat'ed in parallel, missing ones are broken links
+- width and height are read from the file header only (PNG, JPEG, GIF,
+  WebP), without decoding any pixels
+- files that are too large on disk or in pixels are oversized, and files
+  with identical content referenced under different names are duplicates
+
+Results per file are cached by path, size and mtime, so unchanged images
+are not opened again on the next run.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+IMAGE_CACHE_VERSION = 1
+
+# Limits for images in a logbook (GitHub renders anything, but large
+# photos make the repository slow to clone and the entry slow to load)
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+MAX_IMAGE_PIXELS = 4096
+
+STAT_WORKERS = 16
+# Fewer files than this are checked in the calling thread
+PARALLEL_MIN_FILES = 32
+HASH_CHUNK_SIZE = 1024 * 1024
+
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue  # markers without a length
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>xHH', data)
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _webp_size(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and len(head) >= 30:
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(head) >= 25:
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(head) >= 30:
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+
+def image_size(path):
+    """(width, height) read from the file header, or None if unknown."""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head.startswith(b'\xff\xd8'):
+            return _jpeg_size(f)
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return _webp_size(head)
+    return None
+
+
+def resolve_target(target, entry_path, repo_path):
+    """Local file path for an image target, or None for web links and data URIs."""
+    if ':' in target or target.startswith('//'):
+        parts = urlsplit(target)
+        if parts.scheme or parts.netloc:
+            return None
+        path = parts.path
+    else:
+        path = target.split('#', 1)[0].split('?', 1)[0]
+    if not path:
+        return None
+    path = unquote(path)
+    if path.startswith('/'):
+        return os.path.join(repo_path, path.lstrip('/'))
+    return os.path.join(os.path.dirname(entry_path), path)
+
+
+class ImageChecker:
+    def __init__(self, repo_path, cache_path=None, workers=STAT_WORKERS):
+        self.repo_path = Path(repo_path)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        if self.cache_path is None:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == IMAGE_CACHE_VERSION:
+            self.cache = data.get("images", {})
+
+    def save(self, seen):
+        if self.cache_path is None:
+            return
+        data = {"version": IMAGE_CACHE_VERSION, "images": {k: self.cache[k] for k in seen}}
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
+
+    def _inspect(self, key):
+        """Stat one file and read its header; returns (key, info, cached)."""
+        try:
+            st = os.stat(key)
+        except OSError:
+            return key, {"exists": False}, False
+        row = self.cache.get(key)
+        if row and row.get("size") == st.st_size and row.get("mtime_ns") == st.st_mtime_ns:
+            return key, row, True
+        try:
+            size = image_size(key)
+        except (OSError, struct.error):
+            size = None
+        return key, {
+            "exists": True,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "width": size[0] if size else None,
+            "height": size[1] if size else None,
+        }, False
+
+    def _content_hash(self, key):
+        info = self.cache[key]
+        if "sha1" not in info:
+            sha1 = hashlib.sha1()
+            with open(key, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    sha1.update(block)
+            info["sha1"] = sha1.hexdigest()
+        return info["sha1"]
+
+    def check(self, references):
+        """
+        Verify image references.
+
+        references: (entry_path, [targets]) pairs
+        Returns a list of (entry_path, kind, message) problems, kind being
+        "broken", "oversized" or "duplicate" (entry_path None), and the
+        number of local image references checked.
+        """
+        resolved = []
+        for entry_path, targets in references:
+            for target in targets:
+                path = resolve_target(target, entry_path, self.repo_path)
+                if path is not None:
+                    resolved.append((entry_path, target, os.path.abspath(path)))
+
+        unique = sorted({path for _, _, path in resolved})
+        infos = {}
+        if len(unique) >= PARALLEL_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                inspected = list(pool.map(self._inspect, unique))
+        else:
+            # starting threads costs more than a few stat calls
+            inspected = [self._inspect(key) for key in unique]
+        for key, info, cached in inspected:
+            infos[key] = info
+            if not info["exists"]:
+                continue
+            self.cache[key] = info
+            if cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        problems = []
+        for entry_path, target, path in resolved:
+            info = infos[path]
+            if not info["exists"]:
+                problems.append((entry_path, "broken", f"broken image link {target}"))
+                continue
+            too_big = info["size"] > MAX_IMAGE_BYTES
+            width, height = info["width"], info["height"]
+            too_wide = width is not None and max(width, height) > MAX_IMAGE_PIXELS
+            if too_big or too_wide:
+                dims = f"{width}x{height}, " if width is not None else ""
+                problems.append((entry_path, "oversized", f"oversized image {target} "
+                                             f"({dims}{info['size'] / 1024 / 1024:.1f} MB)"))
+
+        # identical files under different names: hash only files whose
+        # sizes collide
+        by_size = {}
+        for key, info in infos.items():
+            if info["exists"]:
+                by_size.setdefault(info["size"], []).append(key)
+        by_hash = {}
+        for keys in by_size.values():
+            if len(keys) > 1:
+                for key in keys:
+                    by_hash.setdefault(self._content_hash(key), []).append(key)
+        for keys in by_hash.values():
+            if len(keys) > 1:
+                names = ", ".join(os.path.relpath(k, self.repo_path) for k in sorted(keys))
+                problems.append((None, "duplicate", f"duplicate images with identical content: {names}"))
+
+        self.save(infos.keys() & self.cache.keys())
+        return problems, len(resolved)
@@ -0,0 +1,133 @@
+"""
+Structured results of the activity report.
+
+RepoResult holds what the markdown report shows for one repository, so the
+same numbers can be written as JSON per repository and as CSV/JSONL rows
+across many repositories, and loaded again for class-wide aggregation
+without re-analyzing anything.
+"""
+
+import csv
+import json
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Optional
+
+# Bump when fields change meaning; loaders accept older files with defaults
+RESULT_VERSION = 1
+
+
+@dataclass
+class RepoResult:
+    repo: str
+    entries: int = 0
+    hours: float = 0.0
+    weeks: list = field(default_factory=list)
+    images: int = 0
+    calculations: int = 0
+    avg_words: float = 0.0
+    issues: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    suggestions: list = field(default_factory=list)
+    image_refs: int = 0
+    broken_images: int = 0
+    oversized_images: int = 0
+    near_duplicates: int = 0
+    # commit history, None when it was not analyzed
+    commits: Optional[int] = None
+    burst_entries: Optional[int] = None
+    backfilled_entries: Optional[int] = None
+    report: str = ""
+    seconds: float = 0.0
+    version: int = RESULT_VERSION
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a result from a loaded dict, ignoring unknown keys."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def row(self):
+        """Flat dict for one CSV row: lists become counts or joined text."""
+        row = self.to_dict()
+        row["weeks"] = ";".join(map(str, self.weeks))
+        row["issues"] = len(self.issues)
+        row["warnings"] = len(self.warnings)
+        row["suggestions"] = len(self.suggestions)
+        return row
+
+
+CSV_FIELDS = [f.name for f in fields(RepoResult)]
+
+
+def write_json(result, path):
+    """Write one repository's result as a JSON document."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+class ResultWriter:
+    """
+    Streams results to a .jsonl or .csv file, one line per repository.
+
+    Each result is written and flushed as soon as it is added, so a long
+    batch run leaves a usable file even if it is interrupted.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if self.path.suffix not in ('.jsonl', '.csv'):
+            raise ValueError(f"Unsupported result format: {self.path.suffix} (use .jsonl or .csv)")
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        self._csv = None
+        if self.path.suffix == '.csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result):
+        if self._csv is not None:
+            self._csv.writerow(result.row())
+        else:
+            self._file.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_results(paths):
+    """
+    Load results from .json (one result), .jsonl (one per line) files or
+    folders of per-repository .json files. Other JSON files in a folder
+    (analysis caches, indexes) are skipped.
+    """
+    results = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.glob('*.json')):
+                # caches are large and never results, skip them unread
+                if '.cache.' in child.name:
+                    continue
+                with open(child, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and 'repo' in data:
+                    results.append(RepoResult.from_dict(data))
+        elif path.suffix == '.jsonl':
+            with open(path, 'r', encoding='utf-8') as f:
+                results += [RepoResult.from_dict(json.loads(line)) for line in f if line.strip()]
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                results.append(RepoResult.from_dict(json.load(f)))
+    return results
@@ -0,0 +1,216 @@
+"""
+Single-pass streaming content scanner for logbook entries.
+
+Reads an entry in fixed-size chunks and computes, in one pass and without
+building token lists:
+- word count (same `\\w+` definition the report has always used)
+- image references (`![...]` and `<img`) and their targets
+- math (`$$` display blocks, `\\[` and `\\(` delimiters)
+- fenced code blocks
+- heading counts per level
+
+Chunks are cut after the last newline (or, in a line longer than a chunk,
+the last whitespace before any unfinished image reference, since alt text
+and <img> attributes contain spaces), which no counted pattern contains, so
+the counts are identical to scanning the whole text at once while memory
+stays at one chunk regardless of file size. Image targets are matched
+within a line.
+"""
+
+import re
+
+from report_frontmatter import split_frontmatter
+
+CHUNK_SIZE = 64 * 1024
+# longest line start that decides a heading or fence
+LINE_HEAD_SIZE = 8
+# longest image reference kept whole when a line is cut between chunks
+MAX_REF_SIZE = 4096
+
+WORD_RE = re.compile(r'\w+')
+HEADING_RE = re.compile(r'^(#{1,6})[ \t]', re.MULTILINE)
+FENCE_RE = re.compile(r'^[ ]{0,3}(```|~~~)', re.MULTILINE)
+MD_IMAGE_RE = re.compile(r'!\[[^\]\n]*\]\(\s*(?:<([^>\n]+)>|([^)\s]+))')
+HTML_IMAGE_RE = re.compile(r'<img\b[^>]*?\bsrc\s*=\s*(?:"([^"\n]*)"|\'([^\'\n]*)\'|([^\s>]+))')
+
+
+def _unfinished_ref(text, cut):
+    """
+    Start of an image reference in text[:cut] that may continue after cut,
+    or cut if there is none; references longer than MAX_REF_SIZE are split.
+    """
+    start = cut
+    md = text.rfind('![', 0, cut)
+    if md >= 0 and cut - md <= MAX_REF_SIZE:
+        m = MD_IMAGE_RE.match(text, md, cut)
+        if m is None or m.end() >= cut:
+            start = md
+    html = text.rfind('<img', 0, cut)
+    if html >= 0 and cut - html <= MAX_REF_SIZE and '>' not in text[html:cut]:
+        start = min(start, html)
+    return start
+
+
+class ContentScanner:
+    def __init__(self, minhash=None):
+        """minhash: optional MinHasher fed with the body text"""
+        self.words = 0
+        self.image_refs = 0
+        self.image_targets = []
+        self.display_math = 0   # $$ delimiters
+        self.bracket_math = 0   # \[ delimiters
+        self.inline_math = 0    # \( delimiters
+        self.code_fences = 0
+        self.headings = [0] * 6
+
+        self._carry = ''
+        # start of the current line when a chunk ended inside it: headings
+        # and fences are decided by a line's first few characters. None
+        # once the current line has been decided.
+        self._line_head = ''
+        self._fence = None
+        self._structure = True
+        self.minhash = minhash
+
+    def feed_header(self, text):
+        """Scan frontmatter lines: counted as text, but not as headings/code."""
+        self._structure = False
+        self.feed(text)
+        self._structure = True
+
+    def feed(self, text):
+        """Scan the next piece of text."""
+        text = self._carry + text
+        # keep everything after the last newline (or, inside a very long
+        # line, the last whitespace) for the next piece
+        cut = text.rfind('\n') + 1
+        if cut == 0:
+            cut = len(text)
+            while cut > 0 and not text[cut - 1].isspace():
+                cut -= 1
+            cut = _unfinished_ref(text, cut)
+        if cut == 0:
+            # no whitespace at all yet, wait for more text
+            self._carry = text
+            return
+        self._carry = text[cut:]
+        self._scan(text[:cut])
+
+    def close(self):
+        """Scan any remaining text; call once after the last feed()."""
+        if self._carry:
+            self._scan(self._carry)
+            self._carry = ''
+        if self._line_head:
+            self._scan_lines(self._line_head, 0)
+            self._line_head = ''
+        return self
+
+    def _scan(self, segment):
+        if self.minhash is not None and self._structure:
+            words = WORD_RE.findall(segment)
+            self.words += len(words)
+            self.minhash.update(words)
+        else:
+            self.words += WORD_RE.subn('', segment)[1]
+        refs = segment.count('![') + segment.count('<img')
+        if refs:
+            self.image_refs += refs
+            for m in MD_IMAGE_RE.finditer(segment):
+                self.image_targets.append(m.group(1) or m.group(2))
+            for m in HTML_IMAGE_RE.finditer(segment):
+                self.image_targets.append(m.group(1) or m.group(2) or m.group(3))
+        self.display_math += segment.count('$$')
+        self.bracket_math += segment.count('\\[')
+        self.inline_math += segment.count('\\(')
+
+        if not self._structure:
+            self._line_head = '' if segment.endswith('\n') else None
+            return
+        # line-based structure
+        if self._line_head is None:
+            text = segment
+            newline = segment.find('\n')
+            start = len(segment) if newline < 0 else newline + 1
+        else:
+            text = self._line_head + segment
+            start = 0
+        end = text.rfind('\n') + 1
+        if end >= start and len(text) - end < LINE_HEAD_SIZE:
+            # last line is still undecided, scan it with the next segment
+            self._line_head = text[end:]
+        else:
+            end = len(text)
+            self._line_head = None
+        if '#' in text or '`' in text or '~' in text:
+            self._scan_lines(text[:end], start)
+
+    def _scan_lines(self, segment, start):
+        fences = [(m.start(), m.group(1)) for m in FENCE_RE.finditer(segment, start)]
+        if not fences and self._fence is None:
+            for m in HEADING_RE.finditer(segment, start):
+                self.headings[len(m.group(1)) - 1] += 1
+            return
+
+        # headings inside fenced code are comments, not structure
+        pos = start
+        for fence_pos, marker in fences + [(len(segment), None)]:
+            if self._fence is None:
+                for m in HEADING_RE.finditer(segment, pos, fence_pos):
+                    self.headings[len(m.group(1)) - 1] += 1
+            if marker is None:
+                break
+            if self._fence is None:
+                self._fence = marker
+                self.code_fences += 1
+            elif marker == self._fence:
+                self._fence = None
+            pos = fence_pos + 1
+
+    # results
+    # ==========================================
+    @property
+    def has_images(self):
+        return self.image_refs > 0
+
+    @property
+    def has_calculations(self):
+        return (self.display_math + self.bracket_math + self.inline_math) > 0
+
+    @property
+    def math_blocks(self):
+        return self.display_math // 2 + self.bracket_math + self.inline_math
+
+
+def scan_stream(f, chunk_size=CHUNK_SIZE, minhash=None):
+    """
+    Scan an open text file (or StringIO) holding one entry.
+
+    Returns (frontmatter_text, scanner); the frontmatter text is None when
+    the entry has no header.
+    """
+    scanner = ContentScanner(minhash)
+    header_lines = []
+
+    def lines():
+        for line in f:
+            header_lines.append(line)
+            yield line
+
+    frontmatter = split_frontmatter(lines())
+    if frontmatter is not None:
+        scanner.feed_header(''.join(header_lines))
+    else:
+        scanner.feed(''.join(header_lines))
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        scanner.feed(chunk)
+    return frontmatter, scanner.close()
+
+
+def scan_file(path, chunk_size=CHUNK_SIZE):
+    """Scan one entry file; see scan_stream()."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return scan_stream(f, chunk_size)
@@ -0,0 +1,188 @@
+"""
+Near-duplicate detection for logbook entries with MinHash and LSH.
+
+Each entry body is split into overlapping 5-word shingles while it is
+scanned, and the shingles are summarized in a MinHash signature (one
+permutation hashing: every shingle is hashed once and lands in one of
+SIGNATURE_SIZE bins, each bin keeps its minimum). The share
+of equal bins between two signatures estimates the Jaccard similarity of
+the entries.
+
+To avoid comparing every entry with every other one, signatures are cut
+into bands; entries that share any band are candidates, and only those
+pairs are compared. With 32 bands of 4 bins, pairs above about 70%
+similarity are found with near certainty and pairs below 30% are almost
+never compared, in roughly linear time.
+
+SimilarityIndex keeps the signatures of a whole class in a JSON file, so
+after a batch run the next run only needs the signatures of new or
+changed entries to check them against every team.
+"""
+
+import json
+import os
+import re
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+from pathlib import Path
+
+SHINGLE_WORDS = 5
+SIGNATURE_SIZE = 128
+BANDS = 32
+ROWS = SIGNATURE_SIZE // BANDS
+# Estimated similarity at which two entries are reported
+DUPLICATE_THRESHOLD = 0.7
+
+INDEX_VERSION = 1
+
+# array type code of an unsigned 32-bit int
+WORD_HASH_TYPE = 'I' if array('I').itemsize == 4 else 'L'
+
+WORD_RE = re.compile(r'\w+')
+
+HASH_BITS = 32
+# bins are picked by the top bits of a shingle's 32-bit hash
+BIN_SHIFT = HASH_BITS - (SIGNATURE_SIZE.bit_length() - 1)
+EMPTY = 1 << HASH_BITS
+# bytes of one shingle: one 32-bit hash per word
+SHINGLE_BYTES = 4 * SHINGLE_WORDS
+
+
+class MinHasher:
+    """Builds the MinHash signature of a text fed as consecutive word lists."""
+
+    def __init__(self):
+        self.bins = [EMPTY] * SIGNATURE_SIZE
+        self.shingles = 0
+        self._tail = []   # hashes of the last words of the previous piece
+        self._word_hashes = {}
+
+    def _hash_word(self, word):
+        h = self._word_hashes[word] = zlib.crc32(word.lower().encode('utf-8')) or 1
+        return h
+
+    def update(self, words):
+        """Add the next words of the body (as found by WORD_RE)."""
+        cache = self._word_hashes
+        hash_word = self._hash_word
+        h = self._tail + [cache.get(w) or hash_word(w) for w in words]
+        self._tail = h[-(SHINGLE_WORDS - 1):]
+        if len(h) < SHINGLE_WORDS:
+            return
+        # each shingle is hashed as the 20 bytes of its word hashes, which
+        # keeps the per-shingle work in C
+        data = array(WORD_HASH_TYPE, h)
+        if sys.byteorder == 'big':
+            data.byteswap()
+        data = data.tobytes()
+        crc32 = zlib.crc32
+        bins = self.bins
+        for i in range(0, len(data) - SHINGLE_BYTES + 4, 4):
+            x = crc32(data[i:i + SHINGLE_BYTES])
+            b = x >> BIN_SHIFT
+            if x < bins[b]:
+                bins[b] = x
+        self.shingles += len(h) - SHINGLE_WORDS + 1
+
+    def signature(self):
+        """The signature as a list of ints, or None for entries too short to compare."""
+        if self.shingles == 0:
+            return None
+        bins = self.bins
+        # empty bins borrow the next filled bin (rotation densification),
+        # offset by the distance so they stay comparable across entries
+        signature = list(bins)
+        for i in range(SIGNATURE_SIZE):
+            if bins[i] != EMPTY:
+                continue
+            for distance in range(1, SIGNATURE_SIZE):
+                j = (i + distance) % SIGNATURE_SIZE
+                if bins[j] != EMPTY:
+                    signature[i] = bins[j] + distance * EMPTY
+                    break
+        return signature
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / SIGNATURE_SIZE
+
+
+def find_pairs(signatures, threshold=DUPLICATE_THRESHOLD, skip=None):
+    """
+    Near-duplicate pairs among {key: signature}.
+
+    skip: optional function (key_a, key_b) -> True for pairs not to report
+    Returns (key_a, key_b, similarity) tuples, most similar first.
+    """
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            start = band * ROWS
+            buckets[(band, tuple(signature[start:start + ROWS]))].append(key)
+
+    pairs = {}
+    for keys in buckets.values():
+        if len(keys) < 2:
+            continue
+        for i, a in enumerate(keys):
+            for b in keys[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in pairs or (skip is not None and skip(*pair)):
+                    continue
+                pairs[pair] = similarity(signatures[a], signatures[b])
+    found = [(a, b, s) for (a, b), s in pairs.items() if s >= threshold]
+    return sorted(found, key=lambda p: (-p[2], p[0], p[1]))
+
+
+class SimilarityIndex:
+    """Signatures of every entry in a class, stored as {repo: {entry: signature}}."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.repos = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION and data.get("signature_size") == SIGNATURE_SIZE:
+            self.repos = data.get("repos", {})
+
+    def update(self, repo, signatures):
+        """Replace the signatures of one repository."""
+        self.repos[repo] = {entry: sig for entry, sig in signatures.items() if sig is not None}
+
+    def save(self):
+        data = {"version": INDEX_VERSION, "signature_size": SIGNATURE_SIZE, "repos": self.repos}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def find_pairs(self, threshold=DUPLICATE_THRESHOLD, repos=None):
+        """
+        Near-duplicate pairs between different repositories.
+
+        repos: only report pairs involving one of these repositories
+        (e.g. the ones graded in this run); all others are still compared
+        against them.
+        """
+        signatures = {(repo, entry): sig
+                      for repo, entries in self.repos.items()
+                      for entry, sig in entries.items()}
+        wanted = set(repos) if repos is not None else None
+
+        def skip(a, b):
+            if a[0] == b[0]:
+                return True  # same team, reported in its own report
+            return wanted is not None and a[0] not in wanted and b[0] not in wanted
+
+        return find_pairs(signatures, threshold, skip)
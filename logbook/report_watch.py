@@ -0,0 +1,187 @@
+"""
+Watch mode for the activity report.
+
+Keeps the analysis of every entry in memory and polls the `logbook/week-*`
+tree for changes:
+- directory modification times tell when files were added, removed or
+  renamed; only then is a directory listed again (with os.scandir)
+- every known entry is stat'ed, a changed size or mtime marks it touched
+- only touched entries are analyzed again before the report is rewritten
+
+The commit history is reloaded only when `.git/logs/HEAD` changes.
+"""
+
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from report_git import GitActivity
+from report_images import ImageChecker
+
+POLL_INTERVAL = 0.2
+
+
+def mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class EntryIndex:
+    """
+    In-memory per-entry results, used by LogbookGrader in place of the
+    on-disk cache. A row is reused while the file's size and mtime match.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.seen = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_analyze(self, entry_path, analyze):
+        st = os.stat(entry_path)
+        key = str(entry_path)
+        row = self.entries.get(key)
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            self.hits += 1
+        else:
+            self.misses += 1
+            row = (st.st_size, st.st_mtime_ns, analyze(entry_path))
+        self.seen[key] = row
+        return row[2]
+
+    def save(self):
+        """Drop rows of entries that were not seen in the last scan."""
+        self.entries = self.seen
+        self.seen = {}
+
+
+class TreeWatcher:
+    """Detects added, removed and modified entries under logbook/week-*."""
+
+    def __init__(self, logbook_path):
+        self.logbook_path = Path(logbook_path)
+        self.root_mtime = None
+        self.week_dirs = []
+        self.dirs = {}    # week dir -> (mtime_ns, [entry paths])
+        self.files = {}   # entry path -> (size, mtime_ns)
+
+    def _list_week_dirs(self):
+        try:
+            with os.scandir(self.logbook_path) as it:
+                return sorted(e.path for e in it if e.is_dir() and e.name.startswith('week-'))
+        except OSError:
+            return []
+
+    def _list_entries(self, week_dir):
+        try:
+            with os.scandir(week_dir) as it:
+                return [e.path for e in it
+                        if e.name.endswith('.md') and e.name != 'README.md' and e.is_file()]
+        except OSError:
+            return []
+
+    def poll(self):
+        """Return the set of entry paths changed since the last poll."""
+        # the logbook folder itself: week folders or README added/removed
+        changed = set()
+        root_mtime = mtime_ns(self.logbook_path)
+        if root_mtime != self.root_mtime:
+            self.root_mtime = root_mtime
+            self.week_dirs = self._list_week_dirs()
+            changed.add(str(self.logbook_path))
+
+        files = {}
+        dirs = {}
+        for week_dir in self.week_dirs:
+            mtime = mtime_ns(week_dir)
+            known = self.dirs.get(week_dir)
+            if known is not None and known[0] == mtime:
+                paths = known[1]
+            else:
+                paths = self._list_entries(week_dir)
+            dirs[week_dir] = (mtime, paths)
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (st.st_size, st.st_mtime_ns)
+                if self.files.get(path) != files[path]:
+                    changed.add(path)
+
+        changed.update(self.files.keys() - files.keys())
+        self.dirs = dirs
+        self.files = files
+        return changed
+
+
+class ReportWatcher:
+    """Regenerates one repository's report whenever its logbook changes."""
+
+    def __init__(self, grader_class, repo_path, output_path, use_git=True, interval=POLL_INTERVAL):
+        """
+        grader_class: LogbookGrader, built again for every regeneration
+        """
+        self.grader_class = grader_class
+        self.repo_path = Path(repo_path)
+        self.output_path = Path(output_path)
+        self.use_git = use_git
+        self.interval = interval
+        self.index = EntryIndex()
+        self.images = ImageChecker(self.repo_path)
+        self.tree = TreeWatcher(self.repo_path / "logbook")
+        self.git = None
+        self.git_log_mtime = None
+        self.grader = None
+
+    def _git_changed(self):
+        if not self.use_git:
+            return False
+        mtime = mtime_ns(self.repo_path / ".git" / "logs" / "HEAD")
+        if mtime == self.git_log_mtime and self.grader is not None:
+            return False
+        self.git_log_mtime = mtime
+        self.git = GitActivity.load(self.repo_path)
+        return True
+
+    def regenerate(self):
+        """Rewrite the report from the index; returns the grader."""
+        grader = self.grader_class(self.repo_path, use_git=self.git is not None, git_history=self.git)
+        grader.cache = self.index
+        grader.image_checker = self.images
+        report = grader.generate_report()
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+        self.grader = grader
+        return grader
+
+    def poll(self):
+        """Check for changes and regenerate if needed; returns the changed paths."""
+        changed = self.tree.poll()
+        if self._git_changed():
+            changed.add(".git")
+        if changed:
+            self.regenerate()
+        return changed
+
+    def run(self):
+        print(f"👀 Watching {self.tree.logbook_path} (Ctrl+C to stop)")
+        try:
+            while True:
+                start = time.perf_counter()
+                misses = self.index.misses
+                changed = self.poll()
+                if changed:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    stats = self.grader.stats
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] {self.output_path} updated in "
+                          f"{elapsed:.1f} ms ({self.index.misses - misses} entries analyzed): "
+                          f"{stats['total_entries']} entries, {stats['total_hours']:.1f} hours, "
+                          f"{len(self.grader.warnings)} warnings", flush=True)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
@@ -0,0 +1,5 @@
+"""
+Simulation package
+Drop-in stand-ins for the PiCar-X hardware libraries, for running and
+benchmarking code without a car
+"""
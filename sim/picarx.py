@@ -0,0 +1,326 @@
+"""
+Simulated PiCar-X backend.
+
+Provides a Picarx class with the same interface as the real one, driving a
+simple kinematic car model instead of the Robot HAT. The car starts on a
+straight dark line along the x axis; obstacles are points in the plane that
+the ultrasonic sensor sees when they are inside its cone.
+
+Run any script against the simulator by putting this folder first on the
+import path:
+    PYTHONPATH=sim python examples/04_ultrasonic_obstacle_avoidance.py
+
+Or use it directly:
+    from sim.picarx import Picarx, SimWorld
+    world = SimWorld()
+    px = Picarx(world=world)
+    world.place_obstacle_ahead(15)
+"""
+
+import math
+import random
+import threading
+import time
+
+# Car geometry (cm)
+WHEELBASE = 9.5
+TRACK_WIDTH = 11.0
+SENSOR_FORWARD = 8.0
+SENSOR_SPACING = 2.0
+
+# Drive model: cm/s per percent of motor power
+SPEED_PER_POWER = 0.6
+
+# Grayscale readings over the line, the floor and a cliff
+LINE_HALF_WIDTH = 1.0
+LINE_VALUE = 300
+BACKGROUND_VALUE = 1300
+GRAYSCALE_NOISE = 20
+
+# Ultrasonic sensor
+ULTRASONIC_HALF_ANGLE = math.radians(15)
+ULTRASONIC_MAX_RANGE = 300.0
+ULTRASONIC_US_PER_CM = 58  # echo round trip
+
+
+def constrain(value, lo, hi):
+    return max(lo, min(hi, value))
+
+
+class SimWorld:
+    def __init__(self, clock=time.monotonic, realtime=True, stationary=False, seed=None,
+                 steering_offset=0.0, motor_polarity=(1, 1), motor_gain=(1.0, 1.0)):
+        """
+        clock: time source used to integrate the car's motion
+        realtime: sleep for the sensor read times a real sensor would take
+        stationary: wheels off the ground, commands are accepted but the car
+            never moves (like bench testing on a stand)
+        seed: seed for the sensor noise
+        steering_offset: misalignment of the steering linkage (deg), added
+            to every steering angle; the calibration offset cancels it
+        motor_polarity: (left, right) wiring of the motors, -1 for a motor
+            that turns backward on a forward command
+        motor_gain: (left, right) speed of each wheel relative to the model,
+            e.g. (1.0, 0.95) for a weaker right motor
+        """
+        self.clock = clock
+        self.realtime = realtime
+        self.stationary = stationary
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # car pose: x forward along the line, y to the left, heading in rad
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.last_update = clock()
+
+        # wheel powers as commanded (%), and the steering wheel angle (deg)
+        self.left_power = 0.0
+        self.right_power = 0.0
+        self.steering = 0.0
+
+        # actuator faults
+        self.steering_offset = steering_offset
+        self.motor_polarity = list(motor_polarity)
+        self.motor_gain = list(motor_gain)
+
+        self.obstacles = []
+        self.line = True
+        self.cliff = False
+
+    def update(self):
+        """Integrate the car's motion up to the current time."""
+        with self.lock:
+            now = self.clock()
+            dt = now - self.last_update
+            self.last_update = now
+            if dt <= 0 or self.stationary:
+                return
+            v_left = self.left_power * self.motor_polarity[0] * self.motor_gain[0] * SPEED_PER_POWER
+            v_right = self.right_power * self.motor_polarity[1] * self.motor_gain[1] * SPEED_PER_POWER
+            v = (v_left + v_right) / 2
+            # positive steering angles turn right (clockwise)
+            steering = self.steering + self.steering_offset
+            yaw_rate = (v_right - v_left) / TRACK_WIDTH
+            yaw_rate -= v * math.tan(math.radians(steering)) / WHEELBASE
+            self.heading += yaw_rate * dt
+            self.x += v * math.cos(self.heading) * dt
+            self.y += v * math.sin(self.heading) * dt
+
+    def place_obstacle_ahead(self, distance):
+        """Put an obstacle `distance` cm straight in front of the car."""
+        self.update()
+        with self.lock:
+            self.obstacles.append((
+                self.x + distance * math.cos(self.heading),
+                self.y + distance * math.sin(self.heading),
+            ))
+
+    def clear_obstacles(self):
+        with self.lock:
+            self.obstacles = []
+
+    def read_distance(self):
+        self.update()
+        with self.lock:
+            nearest = ULTRASONIC_MAX_RANGE
+            for ox, oy in self.obstacles:
+                dx, dy = ox - self.x, oy - self.y
+                dist = math.hypot(dx, dy)
+                bearing = math.atan2(dy, dx) - self.heading
+                bearing = (bearing + math.pi) % (2 * math.pi) - math.pi
+                if abs(bearing) <= ULTRASONIC_HALF_ANGLE and dist < nearest:
+                    nearest = dist
+        if self.realtime:
+            time.sleep(nearest * ULTRASONIC_US_PER_CM * 1e-6)
+        return round(nearest, 2)
+
+    def read_grayscale(self):
+        self.update()
+        with self.lock:
+            cos_h, sin_h = math.cos(self.heading), math.sin(self.heading)
+            values = []
+            # left, middle, right
+            for lateral in (SENSOR_SPACING, 0.0, -SENSOR_SPACING):
+                sy = self.y + SENSOR_FORWARD * sin_h + lateral * cos_h
+                if self.cliff:
+                    base = 0
+                elif self.line and abs(sy) <= LINE_HALF_WIDTH:
+                    base = LINE_VALUE
+                else:
+                    base = BACKGROUND_VALUE
+                noise = self.random.gauss(0, GRAYSCALE_NOISE)
+                values.append(int(constrain(base + noise, 0, 4095)))
+        return values
+
+
+DEFAULT_WORLD = SimWorld()
+
+
+class _Ultrasonic:
+    def __init__(self, world):
+        self.world = world
+
+    def read(self, times=10):
+        return self.world.read_distance()
+
+
+class _Grayscale:
+    def __init__(self, world, reference):
+        self.world = world
+        self._reference = reference
+
+    def read(self):
+        return self.world.read_grayscale()
+
+    def read_status(self, datas=None):
+        if datas is None:
+            datas = self.read()
+        return [0 if data > self._reference[i] else 1 for i, data in enumerate(datas)]
+
+
+class Picarx:
+    CONFIG = '/opt/picar-x/picar-x.conf'
+
+    DEFAULT_LINE_REF = [1000, 1000, 1000]
+    DEFAULT_CLIFF_REF = [500, 500, 500]
+
+    DIR_MIN = -30
+    DIR_MAX = 30
+    CAM_PAN_MIN = -90
+    CAM_PAN_MAX = 90
+    CAM_TILT_MIN = -35
+    CAM_TILT_MAX = 65
+
+    def __init__(self, servo_pins=None, motor_pins=None, grayscale_pins=None,
+                 ultrasonic_pins=None, config=CONFIG, world=None):
+        self.world = world if world is not None else DEFAULT_WORLD
+
+        self.dir_cali_val = 0.0
+        self.cam_pan_cali_val = 0.0
+        self.cam_tilt_cali_val = 0.0
+        self.cali_dir_value = [1, 1]
+        self.cali_speed_value = [0, 0]
+        self.dir_current_angle = 0
+        self.cam_pan_angle = 0
+        self.cam_tilt_angle = 0
+        self.motor_speeds = [0, 0]
+
+        self.line_reference = list(self.DEFAULT_LINE_REF)
+        self.cliff_reference = list(self.DEFAULT_CLIFF_REF)
+        self.grayscale = _Grayscale(self.world, self.line_reference)
+        self.ultrasonic = _Ultrasonic(self.world)
+
+        # number of commands that would have been Robot HAT bus transactions
+        self.bus_writes = 0
+
+    # motors
+    # ==========================================
+    def set_motor_speed(self, motor, speed):
+        """motor: 1 (left) or 2 (right), speed: -100..100"""
+        speed = constrain(speed, -100, 100)
+        self.bus_writes += 1
+        self.motor_speeds[motor - 1] = speed
+        self.world.update()
+        with self.world.lock:
+            power = speed * self.cali_dir_value[motor - 1]
+            if motor == 1:
+                self.world.left_power = power
+            else:
+                self.world.right_power = power
+
+    def set_power(self, speed):
+        self.set_motor_speed(1, speed)
+        self.set_motor_speed(2, speed)
+
+    def forward(self, speed):
+        # same inner-wheel power reduction as the real Picarx
+        current_angle = self.dir_current_angle
+        if current_angle != 0:
+            abs_current_angle = min(abs(current_angle), self.DIR_MAX)
+            power_scale = (100 - abs_current_angle) / 100.0
+            if current_angle > 0:
+                self.set_motor_speed(1, speed)
+                self.set_motor_speed(2, speed * power_scale)
+            else:
+                self.set_motor_speed(1, speed * power_scale)
+                self.set_motor_speed(2, speed)
+        else:
+            self.set_motor_speed(1, speed)
+            self.set_motor_speed(2, speed)
+
+    def backward(self, speed):
+        self.forward(-speed)
+
+    def stop(self):
+        self.set_motor_speed(1, 0)
+        self.set_motor_speed(2, 0)
+
+    def motor_direction_calibrate(self, motor, value):
+        if value in (1, -1):
+            self.cali_dir_value[motor - 1] = value
+
+    def motor_speed_calibration(self, value):
+        self.cali_speed_value = [0 - value, 0] if value < 0 else [0, value]
+
+    # servos
+    # ==========================================
+    def set_dir_servo_angle(self, value):
+        self.bus_writes += 1
+        self.dir_current_angle = constrain(value, self.DIR_MIN, self.DIR_MAX)
+        self.world.update()
+        with self.world.lock:
+            self.world.steering = self.dir_current_angle + self.dir_cali_val
+
+    def dir_servo_calibrate(self, value):
+        self.dir_cali_val = value
+        self.set_dir_servo_angle(0)
+
+    def set_cam_pan_angle(self, value):
+        self.bus_writes += 1
+        self.cam_pan_angle = constrain(value, self.CAM_PAN_MIN, self.CAM_PAN_MAX)
+
+    def cam_pan_servo_calibrate(self, value):
+        self.cam_pan_cali_val = value
+        self.set_cam_pan_angle(0)
+
+    def set_cam_tilt_angle(self, value):
+        self.bus_writes += 1
+        self.cam_tilt_angle = constrain(value, self.CAM_TILT_MIN, self.CAM_TILT_MAX)
+
+    def cam_tilt_servo_calibrate(self, value):
+        self.cam_tilt_cali_val = value
+        self.set_cam_tilt_angle(0)
+
+    # sensors
+    # ==========================================
+    def get_distance(self):
+        return self.ultrasonic.read()
+
+    def get_grayscale_data(self):
+        return self.grayscale.read()
+
+    def get_line_status(self, gm_val_list):
+        return self.grayscale.read_status(gm_val_list)
+
+    def get_cliff_status(self, gm_val_list):
+        for i in range(3):
+            if gm_val_list[i] <= self.cliff_reference[i]:
+                return True
+        return False
+
+    def set_grayscale_reference(self, value):
+        self.set_line_reference(value)
+
+    def set_line_reference(self, value):
+        self.line_reference[:] = value
+
+    def set_cliff_reference(self, value):
+        self.cliff_reference[:] = value
+
+    def reset(self):
+        self.stop()
+        self.set_dir_servo_angle(0)
+        self.set_cam_tilt_angle(0)
+        self.set_cam_pan_angle(0)
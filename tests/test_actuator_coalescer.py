@@ -0,0 +1,83 @@
+"""
+Tests for the actuator command coalescer (utils/actuator_coalescer.py)
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.actuator_coalescer import CoalescingPicarx
+
+
+class RecordingPicarx:
+    """Records bus writes; forward() can be held mid-write."""
+
+    def __init__(self):
+        self.writes = []
+        self.in_forward = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def set_dir_servo_angle(self, value):
+        self.writes.append(("steering", value))
+
+    def set_cam_pan_angle(self, value):
+        self.writes.append(("pan", value))
+
+    def set_cam_tilt_angle(self, value):
+        self.writes.append(("tilt", value))
+
+    def forward(self, speed):
+        self.in_forward.set()
+        self.release.wait(5)
+        self.writes.append(("forward", speed))
+
+    def backward(self, speed):
+        self.writes.append(("backward", speed))
+
+    def stop(self):
+        self.writes.append(("stop", 0))
+
+
+def test_repeated_commands_are_coalesced():
+    px = RecordingPicarx()
+    car = CoalescingPicarx(px)
+    for _ in range(10):
+        car.set_dir_servo_angle(20)
+        car.forward(30)
+    assert px.writes == [("steering", 20), ("forward", 30)]
+    assert car.stats() == {"calls": 20, "writes": 2, "saved": 18}
+
+
+def test_steering_change_rewrites_the_motors():
+    px = RecordingPicarx()
+    car = CoalescingPicarx(px)
+    car.forward(30)
+    car.set_dir_servo_angle(20)
+    car.forward(30)
+    assert px.writes == [("forward", 30), ("steering", 20), ("forward", 30)]
+
+
+def test_stop_from_another_thread_waits_for_the_write_in_progress():
+    px = RecordingPicarx()
+    car = CoalescingPicarx(px)
+    px.release.clear()
+    loop = threading.Thread(target=car.forward, args=(40,))
+    loop.start()
+    assert px.in_forward.wait(5)
+
+    # the watchdog stops while the control loop is inside its motor write
+    watchdog = threading.Thread(target=car.stop, kwargs={"force": True})
+    watchdog.start()
+    watchdog.join(0.05)
+    assert watchdog.is_alive()
+
+    px.release.set()
+    loop.join(5)
+    watchdog.join(5)
+    assert px.writes == [("forward", 40), ("stop", 0)]
+    # the cached state matches the bus: a repeated stop is coalesced
+    car.stop()
+    assert px.writes[-1] == ("stop", 0) and len(px.writes) == 2
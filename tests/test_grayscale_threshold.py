@@ -0,0 +1,73 @@
+"""
+Tests for the histogram-based grayscale calibration (utils/grayscale_threshold.py)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+np = pytest.importorskip("numpy")
+
+from utils.grayscale_threshold import calibrate_cliff, calibrate_line, otsu_threshold, split_channel
+
+
+def two_surfaces(dark, bright, sigma=10, n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.normal(dark, sigma, n), rng.normal(bright, sigma, n)])
+
+
+def test_otsu_splits_between_two_surfaces():
+    values = two_surfaces(200, 1200)
+    threshold, separability = otsu_threshold(values)
+    # any threshold in the empty gap maximises the between-class variance
+    assert values[:2000].max() <= threshold < values[2000:].min()
+    assert separability > 0.95
+
+
+def test_otsu_constant_input_has_no_split():
+    assert otsu_threshold([500] * 50) == (500.0, 0.0)
+
+
+def test_otsu_single_surface_is_not_separable():
+    rng = np.random.default_rng(1)
+    _, separability = otsu_threshold(rng.normal(800, 30, 4000))
+    assert separability < 0.8
+
+
+def test_split_channel_rejects_one_surface_and_overlap():
+    # a few outliers are not a second surface
+    values = np.concatenate([np.full(1000, 800.0), np.full(10, 100.0)])
+    assert split_channel(values)["reason"] == "only one surface seen"
+
+    overlapping = split_channel(two_surfaces(500, 530, sigma=20))
+    assert not overlapping["ok"]
+    assert "overlap" in overlapping["reason"]
+
+
+def test_calibrate_line_puts_reference_in_the_gap():
+    channel = two_surfaces(200, 1200)
+    samples = np.stack([channel, channel + 100, channel - 50], axis=1)
+    result = calibrate_line(samples)
+    assert result["ok"], result["reason"]
+    for reference, offset in zip(result["reference"], (0, 100, -50)):
+        assert 500 + offset < reference < 900 + offset
+    assert min(result["margins"]) > 20
+
+
+def test_calibrate_line_needs_enough_samples_and_margin():
+    assert calibrate_line(np.zeros((10, 3)))["reason"] == "not enough samples"
+    channel = two_surfaces(500, 560, sigma=2)
+    result = calibrate_line(np.stack([channel] * 3, axis=1), min_margin=50)
+    assert not result["ok"]
+    assert "margin" in result["reason"]
+
+
+def test_calibrate_cliff_sits_between_cliff_and_line():
+    line = np.stack([two_surfaces(400, 1200)] * 3, axis=1)
+    cliff = np.random.default_rng(2).normal(50, 5, (200, 3))
+    result = calibrate_cliff(cliff, line)
+    assert result["ok"], result["reason"]
+    assert all(70 < reference < 370 for reference in result["reference"])
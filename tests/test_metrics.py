@@ -0,0 +1,38 @@
+"""
+Tests for the metrics endpoint (utils/metrics.py)
+"""
+
+import os
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import metrics
+
+
+def serve_and_get(registry, host=None):
+    server = metrics.serve(0, host, registry)
+    try:
+        assert server.wait_bound(5.0)
+        address, port = server._bound[0].server_address[:2]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            return address, response.read().decode()
+    finally:
+        server.shutdown()
+
+
+def test_serves_on_loopback_by_default(monkeypatch):
+    monkeypatch.delenv("PICARX_METRICS_HOST", raising=False)
+    registry = metrics.Registry()
+    registry.counter("picarx_test_total", "Test counter").inc(3)
+    address, text = serve_and_get(registry)
+    assert address == "127.0.0.1"
+    assert "picarx_test_total 3" in text
+
+
+def test_network_exposure_is_opt_in(monkeypatch):
+    monkeypatch.setenv("PICARX_METRICS_HOST", "0.0.0.0")
+    assert serve_and_get(metrics.Registry())[0] == "0.0.0.0"
+    # an explicit host wins over the environment
+    assert serve_and_get(metrics.Registry(), host="127.0.0.1")[0] == "127.0.0.1"
@@ -0,0 +1,83 @@
+"""
+Tests for trajectory compilation and playback (utils/motion.py)
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sim.picarx import Picarx, SimWorld
+from utils.motion import RAMP, MotionEngine, Trajectory
+
+
+def test_compile_interpolates_ramps():
+    trajectory = Trajectory({"steering": [(0.0, 0), (1.0, 30)]})
+    table = trajectory.compile(rate=10)["steering"]
+    assert len(table) == 11
+    assert table[0] == 0 and table[-1] == 30
+    assert table[5] == pytest.approx(15)
+
+
+def test_compile_jump_takes_the_later_value():
+    trajectory = Trajectory.sequence([(0.5, {"steering": -30}), (0.5, {"steering": 30})])
+    table = trajectory.compile(rate=10)["steering"]
+    assert table[:5] == [-30] * 5
+    # the jump is at 0.5 s: the sample there holds the value after it
+    assert table[5:] == [30] * 6
+
+
+def test_sequence_holds_unnamed_channels_and_ramps_from_previous_value():
+    trajectory = Trajectory.sequence([
+        (1.0, {"steering": 10, "motor": 20}),
+        (1.0, {"steering": 30}, RAMP),
+    ])
+    assert trajectory.duration == 2.0
+    tables = trajectory.compile(rate=4)
+    assert tables["motor"] == [20] * 9
+    assert tables["steering"][:5] == [10] * 5
+    assert tables["steering"][6] == pytest.approx(20)
+    assert tables["steering"][-1] == 30
+
+
+def test_compile_is_cached_until_a_keyframe_is_added():
+    trajectory = Trajectory({"pan": [(0.0, 0), (0.1, 10)]})
+    first = trajectory.compile(rate=100)
+    assert trajectory.compile(rate=100) is first
+    trajectory.add("pan", 0.2, 20)
+    assert trajectory.compile(rate=100)["pan"][-1] == 20
+
+
+def test_empty_trajectory_compiles_to_one_sample():
+    assert Trajectory().duration == 0.0
+    assert Trajectory().compile() == {}
+
+
+def test_keyframes_must_be_in_order_on_known_channels():
+    with pytest.raises(ValueError):
+        Trajectory({"wheel": [(0.0, 1)]})
+    trajectory = Trajectory({"tilt": [(1.0, 0)]})
+    with pytest.raises(ValueError):
+        trajectory.add("tilt", 0.5, 10)
+
+
+def test_engine_only_ticks_while_playing():
+    engine = MotionEngine(Picarx(world=SimWorld(stationary=True)))
+    engine.start()
+    try:
+        time.sleep(0.1)
+        assert engine.ticks == 0
+        playback = engine.play(Trajectory.sequence([(0.05, {"steering": 20})]))
+        assert playback.wait(2.0)
+        ticks = engine.ticks
+        assert ticks > 0
+        time.sleep(0.1)
+        assert engine.ticks == ticks
+        # and wakes again for the next one
+        assert engine.play(Trajectory.sequence([(0.05, {"steering": 0})])).wait(2.0)
+        assert engine.ticks > ticks
+    finally:
+        engine.stop()
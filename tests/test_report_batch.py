@@ -0,0 +1,34 @@
+"""
+Tests for batch report naming (logbook/generate_activity_report.py)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logbook')))
+
+from generate_activity_report import find_repos, report_names
+
+
+def test_report_names_keep_folder_names_when_unique(tmp_path):
+    repos = [tmp_path / "2024" / "team-a", tmp_path / "2024" / "team-b"]
+    assert report_names(repos) == ["team-a", "team-b"]
+
+
+def test_report_names_prepend_parents_on_clash(tmp_path):
+    repos = [tmp_path / "2024" / "team-a", tmp_path / "2025" / "team-a", tmp_path / "2025" / "team-b"]
+    assert report_names(repos) == ["2024-team-a", "2025-team-a", "team-b"]
+
+
+def test_report_names_identical_paths_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        report_names([tmp_path / "team-a", tmp_path / "team-a"])
+
+
+def test_find_repos_drops_repeated_manifest_lines(tmp_path):
+    (tmp_path / "team-a").mkdir()
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text(f"# class list\n{tmp_path / 'team-a'}\n{tmp_path}/./team-a\n\n")
+    assert find_repos(manifest=manifest) == [tmp_path / "team-a"]
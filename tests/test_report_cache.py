@@ -0,0 +1,105 @@
+"""
+Tests for the per-entry analysis cache (logbook/report_cache.py)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logbook')))
+
+import report_cache
+from report_cache import EntryCache
+
+OLD_NS = 1_000_000_000_000_000_000  # well before any save in these tests
+
+
+class Analyzer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path):
+        self.calls.append(os.path.basename(path))
+        with open(path, encoding='utf-8') as f:
+            return {"words": len(f.read().split())}
+
+
+def write_entry(path, text, mtime_ns=OLD_NS):
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def run(tmp_path, entries, analyze):
+    cache = EntryCache(tmp_path / "cache.json", tmp_path)
+    results = {entry.name: cache.get_or_analyze(entry, analyze) for entry in entries}
+    cache.save()
+    return cache, results
+
+
+def test_unchanged_entries_are_not_read_again(tmp_path):
+    entry = tmp_path / "week1.md"
+    write_entry(entry, "one two three")
+    analyze = Analyzer()
+    run(tmp_path, [entry], analyze)
+    cache, results = run(tmp_path, [entry], analyze)
+    assert analyze.calls == ["week1.md"]
+    assert results == {"week1.md": {"words": 3}}
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_changed_content_is_analyzed_again(tmp_path):
+    entry = tmp_path / "week1.md"
+    write_entry(entry, "one two three")
+    analyze = Analyzer()
+    run(tmp_path, [entry], analyze)
+    write_entry(entry, "one two three four", mtime_ns=OLD_NS + 1)
+    cache, results = run(tmp_path, [entry], analyze)
+    assert results["week1.md"] == {"words": 4}
+    assert analyze.calls == ["week1.md", "week1.md"]
+    assert cache.misses == 1
+
+
+def test_touched_and_renamed_entries_hit_by_hash(tmp_path):
+    entry = tmp_path / "week1.md"
+    write_entry(entry, "one two three")
+    analyze = Analyzer()
+    run(tmp_path, [entry], analyze)
+
+    os.utime(entry, ns=(OLD_NS + 5, OLD_NS + 5))
+    moved = tmp_path / "week01.md"
+    entry.rename(moved)
+    cache, results = run(tmp_path, [moved], analyze)
+    assert results == {"week01.md": {"words": 3}}
+    assert analyze.calls == ["week1.md"]
+    # the old path is dropped on save
+    assert list(json.loads((tmp_path / "cache.json").read_text())["entries"]) == ["week01.md"]
+
+
+def test_recently_modified_rows_are_checked_by_hash(tmp_path):
+    entry = tmp_path / "week1.md"
+    entry.write_text("one two three", encoding='utf-8')   # modified just before the save
+    analyze = Analyzer()
+    run(tmp_path, [entry], analyze)
+    stat = os.stat(entry)
+
+    # rewritten within the timestamp resolution: same size and mtime
+    entry.write_text("four five 6!!", encoding='utf-8')
+    os.utime(entry, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(entry).st_size == stat.st_size
+    run(tmp_path, [entry], analyze)
+    assert analyze.calls == ["week1.md", "week1.md"]
+
+
+def test_version_bump_or_corrupt_file_starts_empty(tmp_path, monkeypatch):
+    entry = tmp_path / "week1.md"
+    write_entry(entry, "one two three")
+    analyze = Analyzer()
+    run(tmp_path, [entry], analyze)
+
+    monkeypatch.setattr(report_cache, "CACHE_VERSION", report_cache.CACHE_VERSION + 1)
+    assert EntryCache(tmp_path / "cache.json", tmp_path).entries == {}
+
+    (tmp_path / "cache.json").write_text("{not json")
+    cache, _ = run(tmp_path, [entry], analyze)
+    assert cache.misses == 1
+    assert len(analyze.calls) == 2
@@ -0,0 +1,89 @@
+"""
+Tests for the frontmatter fast path (logbook/report_frontmatter.py), which
+must agree with yaml.safe_load() and the original regex
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logbook')))
+
+yaml = pytest.importorskip("yaml")
+
+import report_frontmatter
+from report_frontmatter import FRONTMATTER_RE, load_frontmatter, parse_simple, split_frontmatter
+
+# headers the fast parser handles itself
+SIMPLE = [
+    "title: Week 3\ndate: 2024-02-05\nweek: 3\nhours: 4.5\nstatus: done",
+    "title: 'Quoted: yes'\nauthor: \"A. Student\"\ntags: [motors, sensors, 3]",
+    "draft: no\nreviewed: True\nnotes: ~\nempty:\ntags: []",
+    "steps: +12\nversion: 1.0.0\n# a comment\n\ntitle: x",
+    "title: Ducks & geese\nurl: http://example.com/a#b",
+]
+
+# headers that need the YAML loader
+FALLBACK = [
+    "title: Week 3\nitems:\n  - one\n  - two",
+    "title: \"escaped \\\" quote\"",
+    "week: 007\nhours: .5",
+    "title: a: b",
+    "title: value # trailing comment",
+    "when: 2024-02-05 10:30:00",
+    "anchor: &a 1\ncopy: *a",
+    "size: 0x1F\nratio: 1e3",
+    "title: |\n  block\n  text",
+    "\ttitle: tab",
+    "- just\n- a list",
+    "title: [unclosed",
+]
+
+
+@pytest.mark.parametrize("text", SIMPLE)
+def test_fast_path_matches_yaml(text):
+    assert parse_simple(text) == yaml.safe_load(text)
+
+
+@pytest.mark.parametrize("text", FALLBACK)
+def test_other_headers_fall_back_to_yaml(text):
+    with pytest.raises(report_frontmatter._Fallback):
+        parse_simple(text)
+    try:
+        expected = yaml.safe_load(text)
+    except yaml.YAMLError:
+        expected = None
+    assert load_frontmatter(text) == expected
+
+
+def test_invalid_or_missing_header_is_none():
+    assert load_frontmatter(None) is None
+    assert load_frontmatter("title: [a, b\nweek: 1") is None
+
+
+def test_impossible_date_raises_like_yaml():
+    with pytest.raises(ValueError):
+        yaml.safe_load("date: 2024-02-30")
+    with pytest.raises(ValueError):
+        load_frontmatter("date: 2024-02-30")
+
+
+@pytest.mark.parametrize("text", [
+    "---\ntitle: x\n---\nbody",
+    "---\n\n\ntitle: x\n---\nbody\n---\nmore",
+    "---   \ntitle: x\n---\n",
+    "---\n---\ntitle: x\n---\n",
+    "---\ntitle: x\n",
+    "title: x\n---\n",
+    "",
+])
+def test_split_reads_only_the_header_like_the_regex(text):
+    match = FRONTMATTER_RE.match(text)
+    assert split_frontmatter(text.splitlines(keepends=True)) == (match.group(1) if match else None)
+
+
+def test_split_stops_at_the_closing_line():
+    lines = iter(["---\n", "title: x\n", "---\n", "body\n"])
+    assert split_frontmatter(lines) == "title: x"
+    assert next(lines) == "body\n"
@@ -0,0 +1,44 @@
+"""
+Tests for loading structured report results (logbook/report_model.py)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logbook')))
+
+from report_model import RepoResult, ResultWriter, load_results, write_json
+
+
+def test_load_results_folder_skips_caches_and_indexes(tmp_path):
+    write_json(RepoResult("team-a", entries=3), tmp_path / "team-a-report.json")
+    write_json(RepoResult("team-b", entries=5), tmp_path / "team-b-report.json")
+    # files a batch run writes next to the results
+    (tmp_path / "team-a-report.cache.json").write_text(json.dumps({"entries": {}}))
+    (tmp_path / "team-a-report.cache.images.json").write_text(json.dumps({"images": {}}))
+    (tmp_path / "similarity.json").write_text(json.dumps({"version": 1, "repos": {}}))
+    (tmp_path / "list.json").write_text(json.dumps([1, 2, 3]))
+
+    results = load_results([tmp_path])
+    assert [(r.repo, r.entries) for r in results] == [("team-a", 3), ("team-b", 5)]
+
+
+def test_load_results_jsonl_and_unknown_keys(tmp_path):
+    path = tmp_path / "results.jsonl"
+    with ResultWriter(path) as writer:
+        writer.write(RepoResult("team-a", hours=1.5))
+        writer.write(RepoResult("team-b", weeks=[1, 2]))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("\n" + json.dumps({"repo": "team-c", "added_later": True}) + "\n")
+
+    results = load_results([path])
+    assert [r.repo for r in results] == ["team-a", "team-b", "team-c"]
+    assert results[0].hours == 1.5
+    assert results[1].weeks == [1, 2]
+
+
+def test_load_results_single_file(tmp_path):
+    path = tmp_path / "grading_report.json"
+    write_json(RepoResult("solo", calculations=2), path)
+    assert load_results([path]) == [RepoResult("solo", calculations=2)]
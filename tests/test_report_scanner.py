@@ -0,0 +1,90 @@
+"""
+Tests for the streaming content scanner (logbook/report_scanner.py)
+"""
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logbook')))
+
+from report_scanner import CHUNK_SIZE, ContentScanner, scan_stream
+
+ENTRY = """---
+date: 2025-01-08
+---
+# Motor tests
+
+Measured the **duty cycle** with $$ v = d \\cdot V_{bat} $$ and \\(f = 1/T\\).
+
+![scope capture of the PWM](images/scope.png)
+<img alt="wiring diagram" src="images/wiring.jpg" width=300>
+
+```python
+# not a heading
+print("hi")
+```
+
+## Results
+Speed was about 0.4 m/s at 30% power.
+"""
+
+
+def counts(scanner):
+    return (scanner.words, scanner.image_refs, scanner.image_targets, scanner.display_math,
+            scanner.bracket_math, scanner.inline_math, scanner.code_fences, scanner.headings)
+
+
+def whole(text):
+    scanner = ContentScanner()
+    scanner.feed(text)
+    return counts(scanner.close())
+
+
+def test_entry_counts():
+    frontmatter, scanner = scan_stream(io.StringIO(ENTRY))
+    assert frontmatter is not None
+    assert scanner.image_targets == ["images/scope.png", "images/wiring.jpg"]
+    assert scanner.image_refs == 2
+    assert scanner.code_fences == 1
+    assert scanner.headings[:2] == [1, 1]
+    assert scanner.has_calculations and scanner.math_blocks == 2
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 64])
+def test_chunk_boundaries_do_not_change_counts(chunk_size):
+    body = ENTRY.split("---\n", 2)[2]
+    _, scanner = scan_stream(io.StringIO(body), chunk_size)
+    assert counts(scanner) == whole(body)
+
+
+@pytest.mark.parametrize("chunk_size", [4, 9, 13, 31])
+def test_references_with_spaces_in_one_long_line(chunk_size):
+    # no newline for the scanner to cut at, only spaces, some of them
+    # inside the references
+    line = ("word " * 7 + '![alt text with spaces](images/a.png) '
+            + "more words " * 5 + '<img alt="a b c" src="images/b.png"> end')
+    _, scanner = scan_stream(io.StringIO(line), chunk_size)
+    assert scanner.image_targets == ["images/a.png", "images/b.png"]
+    assert counts(scanner) == whole(line)
+
+
+def test_image_across_chunk_boundary_in_line_longer_than_a_chunk():
+    prefix = "x " * (CHUNK_SIZE // 2 - 10)
+    line = (prefix + '![a long alt text](images/first.png) ' + "y " * CHUNK_SIZE
+            + '<img alt="two words" src="images/second.png"> done\n')
+    assert len(line) > 2 * CHUNK_SIZE
+    _, scanner = scan_stream(io.StringIO(line))
+    assert scanner.image_targets == ["images/first.png", "images/second.png"]
+    assert counts(scanner) == whole(line)
+
+
+def test_unfinished_bracket_text_is_not_held_forever():
+    # "![" that never becomes a reference must not make the carry grow
+    # with the line
+    scanner = ContentScanner()
+    scanner.feed("![ not an image " + "word " * 2000)
+    assert len(scanner._carry) < 5000
+    assert scanner.close().words == whole("![ not an image " + "word " * 2000)[0]
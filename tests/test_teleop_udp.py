@@ -0,0 +1,139 @@
+"""
+Tests for the UDP teleoperation channel (utils/teleop_udp.py), over loopback
+"""
+
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.teleop import Command
+from utils.teleop_udp import OFFSET_WINDOW, TeleopReceiver, pack_command, unpack_command
+
+DRIVE = Command(40, 10, 0, 0)
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def link():
+    """(receiver, clock, send(data)) on a loopback port."""
+    clock = FakeClock()
+    receiver = TeleopReceiver(port=0, host="127.0.0.1", clock=clock)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(data):
+        sock.sendto(data, receiver.sock.getsockname())
+        assert receiver.wait(1.0)
+        return receiver.update()
+
+    yield receiver, clock, send
+    sock.close()
+    receiver.sock.close()
+
+
+def test_pack_unpack_round_trip_and_signature():
+    data = pack_command(7, 3, DRIVE, sent=1.5, key="secret")
+    assert unpack_command(data, "secret") == (7, 3, 1.5, False, DRIVE)
+    assert unpack_command(data, "other") is None
+    assert unpack_command(pack_command(7, 3, DRIVE, sent=1.5), "secret") is None
+    # without a key the tag is not checked
+    assert unpack_command(data) == (7, 3, 1.5, False, DRIVE)
+    assert unpack_command(data[:-1]) is None
+
+
+def test_network_listen_needs_key_or_peers():
+    with pytest.raises(ValueError):
+        TeleopReceiver(port=0, host="0.0.0.0")
+
+
+def test_stale_packet_is_dropped(link):
+    receiver, clock, send = link
+    # sender clock 50 s behind: only changes in (arrival - sent) matter
+    assert send(pack_command(1, 1, DRIVE, sent=clock.now - 50))
+    clock.now += 0.02
+    assert send(pack_command(1, 2, DRIVE, sent=clock.now - 50 - 0.1))     # 100 ms late
+    clock.now += 0.02
+    assert not send(pack_command(1, 3, DRIVE, sent=clock.now - 50 - 0.2))  # 200 ms late
+    assert receiver.dropped_stale == 1
+    assert receiver.get_command() == DRIVE
+
+
+def test_old_and_duplicate_sequence_numbers_are_dropped(link):
+    receiver, clock, send = link
+    assert send(pack_command(1, 5, DRIVE, sent=clock.now))
+    assert not send(pack_command(1, 5, DRIVE, sent=clock.now))
+    assert not send(pack_command(1, 4, DRIVE, sent=clock.now))
+    assert receiver.dropped_old == 2
+    # wrap-around counts as newer
+    assert not send(pack_command(2, 2 ** 32 - 1, DRIVE, sent=clock.now))  # other session, busy
+    clock.now += receiver.timeout + 0.01
+    assert send(pack_command(2, 2 ** 32 - 1, DRIVE, sent=clock.now))
+    assert send(pack_command(2, 0, DRIVE, sent=clock.now))
+
+
+def test_slow_sender_clock_does_not_make_packets_stale(link):
+    receiver, clock, send = link
+    # the sender's clock runs 1% slow, so (arrival - sent) grows by 10 ms a
+    # second; with a session-long minimum every packet would be stale
+    # after 15 s
+    seq = 0
+    sent = 0.0
+    for _ in range(int(3 * OFFSET_WINDOW / 0.5)):
+        seq += 1
+        assert send(pack_command(1, seq, DRIVE, sent=sent))
+        clock.now += 0.5
+        sent += 0.5 * 0.99
+    assert receiver.dropped_stale == 0
+    assert receiver.last_delay < receiver.max_age
+
+
+def test_second_session_waits_until_the_first_is_silent(link):
+    receiver, clock, send = link
+    assert send(pack_command(1, 1, DRIVE, sent=clock.now))
+    clock.now += 0.05
+    assert not send(pack_command(2, 1, Command(-100, 0, 0, 0), sent=clock.now))
+    assert receiver.dropped_session == 1
+    assert receiver.get_command() == DRIVE
+    clock.now += receiver.timeout
+    assert send(pack_command(2, 2, Command(-100, 0, 0, 0), sent=clock.now))
+    assert receiver.session == 2
+
+
+def test_stop_flag_and_timeout(link):
+    receiver, clock, send = link
+    assert send(pack_command(1, 1, DRIVE, sent=clock.now))
+    clock.now += receiver.timeout + 0.01
+    assert receiver.get_command() is None
+    assert send(pack_command(1, 2, DRIVE, stop=True, sent=clock.now))
+    assert receiver.get_command() is None
+
+
+def test_key_and_peers_filter_packets():
+    receiver = TeleopReceiver(port=0, host="127.0.0.1", key="secret", peers=["127.0.0.2"])
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.sendto(pack_command(1, 1, DRIVE, key="secret"), receiver.sock.getsockname())
+        assert receiver.wait(1.0)
+        assert not receiver.update()
+        assert receiver.rejected == 1
+
+        receiver.peers = None
+        sock.sendto(pack_command(1, 2, DRIVE), receiver.sock.getsockname())
+        sock.sendto(pack_command(1, 3, DRIVE, key="secret"), receiver.sock.getsockname())
+        assert receiver.wait(1.0)
+        while receiver.packet_count < 3 and receiver.wait(1.0):
+            receiver.update()
+        assert receiver.bad == 1 and receiver.applied == 1
+    finally:
+        sock.close()
+        receiver.sock.close()
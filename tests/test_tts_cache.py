@@ -0,0 +1,89 @@
+"""
+Tests for the TTS phrase cache (utils/tts_cache.py), with a stand-in
+pico2wave on the PATH
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip("numpy")
+
+from utils.sound_bank import Mixer, NullSink, SoundBank
+from utils.tts_cache import TTSCache
+
+# writes 1000 frames of silence (about 4 KB) to the file after -w
+FAKE_PICO2WAVE = f"""#!{sys.executable}
+import sys, wave
+path = sys.argv[sys.argv.index("-w") + 1]
+with wave.open(path, "wb") as w:
+    w.setnchannels(2)
+    w.setsampwidth(2)
+    w.setframerate(44100)
+    w.writeframes(bytes(4000))
+"""
+
+
+@pytest.fixture
+def engine_dir(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return bin_dir
+
+
+@pytest.fixture
+def pico2wave(engine_dir):
+    script = engine_dir / "pico2wave"
+    script.write_text(FAKE_PICO2WAVE)
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return script
+
+
+def make_cache(tmp_path, max_bytes=1024 * 1024):
+    mixer = Mixer(SoundBank(), NullSink(realtime=False))
+    return TTSCache(mixer, cache_dir=tmp_path / "cache", max_bytes=max_bytes)
+
+
+def test_prewarm_without_engine_warns_and_continues(tmp_path, engine_dir, capsys):
+    tts = make_cache(tmp_path)
+    tts.prewarm(["Hello ducks", "Next stop, the pond."])
+    assert "could not render" in capsys.readouterr().out
+    assert tts.key("Hello ducks") not in tts.bank
+
+
+def test_prewarm_loads_phrases(tmp_path, pico2wave):
+    tts = make_cache(tmp_path)
+    tts.prewarm(["Hello ducks", "Hello ducks"])
+    assert tts.key("Hello ducks") in tts.bank
+    assert (tts.misses, tts.hits) == (1, 0)
+
+
+def test_phrase_larger_than_cache_is_kept(tmp_path, pico2wave):
+    tts = make_cache(tmp_path, max_bytes=100)
+    name = tts.load("Hello ducks")
+    assert name in tts.bank
+    assert tts.path("Hello ducks").exists()
+    assert tts.evictions == 0
+
+
+def test_played_phrases_are_not_evicted_first(tmp_path, pico2wave):
+    tts = make_cache(tmp_path)
+    tts.prewarm(["often", "rarely"])
+    size = tts.path("often").stat().st_size
+    # both last used long ago, "rarely" more recently than "often"
+    os.utime(tts.path("often"), (1000, 1000))
+    os.utime(tts.path("rarely"), (2000, 2000))
+
+    tts.say("often")   # served from the bank
+    tts.max_bytes = 2 * size
+    tts.load("new phrase")
+
+    assert tts.path("often").exists()
+    assert not tts.path("rarely").exists()
+    assert tts.key("rarely") not in tts.bank
+    assert tts.evictions == 1
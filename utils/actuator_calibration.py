@@ -2,6 +2,12 @@
 from picarx import Picarx
 from time import sleep
 import readchar 
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.servo_registry import ServoRegistry
+from utils.trim_calibration import TrimCalibrator
 
 manual = '''
 --------------- Picar-X Calibration Helper -----------------
@@ -13,16 +19,23 @@ manual = '''
     [4]: left motor                 [Q]: change motor direction
     [5]: right motor                [E]: motors run/stop
 
+    [T]: automatic steering trim and motor direction
+         (put the car on the start of a straight line first)
+
     [SPACE]: confirm calibration                [Crtl+C]: quit
                                       
 '''    
 
 px = Picarx()
 px_power = 30
+# steering, pan and tilt moved together in one pass, waiting only as long
+# as the farthest move takes
+servos = ServoRegistry.from_picarx(px)
 
 servo_num = 0
 motor_num = 0
 servo_names = ['direction servo', 'camera pan servo', 'camera tilt servo']
+servo_keys = ['steering', 'pan', 'tilt']
 motor_names = ['left motor', 'right motor']
 servos_cali = [px.dir_cali_val, px.cam_pan_cali_val, px.cam_tilt_cali_val]
 motors_cali = px.cali_dir_value
@@ -30,33 +43,12 @@ servos_offset = list.copy(servos_cali)
 motors_offset = list.copy(motors_cali)
 
 def servos_test():
-    px.set_dir_servo_angle(-30)
-    sleep(0.5)
-    px.set_dir_servo_angle(30)
-    sleep(0.5)
-    px.set_dir_servo_angle(0)
-    sleep(0.5)
-    px.set_cam_pan_angle(-30)
-    sleep(0.5)
-    px.set_cam_pan_angle(30)
-    sleep(0.5)
-    px.set_cam_pan_angle(0)
-    sleep(0.5)
-    px.set_cam_tilt_angle(-30)
-    sleep(0.5)
-    px.set_cam_tilt_angle(30)
-    sleep(0.5)
-    px.set_cam_tilt_angle(0)
-    sleep(0.5)
+    for angle in (-30, 30, 0):
+        servos.move({key: angle for key in servo_keys})
 
 def servos_move(servo_num, value):
-    if servo_num == 0:
-        px.set_dir_servo_angle(value)
-    elif servo_num == 1:
-        px.set_cam_pan_angle(value)
-    elif servo_num == 2:
-        px.set_cam_tilt_angle(value)
-    sleep(0.2)
+    # forced: after an offset change the same angle needs a new write
+    servos.move({servo_keys[servo_num]: value}, force=True)
 
 def set_servos_offset(servo_num, value):
     if servo_num == 0:
@@ -67,8 +59,7 @@ def set_servos_offset(servo_num, value):
         px.cam_tilt_cali_val  = value  
 
 def servos_reset():
-    for i in range(3):
-        servos_move(i,0)
+    servos.move({key: 0 for key in servo_keys}, force=True)
 
 def show_info():
     print("\033[H\033[J", end='')  # clear terminal windows
@@ -127,6 +118,22 @@ def cali_helper():
             motor_run = True
             px.forward(px_power)
             show_info()
+        elif key == 't':
+            try:
+                result = TrimCalibrator(px).calibrate()
+            except RuntimeError as e:
+                # the previous offsets are restored, write the steering back
+                servos_move(0, 0)
+                print('Automatic trim stopped: %s' % e)
+            else:
+                if result.converged:
+                    servos_offset[0] = px.dir_cali_val
+                    motors_offset = list.copy(px.cali_dir_value)
+                    show_info()
+                    print('Trim %.2f after %d runs, saved.' % (result.trim, len(result.runs)))
+                else:
+                    servos_move(0, 0)
+                    print('Trim did not settle, nothing saved. Check the line and the steering linkage.')
         elif key == 'e':
             if motor_run == False:
                 motor_run = True
@@ -0,0 +1,181 @@
+"""
+Command coalescing for the PiCar-X actuators.
+
+Every set_dir_servo_angle()/forward() call on a Picarx is an I2C transaction
+to the Robot HAT, and the control loops repeat the same command every tick.
+CoalescingPicarx wraps a Picarx and only writes to the bus when a channel's
+value actually changes, optionally rate-limiting and slew-limiting each
+channel. Anything it does not wrap (sensors, calibration) is passed through.
+
+Writes hold bus_lock, so a stop from another thread (MotorWatchdog) cannot
+interleave with a write of the control loop or leave the channel state
+half-updated. Threads reading I2C sensors through the same Picarx
+(WorldStateAggregator) take the same lock.
+
+Usage:
+    px = CoalescingPicarx(Picarx(), slew_rates={"steering": 300})
+    px.set_dir_servo_angle(20)   # written, ramped at 300 deg/s
+    px.set_dir_servo_angle(20)   # dropped, already there
+    px.flush()                   # call each tick to finish ramps
+"""
+
+import threading
+import time
+
+from utils import tracing
+
+CHANNELS = ("steering", "pan", "tilt", "motor")
+
+# Longest time step a slew limit is applied over, so a command after a long
+# idle period is still ramped instead of jumping in one write
+MAX_SLEW_DT = 0.1
+
+# Ramping channels are written at most once per servo PWM period (50 Hz);
+# intermediate writes would be tiny steps the servo never acts on
+SLEW_PERIOD = 0.02
+
+
+class _Channel:
+    __slots__ = ("write", "value", "target", "last_write", "min_interval", "slew_rate", "resend",
+                 "span_name")
+
+    def __init__(self, name, write, min_interval, slew_rate):
+        self.write = write
+        self.value = None       # last value written to the bus
+        self.target = None      # last value requested
+        self.last_write = 0.0
+        self.min_interval = min_interval
+        self.slew_rate = slew_rate
+        self.resend = False
+        self.span_name = name + ".write"
+
+
+class CoalescingPicarx:
+    def __init__(self, px, min_interval=0.0, slew_rates=None, clock=time.monotonic):
+        """
+        px: Picarx (or compatible) instance to wrap
+        min_interval: seconds between writes on one channel, a number or a
+            dict keyed by channel name ("steering", "pan", "tilt", "motor")
+        slew_rates: max change per second per channel, e.g.
+            {"steering": 300, "motor": 200} (degrees/s, power %/s)
+        """
+        self.px = px
+        self.clock = clock
+        slew_rates = slew_rates or {}
+        if not isinstance(min_interval, dict):
+            min_interval = {name: min_interval for name in CHANNELS}
+
+        writers = {
+            "steering": self._write_steering,
+            "pan": px.set_cam_pan_angle,
+            "tilt": px.set_cam_tilt_angle,
+            "motor": self._write_motor,
+        }
+        self.channels = {
+            name: _Channel(name, writers[name], min_interval.get(name, 0.0), slew_rates.get(name))
+            for name in CHANNELS
+        }
+
+        # serializes bus transactions and channel state between threads
+        self.bus_lock = threading.RLock()
+
+        self.calls = 0
+        self.writes = 0
+
+    def __getattr__(self, name):
+        # Sensors, calibration and anything else go straight to the Picarx
+        return getattr(self.px, name)
+
+    # Picarx actuator API
+    # ==========================================
+    def set_dir_servo_angle(self, value):
+        self._request(self.channels["steering"], value)
+
+    def set_cam_pan_angle(self, value):
+        self._request(self.channels["pan"], value)
+
+    def set_cam_tilt_angle(self, value):
+        self._request(self.channels["tilt"], value)
+
+    def forward(self, speed):
+        self._request(self.channels["motor"], speed)
+
+    def backward(self, speed):
+        self._request(self.channels["motor"], -speed)
+
+    def stop(self, force=False):
+        """Stop the motors immediately, bypassing rate and slew limits."""
+        with self.bus_lock:
+            self.calls += 1
+            ch = self.channels["motor"]
+            ch.target = 0
+            if ch.value == 0 and not ch.resend and not force:
+                return
+            start = tracing.begin()
+            self.px.stop()
+            tracing.end("motor.stop", start, "actuator")
+            ch.value = 0
+            ch.resend = False
+            ch.last_write = self.clock()
+            self.writes += 1
+
+    def flush(self):
+        """Advance channels that are still ramping or waiting on a rate limit."""
+        with self.bus_lock:
+            now = self.clock()
+            for ch in self.channels.values():
+                if ch.target is not None and (ch.target != ch.value or ch.resend):
+                    self._step(ch, now)
+
+    # internals
+    # ==========================================
+    def _request(self, ch, target):
+        with self.bus_lock:
+            self.calls += 1
+            ch.target = target
+            if target == ch.value and not ch.resend:
+                return
+            self._step(ch, self.clock())
+
+    def _step(self, ch, now):
+        value = ch.target
+        if ch.value is not None:
+            dt = now - ch.last_write
+            if dt < ch.min_interval:
+                return
+            if ch.slew_rate:
+                if dt < SLEW_PERIOD:
+                    return
+                max_step = ch.slew_rate * min(dt, MAX_SLEW_DT)
+                delta = value - ch.value
+                if delta > max_step:
+                    value = ch.value + max_step
+                elif delta < -max_step:
+                    value = ch.value - max_step
+        start = tracing.begin()
+        ch.write(value)
+        tracing.end(ch.span_name, start, "actuator")
+        ch.value = value
+        ch.resend = False
+        ch.last_write = now
+        self.writes += 1
+
+    def _write_steering(self, value):
+        self.px.set_dir_servo_angle(value)
+        # Picarx.forward() splits power between the wheels using the
+        # steering angle at call time, so the motors must be rewritten
+        self.channels["motor"].resend = True
+
+    def _write_motor(self, value):
+        if value >= 0:
+            self.px.forward(value)
+        else:
+            self.px.backward(-value)
+
+    def stats(self):
+        """Return call/write counters; saved is the number of bus writes avoided."""
+        return {
+            "calls": self.calls,
+            "writes": self.writes,
+            "saved": max(self.calls - self.writes, 0),
+        }
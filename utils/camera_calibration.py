@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 """camera_calibration.py: Performs camera calibration.
-Usage: camera_calibration.py --folder ../images --rows 6 --columns 8
+Usage: camera_calibration.py --folder ../images --rows 6 --columns 8 [--plot]
 Ensure images of the chessboard are contained in the same folder. A 
 camera_calibration.json file will be generated which will contain the results 
-of the calibration.
+of the calibration. With --plot, the 3D chessboard positions are shown for
+10 seconds at the end.
 """
 __author__      = "Matthew Pan"
 __copyright__   = "Copyright 2024, Matthew Pan"
@@ -14,11 +15,7 @@ import os
 # os.environ['QT_LOGGING_RULES'] = '*.debug=false;qt.qpa.*=false'
 # os.environ['QT_DEBUG_PLUGINS'] = '0'
 
-import cv2
-import numpy as np
 import glob
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import json
 import argparse
 
@@ -48,12 +45,30 @@ parser.add_argument(
     default=8,
     help="Number of internal corner columns in the chessboard (default: 8)"
 )
+parser.add_argument(
+    "--plot",
+    action="store_true",
+    help="Show the 3D positions of the chessboards after calibrating (loads matplotlib)"
+)
 args = parser.parse_args()
 
 # Define checkerboard size from arguments
 # OpenCV expects (columns, rows) for pattern size, NOT (rows, columns)!
 CHESSBOARD = (args.columns, args.rows)
 
+# Load calibration images from the specified folder
+image_pattern = os.path.join(args.folder, '*.jpg')
+images = glob.glob(image_pattern)
+
+# Check if images are found
+if not images:
+    print(f"No images found in folder: {args.folder}")
+    exit()
+
+# OpenCV and NumPy take a while to load, so only once there is work to do
+import cv2
+import numpy as np
+
 # Optimization termination criteria
 criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
 
@@ -65,15 +80,6 @@ img_points = [] # 2d points in image plane
 objp = np.zeros((CHESSBOARD[0]*CHESSBOARD[1], 3), np.float32)
 objp[:, :2] = np.mgrid[0:CHESSBOARD[0], 0:CHESSBOARD[1]].T.reshape(-1, 2)
 
-# Load calibration images from the specified folder
-image_pattern = os.path.join(args.folder, '*.jpg')
-images = glob.glob(image_pattern)
-
-# Check if images are found
-if not images:
-    print(f"No images found in folder: {args.folder}")
-    exit()
-
 print(f"\nLooking for chessboard: {args.columns} columns x {args.rows} rows = {CHESSBOARD[0]*CHESSBOARD[1]} internal corners")
 print(f"OpenCV pattern size: {CHESSBOARD} (columns, rows)")
 print(f"Found {len(images)} images to process\n")
@@ -153,17 +159,20 @@ with open(os.path.join(args.folder, 'camera_calibration.json'), 'w') as f:
 f.close()
 
 # Plots the 3D position of the chessboards in all photos for 10 second before closing the program
-fig = plt.figure()
-ax = fig.add_subplot(111, projection='3d')
-for i, (rvec, tvec) in enumerate(zip(rvecs, tvecs)):
-  R, _ = cv2.Rodrigues(rvec)
-  points_3d = np.dot(R, obj_points[i].T).T + tvec.T
-  ax.scatter(points_3d[:, 0], points_3d[:, 1], points_3d[:, 2], label=f'Image {i+1}')
-  
-plt.title("3D Chessboard Positions")
-plt.xlabel("X")
-plt.ylabel("Y")
-plt.legend(loc='upper left')
-plt.show(block=False)
-plt.pause(10) 
-plt.close()
\ No newline at end of file
+if args.plot:
+  # matplotlib and its 3D toolkit are the slowest imports here, only loaded when plotting
+  import matplotlib.pyplot as plt
+  fig = plt.figure()
+  ax = fig.add_subplot(111, projection='3d')
+  for i, (rvec, tvec) in enumerate(zip(rvecs, tvecs)):
+    R, _ = cv2.Rodrigues(rvec)
+    points_3d = np.dot(R, obj_points[i].T).T + tvec.T
+    ax.scatter(points_3d[:, 0], points_3d[:, 1], points_3d[:, 2], label=f'Image {i+1}')
+    
+  plt.title("3D Chessboard Positions")
+  plt.xlabel("X")
+  plt.ylabel("Y")
+  plt.legend(loc='upper left')
+  plt.show(block=False)
+  plt.pause(10) 
+  plt.close()
\ No newline at end of file
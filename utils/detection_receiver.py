@@ -6,6 +6,8 @@ import json
 import socket
 import time
 
+from utils import metrics, tracing
+
 class DetectionReceiver:
     def __init__(self, port=5005, timeout=0.2, stale_after=0.5):
         """
@@ -28,6 +30,18 @@ class DetectionReceiver:
         self.packet_count = 0
         self.last_debug_time = time.time()
 
+        self.packets_metric = metrics.counter("picarx_detection_packets_total",
+                                              "Detection packets decoded")
+        self.bad_metric = metrics.counter("picarx_detection_bad_packets_total",
+                                          "Detection packets that were not valid JSON")
+        self.stale_metric = metrics.counter("picarx_detection_stale_total",
+                                            "get_latest() calls that found the data stale")
+        self.age_metric = metrics.gauge("picarx_detection_age_seconds",
+                                        "Age of the latest detection when last read")
+        self.age_histogram = metrics.histogram("picarx_detection_read_age_seconds",
+                                               "Age of the latest detection when read",
+                                               buckets=metrics.AGE_BUCKETS)
+
     def update(self):
         received_any = False
         packets_drained = 0
@@ -43,12 +57,17 @@ class DetectionReceiver:
                 break
 
             try:
-                self.latest = json.loads(data.decode("utf-8"))
+                with tracing.span("detections.decode", "detections"):
+                    self.latest = json.loads(data.decode("utf-8"))
                 received_any = True
                 self.packet_count += 1
+                self.packets_metric.inc()
             except json.JSONDecodeError as e:
+                self.bad_metric.inc()
                 print(f"[DEBUG] bad JSON: {e}", flush=True)
 
+        if received_any:
+            tracing.counter("detections.packets", self.packet_count)
 
         return received_any
 
@@ -58,9 +77,16 @@ class DetectionReceiver:
             return None
 
         age = time.time() - self.latest["timestamp"]
+        self.observe_age(age)
         if age > self.stale_after:
+            self.stale_metric.inc()
             # Debug: print why it's stale
             print(f"[DEBUG] Data is stale: age={age:.2f}s, stale_after={self.stale_after}s, frame={self.latest.get('frame_id', '?')}")
             return None
 
-        return self.latest
\ No newline at end of file
+        return self.latest
+
+    def observe_age(self, age):
+        """Record the age of the latest detection (seconds) in the metrics."""
+        self.age_metric.set(age)
+        self.age_histogram.observe(age)
\ No newline at end of file
@@ -3,8 +3,17 @@ import time
 import threading
 import readchar 
 import os
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils import tracing
+from utils.motion import MotionEngine, Trajectory
 
 px = Picarx()
+# servo test and calibration sweeps play as trajectories on a timer
+# thread, started in main()
+motion = MotionEngine(px)
 config_path = px.CONFIG
 
 manual = f'''\
@@ -16,6 +25,8 @@ manual = f'''\
 
  press [Q] to start line reference calibration,
  press [E] to start cliff reference calibration
+ press [Z] for fast histogram line calibration,
+ press [X] for fast histogram cliff calibration
 
  [SPACE]: confirm calibration           [Crtl+C]: quit
 '''
@@ -40,6 +51,10 @@ cali_status = 'none' # none, work, done
 _lock = threading.Lock()
 key = ''
 
+# histogram calibration
+line_samples = None
+hist_message = ''
+
 # print control
 # ==========================================
 def clear_line_and_print(msg, color=''):
@@ -59,21 +74,45 @@ def enable_cursor():
 
 # test direc servo
 # ==========================================
-px.set_dir_servo_angle(-30)
-time.sleep(0.5)
-px.set_dir_servo_angle(30)
-time.sleep(0.5)
-px.set_dir_servo_angle(0)
-time.sleep(0.5)
+SERVO_TEST = Trajectory.sequence([
+    (0.5, {"steering": -30}),
+    (0.5, {"steering": 30}),
+    (0.5, {"steering": 0}),
+])
+
+# line calibration sweep: front/back left, then front/back right, over the line
+_angle = 35
+_delay = 0.8
+LINE_SWEEP = Trajectory.sequence([
+    (_delay, {"steering": -_angle, "motor": 10}),   # front left
+    (_delay, {"motor": -10}),                       # back left
+    (0.2, {"steering": 0, "motor": 0}),             # stop
+    (_delay, {"steering": _angle, "motor": 10}),    # front right
+    (_delay, {"motor": -10}),                       # back right
+    (0.2, {"steering": 0, "motor": 0}),             # stop
+])
+_hist_delay = 0.35
+HIST_SWEEP = Trajectory.sequence([
+    (_hist_delay, {"steering": -_angle, "motor": 10}),
+    (_hist_delay, {"motor": -10}),
+    (_hist_delay, {"steering": _angle, "motor": 10}),
+    (_hist_delay, {"motor": -10}),
+    (0.0, {"steering": 0, "motor": 0}),
+])
 
 # read grayscale value thread
 # ==========================================
+def read_grayscale():
+    # the histogram calibration reads from another thread at full rate
+    with _lock, tracing.span("grayscale.read", "sensor"):
+        return px.get_grayscale_data()
+
 def read_data_loop():
     global current_grayscale_value, thresholds, run_flag, cali_status
 
     while run_flag:
         try:
-            current_grayscale_value = px.get_grayscale_data()
+            current_grayscale_value = read_grayscale()
 
             # calculate the reference
             if cali_status == 'work':
@@ -121,6 +160,14 @@ def update_info(isback=True):
         clear_line_and_print("Cliff reference auto calibrating ...", color='33')
     elif current_mode == 'cliff_cali_done':
         clear_line_and_print("Cliff reference auto calibration done.", color='32')
+    elif current_mode == 'hist_line_cali':
+        clear_line_and_print("Line reference histogram calibrating ...", color='33')
+    elif current_mode == 'hist_cliff_cali':
+        clear_line_and_print("Cliff reference histogram calibrating ...", color='33')
+    elif current_mode == 'hist_done':
+        clear_line_and_print(f"Histogram calibration done. {hist_message}", color='32')
+    elif current_mode == 'hist_rejected':
+        clear_line_and_print(f"Histogram calibration rejected: {hist_message}", color='31')
     elif current_mode == 'saved':
         clear_line_and_print("The reference values has been saved.", color='32')
 
@@ -154,30 +201,7 @@ def start_line_calibrate():
             [4096, 0],
             [4096, 0],
         ]
-        _angle = 35
-        _delay = 0.8
-        # front left
-        px.set_dir_servo_angle(-_angle)
-        px.forward(10)
-        time.sleep(_delay)
-        # back left
-        px.backward(10)
-        time.sleep(_delay)
-        # stop
-        px.set_dir_servo_angle(0)
-        px.stop()
-        time.sleep(0.2)
-        # front right
-        px.set_dir_servo_angle(_angle)
-        px.forward(10)
-        time.sleep(_delay)
-        # back right
-        px.backward(10)
-        time.sleep(_delay)
-        # stop
-        px.set_dir_servo_angle(0)
-        px.stop()
-        time.sleep(0.2)
+        motion.play(LINE_SWEEP).wait()
         current_mode = 'line_cali_done'
         cali_status = 'done'
     line_calibrate_thread = threading.Thread(target=line_calibrate_work)
@@ -220,8 +244,62 @@ def start_cliff_calibrate():
     cliff_calibrate_thread.start()
 
 
+# histogram line reference calibration
+# =================================================================
+def start_histogram_line_calibrate():
+    def histogram_line_calibrate_work():
+        global current_mode, line_samples, hist_message
+        current_mode = 'hist_line_cali'
+        # NumPy is only needed here, imported on first use to keep startup short
+        from utils.grayscale_threshold import collect_samples, calibrate_line
+        # same sweep as the line calibration, shorter, sampled at full rate
+        # while the motion engine drives it
+        playback = motion.play(HIST_SWEEP)
+        samples = collect_samples(read_grayscale, HIST_SWEEP.duration)
+        playback.wait()
+
+        result = calibrate_line(samples)
+        if result['ok']:
+            line_samples = samples
+            line_reference[:] = result['reference']
+            hist_message = f"{result['samples']} samples, margins: {result['margins']}"
+            current_mode = 'hist_done'
+        else:
+            hist_message = result['reason']
+            current_mode = 'hist_rejected'
+    histogram_line_calibrate_thread = threading.Thread(target=histogram_line_calibrate_work)
+    histogram_line_calibrate_thread.daemon = True
+    histogram_line_calibrate_thread.start()
+
+# histogram cliff reference calibration
+def start_histogram_cliff_calibrate():
+    def histogram_cliff_calibrate_work():
+        global current_mode, hist_message
+        if line_samples is None:
+            hist_message = 'run the histogram line calibration [Z] first'
+            current_mode = 'hist_rejected'
+            return
+        current_mode = 'hist_cliff_cali'
+        from utils.grayscale_threshold import collect_samples, calibrate_cliff
+        samples = collect_samples(read_grayscale, 0.3)
+        result = calibrate_cliff(samples, line_samples)
+        if result['ok']:
+            cliff_reference[:] = result['reference']
+            hist_message = f"{result['samples']} samples, margins: {result['margins']}"
+            current_mode = 'hist_done'
+        else:
+            hist_message = result['reason']
+            current_mode = 'hist_rejected'
+    histogram_cliff_calibrate_thread = threading.Thread(target=histogram_cliff_calibrate_work)
+    histogram_cliff_calibrate_thread.daemon = True
+    histogram_cliff_calibrate_thread.start()
+
+
 def main():
     global key, current_mode, run_flag
+    # the engine thread sleeps while nothing is playing
+    motion.start()
+    motion.play(SERVO_TEST).wait()
     # start read data thread
     run_flag = True
     _read_data_thead = threading.Thread(target=read_data_loop)
@@ -244,6 +322,12 @@ def main():
         elif key == 'e':
             current_mode = 'cliff_cali'
             start_cliff_calibrate()
+        elif key == 'z':
+            current_mode = 'hist_line_cali'
+            start_histogram_line_calibrate()
+        elif key == 'x':
+            current_mode = 'hist_cliff_cali'
+            start_histogram_cliff_calibrate()
         elif key == readchar.key.SPACE:
             print('\033[32mConfirm save ?(y/n)\033[m')
             while True:
@@ -280,5 +364,6 @@ if __name__ == "__main__":
         # enable cursor
         enable_cursor()
         # stop
+        motion.stop()
         px.stop()
         time.sleep(0.1)
@@ -0,0 +1,172 @@
+"""
+Histogram-based reference estimation for the grayscale (line follower) module.
+
+Samples are collected at the sensor's full rate into an (N, 3) NumPy array,
+one column per channel. Each channel is split into a dark and a bright class
+with Otsu's method, and the split is only accepted when the two classes are
+clearly separated.
+"""
+
+import time
+
+import numpy as np
+
+# Percentiles used as the inner edges of each class
+LOW_EDGE_PERCENTILE = 95
+HIGH_EDGE_PERCENTILE = 5
+
+# Smallest accepted share of the total variance explained by the split.
+# Two equal normal distributions reach 0.8 when their means are 4 sigma
+# apart; a single normal distribution only reaches about 0.64.
+MIN_SEPARABILITY = 0.8
+
+
+def collect_samples(read, duration, max_samples=20000):
+    """
+    Call read() back to back for `duration` seconds.
+
+    read: function returning one [left, middle, right] reading
+    Returns an (N, 3) int array with the samples that were collected.
+    """
+    samples = np.empty((max_samples, 3), dtype=np.int32)
+    count = 0
+    end = time.monotonic() + duration
+    while count < max_samples and time.monotonic() < end:
+        samples[count] = read()
+        count += 1
+    return samples[:count]
+
+
+def otsu_threshold(values, bins=256):
+    """
+    Return the threshold that maximises the between-class variance of values.
+
+    Values at or below the threshold belong to the dark class. Also returns
+    the separability: the share of the total variance explained by the split
+    (1.0 for two perfectly narrow classes).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lo, hi = values.min(), values.max()
+    if hi <= lo:
+        return float(lo), 0.0
+
+    hist, edges = np.histogram(values, bins=bins, range=(lo, hi))
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight = np.cumsum(hist)
+    total = weight[-1]
+    cum_sum = np.cumsum(hist * centers)
+
+    w0 = weight[:-1]
+    w1 = total - w0
+    mean0 = cum_sum[:-1] / np.maximum(w0, 1)
+    mean1 = (cum_sum[-1] - cum_sum[:-1]) / np.maximum(w1, 1)
+    between = w0 * w1 * (mean0 - mean1) ** 2
+    best = np.argmax(between)
+
+    separability = between[best] / (total * total * values.var())
+    return float(edges[1:-1][best]), float(separability)
+
+
+def split_channel(values, min_fraction=0.05):
+    """
+    Split one channel into dark/bright classes and measure their separation.
+
+    Returns a dict with the threshold, per-class statistics, the margin
+    between the inner class edges and whether the split is usable.
+    Classes split this way never share values, so overlap of the underlying
+    distributions is judged from the separability instead.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    threshold, separability = otsu_threshold(values)
+    dark = values[values <= threshold]
+    bright = values[values > threshold]
+
+    result = {
+        "threshold": threshold,
+        "dark_mean": float(dark.mean()) if dark.size else None,
+        "bright_mean": float(bright.mean()) if bright.size else None,
+        "margin": 0.0,
+        "separability": separability,
+        "ok": False,
+        "reason": "",
+    }
+
+    if min(dark.size, bright.size) < min_fraction * values.size:
+        result["reason"] = "only one surface seen"
+        return result
+
+    dark_edge = np.percentile(dark, LOW_EDGE_PERCENTILE)
+    bright_edge = np.percentile(bright, HIGH_EDGE_PERCENTILE)
+
+    # Put the reference in the middle of the gap between the inner edges
+    result["threshold"] = float((dark_edge + bright_edge) / 2)
+    result["margin"] = float((bright_edge - dark_edge) / 2)
+
+    if separability < MIN_SEPARABILITY:
+        result["reason"] = f"line and background readings overlap (separability {separability:.2f})"
+    else:
+        result["ok"] = True
+    return result
+
+
+def calibrate_line(samples, min_margin=20):
+    """
+    Compute line reference values from a sweep over the line and background.
+
+    samples: (N, 3) array from collect_samples()
+    min_margin: smallest accepted half-gap between the classes (ADC counts)
+    """
+    samples = np.asarray(samples)
+    if samples.ndim != 2 or samples.shape[0] < 100:
+        return {"ok": False, "reason": "not enough samples", "channels": []}
+
+    channels = [split_channel(samples[:, i]) for i in range(samples.shape[1])]
+    for i, ch in enumerate(channels):
+        if ch["ok"] and ch["margin"] < min_margin:
+            ch["ok"] = False
+            ch["reason"] = f"margin {ch['margin']:.0f} below {min_margin}"
+
+    bad = [f"channel {i}: {ch['reason']}" for i, ch in enumerate(channels) if not ch["ok"]]
+    return {
+        "ok": not bad,
+        "reason": "; ".join(bad),
+        "channels": channels,
+        "reference": [int(round(ch["threshold"])) for ch in channels],
+        "margins": [int(ch["margin"]) for ch in channels],
+        "samples": int(samples.shape[0]),
+    }
+
+
+def calibrate_cliff(cliff_samples, line_samples, min_margin=20):
+    """
+    Compute cliff reference values from samples taken over the edge.
+
+    The cliff readings are compared with the darkest surface from the line
+    sweep; the reference sits halfway between the two distributions.
+    """
+    cliff_samples = np.asarray(cliff_samples, dtype=np.float64)
+    line_samples = np.asarray(line_samples, dtype=np.float64)
+    if cliff_samples.shape[0] < 10 or line_samples.shape[0] < 100:
+        return {"ok": False, "reason": "not enough samples", "reference": [], "margins": []}
+
+    reference = []
+    margins = []
+    bad = []
+    for i in range(cliff_samples.shape[1]):
+        line_values = line_samples[:, i]
+        dark = line_values[line_values <= otsu_threshold(line_values)[0]]
+        cliff_edge = np.percentile(cliff_samples[:, i], 100 - HIGH_EDGE_PERCENTILE)
+        dark_edge = np.percentile(dark, HIGH_EDGE_PERCENTILE)
+        margin = (dark_edge - cliff_edge) / 2
+        reference.append(int(round((cliff_edge + dark_edge) / 2)))
+        margins.append(int(margin))
+        if margin < min_margin:
+            bad.append(f"channel {i}: cliff and line readings overlap")
+
+    return {
+        "ok": not bad,
+        "reason": "; ".join(bad),
+        "reference": reference,
+        "margins": margins,
+        "samples": int(cliff_samples.shape[0]),
+    }
@@ -0,0 +1,341 @@
+"""
+In-process metrics served over HTTP in the Prometheus text format.
+
+Printing stats every half second slows the loops that print them, and the
+numbers scroll away. Here the loops update counters, gauges and
+fixed-bucket histograms, which cost an addition or a bucket search, and a
+background thread serves them on a local HTTP port, by default on
+loopback only (http://localhost:9110/metrics). The endpoint has no
+authentication, so serving it to the network is opt-in: pass host="0.0.0.0"
+or set PICARX_METRICS_HOST=0.0.0.0, and a laptop on the same network can
+chart them live, with Prometheus + Grafana or by polling
+http://<car>:9110/metrics.
+
+- Counter: a count that only goes up (rates come from its slope)
+- Gauge: a value that is set (e.g. the age of the last detection)
+- Histogram: counts of observations per fixed bucket, plus sum and count
+- LoopTimer: ticks and tick intervals of a control loop
+- register_stats(): exposes an existing stats() dict (coalescer,
+  watchdog, teleop receiver, ...) as gauges, read only when scraped
+
+Metrics are identified by name and constant labels, and creating one that
+already exists returns the existing one. Each metric should be updated
+from one thread (the loop that owns it); the server thread only reads.
+
+Usage:
+    from utils import metrics
+
+    loop = metrics.LoopTimer("line_following")
+    reads = metrics.histogram("picarx_sensor_read_seconds", "Sensor read time",
+                              {"sensor": "grayscale"})
+    metrics.register_stats("picarx_coalescer", px.stats)
+    metrics.serve()
+    while True:
+        loop.tick()
+        ...
+"""
+
+import bisect
+import os
+import threading
+import time
+
+DEFAULT_PORT = 9110
+DEFAULT_HOST = "127.0.0.1"
+
+# Loop intervals and sensor read times, in seconds
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.03, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Detection ages, in seconds
+AGE_BUCKETS = (0.02, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0, 2.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=None, func=None):
+        """func: optional function returning the value, called when scraped"""
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.func = func
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def families(self):
+        """[(name, kind, help, [(sample name, labels, value), ...])]"""
+        value = self.func() if self.func is not None else self.value
+        return [(self.name, self.kind, self.help, [(self.name, self.labels, value)])]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=None, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def time(self):
+        """Context manager observing the duration of the block."""
+        return _Timer(self)
+
+    def families(self):
+        counts = list(self.counts)
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            samples.append((self.name + "_bucket", dict(self.labels, le=_number(bound)), cumulative))
+        samples.append((self.name + "_sum", self.labels, self.sum))
+        samples.append((self.name + "_count", self.labels, cumulative))
+        return [(self.name, self.kind, self.help, samples)]
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class StatsGauges:
+    """The numeric entries of a stats() dict as gauges <prefix>_<key>, read when scraped."""
+
+    kind = "stats"
+
+    def __init__(self, name, help, labels=None, func=None):
+        self.name = name
+        self.help = help
+        self.labels = dict(labels or {})
+        self.func = func
+
+    def families(self):
+        out = []
+        for key, value in self.func().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.name}_{key}"
+            out.append((name, "gauge", f"{self.help}: {key}", [(name, self.labels, value)]))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}     # (name, sorted labels) -> metric
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            metric = self.metrics.get(key)
+            if metric is None:
+                metric = cls(name, help, labels, **kwargs)
+                self.metrics[key] = metric
+            elif type(metric) is not cls:
+                raise ValueError(f"metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help, labels=None, func=None):
+        return self._get(Counter, name, help, labels, func=func)
+
+    def gauge(self, name, help, labels=None, func=None):
+        return self._get(Gauge, name, help, labels, func=func)
+
+    def histogram(self, name, help, labels=None, buckets=TIME_BUCKETS):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def register_stats(self, prefix, stats, labels=None, help=""):
+        """
+        Expose each numeric entry of the dict returned by stats() as a gauge
+        named <prefix>_<key>; stats() is only called when scraped. Registering
+        a prefix again points it at the new stats().
+        """
+        metric = self._get(StatsGauges, prefix, help or prefix.replace("_", " "), labels, func=stats)
+        metric.func = stats
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        families = {}
+        for metric in metrics:
+            try:
+                metric_families = metric.families()
+            except Exception as e:
+                print(f"[metrics] {metric.name} failed: {e}", flush=True)
+                continue
+            for name, kind, help, samples in metric_families:
+                family = families.setdefault(name, (kind, help, []))
+                family[2].extend(samples)
+
+        # samples of one metric name must be grouped under one HELP/TYPE
+        lines = []
+        for name in sorted(families):
+            kind, help, samples = families[name]
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                if value is not None:
+                    lines.append(f"{sample_name}{_label_text(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help, labels=None, func=None):
+    return REGISTRY.counter(name, help, labels, func)
+
+
+def gauge(name, help, labels=None, func=None):
+    return REGISTRY.gauge(name, help, labels, func)
+
+
+def histogram(name, help, labels=None, buckets=TIME_BUCKETS):
+    return REGISTRY.histogram(name, help, labels, buckets)
+
+
+def register_stats(prefix, stats, labels=None, help=""):
+    return REGISTRY.register_stats(prefix, stats, labels, help)
+
+
+class LoopTimer:
+    """Tick count and interval histogram of one control loop, labelled loop=<name>."""
+
+    def __init__(self, loop, registry=REGISTRY, buckets=TIME_BUCKETS, clock=time.monotonic):
+        labels = {"loop": loop}
+        self.ticks = registry.counter("picarx_loop_ticks_total", "Control loop iterations", labels)
+        self.intervals = registry.histogram("picarx_loop_interval_seconds",
+                                            "Time between control loop iterations", labels, buckets)
+        self.clock = clock
+        self.last = None
+
+    def tick(self, now=None):
+        if now is None:
+            now = self.clock()
+        if self.last is not None:
+            self.intervals.observe(now - self.last)
+        self.last = now
+        self.ticks.inc()
+
+
+def _handler(registry):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _serve_forever(port, host, registry, bound):
+    # http.server loads ~50 modules; importing it here keeps that off the
+    # start-up of the scripts that serve metrics and of every module that
+    # only updates them
+    from http.server import HTTPServer
+
+    try:
+        server = HTTPServer((host, port), _handler(registry))
+    except OSError as e:
+        print(f"[metrics] cannot serve on port {port}: {e}", flush=True)
+        bound.append(None)
+        return
+    bound.append(server)
+    server.serve_forever()
+
+
+class _Server:
+    """Handle on the server thread returned by serve()."""
+
+    def __init__(self, port, host, registry):
+        self.port = port
+        self._bound = []
+        self.thread = threading.Thread(target=_serve_forever, args=(port, host, registry, self._bound),
+                                       name="metrics-http", daemon=True)
+        self.thread.start()
+
+    def wait_bound(self, timeout=None):
+        """Wait until the port is bound; True if serving, False if binding failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._bound and self.thread.is_alive():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.005)
+        return bool(self._bound) and self._bound[0] is not None
+
+    def shutdown(self):
+        if self.wait_bound(1.0):
+            self._bound[0].shutdown()
+            self._bound[0].server_close()
+
+
+def serve(port=DEFAULT_PORT, host=None, registry=REGISTRY):
+    """
+    Serve the registry on http://host:port/metrics from a daemon thread,
+    which binds the port in the background so the caller's loop can start
+    at once. If the port cannot be bound the thread prints why and exits,
+    and the loops keep running without the endpoint.
+
+    host defaults to $PICARX_METRICS_HOST, else loopback only.
+    """
+    if host is None:
+        host = os.environ.get("PICARX_METRICS_HOST", DEFAULT_HOST)
+    return _Server(port, host, registry)
@@ -0,0 +1,324 @@
+"""
+Trajectory playback for scripted motion sequences.
+
+Scripts like the servo sweep in 01_move.py used to loop over angles with
+time.sleep(0.01) between writes, so every bus write and every sleep
+overshoot pushed the rest of the sequence later, and the sequence blocked
+its thread until done. Here a motion is described once as keyframes per
+channel ("steering", "pan", "tilt", "motor"), compiled into time-indexed
+tables, and played by a MotionEngine thread that ticks on an absolute
+schedule: each tick looks up (and interpolates) the value for the time it
+actually runs at, so late ticks never accumulate into drift.
+
+- several trajectories can play at once on different channels; a newer
+  one takes over any channel it shares with an older one
+- play() returns a Playback that can be waited on or cancelled; a
+  cancelled trajectory stops the motor if it was driving it
+- the engine records how late each tick ran against its schedule and how
+  far each finished trajectory was from its scheduled end
+- with nothing playing, the engine thread sleeps until the next play()
+
+Usage:
+    sweep = Trajectory.sequence([
+        (0.35, {"steering": 35}, RAMP),
+        (0.70, {"steering": -35}, RAMP),
+        (0.35, {"steering": 0}, RAMP),
+    ])
+    engine = MotionEngine(px)
+    engine.start()
+    engine.play(sweep).wait()
+"""
+
+import bisect
+import math
+import threading
+import time
+from collections import deque
+
+from utils import tracing
+from utils.actuator_coalescer import CoalescingPicarx
+
+CHANNELS = ("steering", "pan", "tilt", "motor")
+
+TABLE_RATE = 200        # samples per second in compiled tables
+TICK_RATE = 100         # engine ticks per second
+# Final part of each wait done by spinning, for sub-millisecond tick timing
+SPIN_TIME = 0.0005
+
+RAMP = "ramp"
+TIMING_HISTORY = 1000
+
+
+class Trajectory:
+    """Keyframes per channel: {channel: [(time, value), ...]}, times in seconds."""
+
+    def __init__(self, keyframes=None, name=""):
+        self.name = name
+        self.keyframes = {}
+        for channel, frames in (keyframes or {}).items():
+            for t, value in frames:
+                self.add(channel, t, value)
+        self._tables = {}
+
+    @classmethod
+    def sequence(cls, steps, name=""):
+        """
+        Build a trajectory from consecutive steps (duration, {channel: value}[, RAMP]).
+
+        A plain step jumps to the values and holds them for `duration`; a
+        RAMP step moves linearly from the previous values to them over
+        `duration`. Channels not named in a step keep their value.
+        """
+        trajectory = cls(name=name)
+        t = 0.0
+        for step in steps:
+            duration, values = step[0], step[1]
+            ramp = len(step) > 2 and step[2] == RAMP
+            for channel, value in values.items():
+                frames = trajectory.keyframes.get(channel)
+                if ramp:
+                    if not frames:
+                        # nothing to ramp from, start at the target
+                        trajectory.add(channel, t, value)
+                    elif frames[-1][0] < t:
+                        trajectory.add(channel, t, frames[-1][1])
+                    trajectory.add(channel, t + duration, value)
+                else:
+                    if frames and frames[-1][0] < t:
+                        # hold the previous value up to the jump
+                        trajectory.add(channel, t, frames[-1][1])
+                    trajectory.add(channel, t, value)
+            t += duration
+        for channel, frames in trajectory.keyframes.items():
+            if frames[-1][0] < t:
+                trajectory.add(channel, t, frames[-1][1])
+        return trajectory
+
+    def add(self, channel, t, value):
+        """Add a keyframe; two keyframes at the same time make a jump."""
+        if channel not in CHANNELS:
+            raise ValueError(f"unknown channel {channel!r}, expected one of {CHANNELS}")
+        frames = self.keyframes.setdefault(channel, [])
+        if frames and t < frames[-1][0]:
+            raise ValueError(f"keyframes of {channel} must be in time order")
+        frames.append((t, value))
+        self._tables = {}
+
+    @property
+    def duration(self):
+        return max((frames[-1][0] for frames in self.keyframes.values()), default=0.0)
+
+    @property
+    def channels(self):
+        return tuple(self.keyframes)
+
+    def compile(self, rate=TABLE_RATE):
+        """
+        Time-indexed tables {channel: [value at i / rate]}, cached per rate.
+        At a jump the table holds the value after it.
+        """
+        if rate in self._tables:
+            return self._tables[rate]
+        samples = int(math.ceil(self.duration * rate)) + 1
+        tables = {}
+        for channel, frames in self.keyframes.items():
+            times = [t for t, _ in frames]
+            table = []
+            for i in range(samples):
+                t = i / rate
+                # last keyframe at or before t, the later one at a jump
+                k = bisect.bisect_right(times, t) - 1
+                if k < 0:
+                    table.append(frames[0][1])
+                elif k >= len(frames) - 1:
+                    table.append(frames[-1][1])
+                else:
+                    (t0, v0), (t1, v1) = frames[k], frames[k + 1]
+                    table.append(v0 + (v1 - v0) * (t - t0) / (t1 - t0))
+            tables[channel] = table
+        self._tables[rate] = tables
+        return tables
+
+
+class Playback:
+    """A trajectory being played by a MotionEngine."""
+
+    def __init__(self, trajectory, tables, rate):
+        self.trajectory = trajectory
+        self.tables = tables
+        self.rate = rate
+        self.channels = set(tables)
+        self.start_time = None
+        self.end_error = None     # finish time minus scheduled end (seconds)
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def value(self, channel, elapsed):
+        """Channel value `elapsed` seconds in, interpolated between table samples."""
+        table = self.tables[channel]
+        position = elapsed * self.rate
+        i = int(position)
+        if i >= len(table) - 1:
+            return table[-1]
+        if i < 0:
+            return table[0]
+        v0 = table[i]
+        return v0 + (table[i + 1] - v0) * (position - i)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait(self, timeout=None):
+        """Wait until finished or cancelled; returns True if done."""
+        return self.done.wait(timeout)
+
+
+class MotionEngine:
+    def __init__(self, px, rate=TICK_RATE, table_rate=TABLE_RATE, spin=SPIN_TIME,
+                 clock=time.perf_counter):
+        """
+        px: Picarx, wrapped in a CoalescingPicarx so unchanged values are not rewritten
+        rate: ticks per second
+        table_rate: sample rate of the compiled trajectory tables
+        spin: seconds of each wait spent spinning instead of sleeping
+        """
+        if not isinstance(px, CoalescingPicarx):
+            px = CoalescingPicarx(px)
+        self.px = px
+        self.period = 1.0 / rate
+        self.table_rate = table_rate
+        self.spin = spin
+        self.clock = clock
+        self.writers = {
+            "steering": px.set_dir_servo_angle,
+            "pan": px.set_cam_pan_angle,
+            "tilt": px.set_cam_tilt_angle,
+            "motor": px.forward,
+        }
+
+        self._pending = deque()   # appended by play(), drained by the engine thread
+        self._playing = []
+        self._running = False
+        self._thread = None
+        self._wake = threading.Event()   # set by play() and stop()
+
+        # instrumentation
+        self.ticks = 0
+        self.skipped_ticks = 0
+        self.tick_errors = deque(maxlen=TIMING_HISTORY)
+        self.max_tick_error = 0.0
+        self.end_errors = deque(maxlen=TIMING_HISTORY)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the engine thread; motion in progress is cancelled."""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        for playback in self._playing + list(self._pending):
+            playback.cancel()
+            self._finish(playback)
+        self._playing = []
+        self._pending.clear()
+
+    def play(self, trajectory):
+        """Start a trajectory on the next tick; returns its Playback."""
+        playback = Playback(trajectory, trajectory.compile(self.table_rate), self.table_rate)
+        self._pending.append(playback)
+        self._wake.set()
+        return playback
+
+    def cancel_all(self):
+        for playback in self._playing + list(self._pending):
+            playback.cancel()
+
+    @property
+    def busy(self):
+        return bool(self._playing or self._pending)
+
+    def _run(self):
+        next_tick = self.clock()
+        while self._running:
+            if not self.busy:
+                # idle: no ticks (and no spinning) until play() or stop();
+                # cleared before the check so a play() in between is not missed
+                self._wake.clear()
+                if not self.busy:
+                    self._wake.wait()
+                    next_tick = self.clock()
+                    continue
+            self._wait_until(next_tick)
+            now = self.clock()
+            error = now - next_tick
+            self.tick(now, next_tick)
+            self.ticks += 1
+            self.tick_errors.append(error)
+            if error > self.max_tick_error:
+                self.max_tick_error = error
+            next_tick += self.period
+            if self.clock() > next_tick + self.period:
+                # more than a tick behind: skip ahead instead of bursting
+                missed = int((self.clock() - next_tick) / self.period)
+                self.skipped_ticks += missed
+                next_tick += missed * self.period
+
+    def _wait_until(self, deadline):
+        remaining = deadline - self.clock()
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while self.clock() < deadline:
+            pass
+
+    def tick(self, now, scheduled=None):
+        """Start pending trajectories and write every channel's value for `now`."""
+        start = tracing.begin()
+        while self._pending:
+            playback = self._pending.popleft()
+            # a newer trajectory takes over shared channels
+            for other in self._playing:
+                other.channels -= playback.channels
+            playback.start_time = scheduled if scheduled is not None else now
+            self._playing.append(playback)
+
+        still_playing = []
+        for playback in self._playing:
+            if playback.cancelled:
+                if "motor" in playback.channels:
+                    self.px.stop()
+                self._finish(playback)
+                continue
+            if not playback.channels:
+                self._finish(playback)
+                continue
+            elapsed = now - playback.start_time
+            for channel in playback.channels:
+                self.writers[channel](playback.value(channel, elapsed))
+            if elapsed >= playback.trajectory.duration:
+                playback.end_error = elapsed - playback.trajectory.duration
+                self.end_errors.append(playback.end_error)
+                self._finish(playback)
+            else:
+                still_playing.append(playback)
+        self._playing = still_playing
+        self.px.flush()
+        tracing.end("motion.tick", start, "control")
+
+    def _finish(self, playback):
+        playback.done.set()
+
+    def timing_stats(self):
+        """Tick lateness against the schedule and trajectory end errors (seconds)."""
+        stats = {"ticks": self.ticks, "skipped_ticks": self.skipped_ticks,
+                 "max_tick_error": self.max_tick_error}
+        if self.tick_errors:
+            ordered = sorted(self.tick_errors)
+            stats["mean_tick_error"] = sum(ordered) / len(ordered)
+            stats["p95_tick_error"] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        if self.end_errors:
+            stats["max_end_error"] = max(self.end_errors)
+        return stats
@@ -0,0 +1,106 @@
+"""
+Non-blocking obstacle avoidance for the PiCar-X.
+
+The avoidance behaviour is a timed state machine: maneuvers (turning away,
+backing up) last for a set duration, but the distance is read on every tick
+so a maneuver can be escalated or aborted as soon as the reading changes.
+
+    cruise  -- distance >= safe_distance: drive straight
+    turn    -- danger_distance <= distance < safe_distance: steer away
+    reverse -- distance < danger_distance: back up while steering
+
+Usage:
+    avoider = ObstacleAvoider(px)
+    while True:
+        avoider.tick()
+        time.sleep(0.02)
+"""
+
+import time
+
+from utils import metrics, tracing
+
+CRUISE = "cruise"
+TURN = "turn"
+REVERSE = "reverse"
+
+
+class ObstacleAvoider:
+    def __init__(self, px, power=50, safe_distance=40, danger_distance=20,
+                 turn_angle=30, turn_time=0.1, reverse_time=0.5, clock=time.monotonic):
+        """
+        px: Picarx (or CoalescingPicarx) to drive
+        turn_time/reverse_time: how long a maneuver is held once started (s)
+        """
+        self.px = px
+        self.power = power
+        self.safe_distance = safe_distance
+        self.danger_distance = danger_distance
+        self.turn_angle = turn_angle
+        self.clock = clock
+        self.durations = {CRUISE: 0.0, TURN: turn_time, REVERSE: reverse_time}
+
+        self.state = None
+        self.state_until = 0.0
+        self.distance = None
+
+        self.read_metric = metrics.histogram("picarx_sensor_read_seconds", "Sensor read time",
+                                             {"sensor": "ultrasonic"})
+
+    def tick(self, distance=None):
+        """
+        Read the distance (unless given), update the state and drive.
+
+        Returns the current state.
+        """
+        if distance is None:
+            with tracing.span("ultrasonic.read", "sensor"), self.read_metric.time():
+                distance = round(self.px.ultrasonic.read(), 2)
+        self.distance = distance
+        now = self.clock()
+
+        start = tracing.begin()
+        state = self.next_state(distance, now)
+        if state != self.state:
+            tracing.instant("avoid." + state, "control", {"distance": distance})
+        if state != self.state or self._in_zone(state, distance):
+            # entering a maneuver, or a reading that keeps us in its zone,
+            # restarts its timer; a held maneuver keeps its deadline
+            self.state_until = now + self.durations[state]
+        self.state = state
+        self._drive(state)
+        tracing.end("avoid.decide", start, "control")
+        return state
+
+    def next_state(self, distance, now):
+        """Pick the state for this tick from the reading and running maneuver."""
+        # an obstacle inside the danger zone always restarts the back-up
+        if distance < self.danger_distance:
+            return REVERSE
+        if self.state == REVERSE and now < self.state_until:
+            # abort the back-up early once the path ahead is clear
+            return CRUISE if distance >= self.safe_distance else REVERSE
+        if distance < self.safe_distance:
+            return TURN
+        if self.state == TURN and now < self.state_until:
+            return TURN
+        return CRUISE
+
+    def _in_zone(self, state, distance):
+        if state == REVERSE:
+            return distance < self.danger_distance
+        if state == TURN:
+            return distance < self.safe_distance
+        return False
+
+    def _drive(self, state):
+        # repeated commands are cheap when px is a CoalescingPicarx
+        if state == CRUISE:
+            self.px.set_dir_servo_angle(0)
+            self.px.forward(self.power)
+        elif state == TURN:
+            self.px.set_dir_servo_angle(self.turn_angle)
+            self.px.forward(self.power)
+        else:
+            self.px.set_dir_servo_angle(-self.turn_angle)
+            self.px.backward(self.power)
@@ -0,0 +1,129 @@
+"""
+Pooled servo objects with batched multi-channel writes.
+
+Constructing a robot_hat Servo sets up the PWM timer of its channel over
+I2C, so scripts that call Servo(i) for every move pay that cost again each
+time. ServoRegistry creates each channel's object once and keeps it, and
+write() sets a batch of target angles across channels in one pass, with no
+sleeps in between and skipping channels already at their target.
+
+move() then waits once for the whole batch, for the estimated travel time
+of the servo with the farthest to go (SERVO_SPEED), instead of a fixed
+sleep after every channel.
+
+Channels are robot_hat channel numbers or names ("P0".."P11"). The Picarx
+steering, pan and tilt servos can be registered by name with from_picarx(),
+which goes through the Picarx setters so calibration offsets and the
+steering state used by forward() stay correct.
+
+Usage:
+    servos = ServoRegistry()
+    servos.move({i: 0 for i in range(12)})     # zero all channels at once
+
+    servos = ServoRegistry.from_picarx(px)
+    servos.move({"steering": -30, "pan": -30, "tilt": -30})
+"""
+
+import time
+
+# Conservative no-load speed of the PiCar-X servos (about 0.12 s per 60 degrees)
+SERVO_SPEED = 500       # degrees/s
+SETTLE_TIME = 0.05      # seconds added to every move
+# Distance assumed for a servo whose position is unknown
+FULL_TRAVEL = 90        # degrees
+
+
+class _SetterServo:
+    """Adapts a Picarx angle setter to the Servo.angle() interface."""
+
+    def __init__(self, setter):
+        self.angle = setter
+
+
+class ServoRegistry:
+    def __init__(self, servo_factory=None, speed=SERVO_SPEED, settle_time=SETTLE_TIME):
+        """
+        servo_factory: function channel -> servo object with an angle()
+            method (default robot_hat.Servo)
+        speed: servo speed used to estimate travel times (degrees/s)
+        """
+        if servo_factory is None:
+            from robot_hat import Servo
+            servo_factory = Servo
+        self.servo_factory = servo_factory
+        self.speed = speed
+        self.settle_time = settle_time
+        self.servos = {}
+        self.angles = {}    # last angle written per channel
+
+        # instrumentation
+        self.created = 0
+        self.writes = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_picarx(cls, px, **kwargs):
+        """Registry with the Picarx "steering", "pan" and "tilt" servos."""
+        registry = cls(servo_factory=lambda channel: None, **kwargs)
+        registry.register("steering", _SetterServo(px.set_dir_servo_angle))
+        registry.register("pan", _SetterServo(px.set_cam_pan_angle))
+        registry.register("tilt", _SetterServo(px.set_cam_tilt_angle))
+        return registry
+
+    def register(self, channel, servo):
+        """Add an existing servo object (anything with an angle() method)."""
+        self.servos[channel] = servo
+        self.angles.pop(channel, None)
+
+    def get(self, channel):
+        """The channel's servo object, created on first use."""
+        servo = self.servos.get(channel)
+        if servo is None:
+            servo = self.servo_factory(channel)
+            if servo is None:
+                raise KeyError(f"unknown servo channel {channel!r}")
+            self.servos[channel] = servo
+            self.created += 1
+        return servo
+
+    def write(self, targets, force=False):
+        """
+        Set {channel: angle} in one pass; returns the estimated time until
+        every servo has arrived (seconds).
+
+        force: write channels already at their target too (e.g. after a
+            calibration offset changed)
+        """
+        travel = 0.0
+        for channel, angle in targets.items():
+            previous = self.angles.get(channel)
+            if previous == angle and not force:
+                self.skipped += 1
+                continue
+            self.get(channel).angle(angle)
+            self.angles[channel] = angle
+            self.writes += 1
+            distance = FULL_TRAVEL if previous is None else abs(angle - previous)
+            travel = max(travel, distance / self.speed)
+        return travel + self.settle_time if travel else 0.0
+
+    def move(self, targets, force=False):
+        """write() the targets, then wait until the servos have arrived."""
+        wait = self.write(targets, force)
+        if wait:
+            time.sleep(wait)
+
+    def forget(self, channel=None):
+        """Mark positions unknown (all channels by default), e.g. after a reset."""
+        if channel is None:
+            self.angles.clear()
+        else:
+            self.angles.pop(channel, None)
+
+    def stats(self):
+        return {
+            "servos": len(self.servos),
+            "created": self.created,
+            "writes": self.writes,
+            "skipped": self.skipped,
+        }
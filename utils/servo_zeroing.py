@@ -1,17 +1,24 @@
-from robot_hat import Servo
 from robot_hat.utils import reset_mcu
-from time import sleep
+from time import sleep, perf_counter
+import sys
+from pathlib import Path
+# Add parent directory to path so we can import utils module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.servo_registry import ServoRegistry
 
 reset_mcu()
 sleep(0.2)
 
+CHANNELS = range(12)
+
 if __name__ == '__main__':
     print(f"Set servo to zero")
-    for i in range(12):
-        # print(f"Servo {i} set to zero")
-        Servo(i).angle(10)
-        sleep(0.1)
-        Servo(i).angle(0)
-        sleep(0.1)
+    start = perf_counter()
+    # one Servo object per channel, all channels moved together: a small
+    # wiggle so each servo visibly responds, then zero
+    servos = ServoRegistry()
+    servos.move({i: 10 for i in CHANNELS})
+    servos.move({i: 0 for i in CHANNELS})
+    print(f"{len(CHANNELS)} servos zeroed in {perf_counter() - start:.2f} s")
     while True:
-        sleep(1)
\ No newline at end of file
+        sleep(1)
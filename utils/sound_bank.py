@@ -0,0 +1,430 @@
+"""
+Preloaded sound bank and a low-latency software mixer.
+
+robot_hat's Music.sound_play() opens and decodes the WAV file on every
+call and plays one sound at a time. SoundBank decodes every .wav in a
+folder once at startup into float PCM buffers at the mixer format, and
+Mixer plays any number of them at once (effects over background music)
+from a thread that writes fixed-size blocks to an output sink.
+
+A sound triggered with play() starts with the next mixed block, so the
+trigger-to-output latency is at most one block plus the audio the sink
+has queued ahead (BLOCK_FRAMES / RATE + buffer, about 6 + 20 ms by
+default). The mixer records that latency for every trigger, see
+latency_stats().
+
+Sinks:
+    AplaySink   -- the sound card, through an `aplay` process
+    NullSink    -- discards the audio, paced like a sound card
+    WavFileSink -- writes what would have been played to a WAV file
+
+Usage:
+    bank = SoundBank("sound")
+    mixer = Mixer(bank, AplaySink())
+    mixer.start()
+    music = mixer.play("car-start-engine", volume=0.3, loop=True)
+    mixer.play("car-double-horn")
+    mixer.stop_voice(music)
+    mixer.stop()
+"""
+
+import itertools
+import os
+import struct
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+
+RATE = 44100
+CHANNELS = 2
+BLOCK_FRAMES = 256
+# Audio queued in the sink ahead of the block being mixed
+BUFFER_TIME = 0.02
+
+LATENCY_HISTORY = 1000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _decode_samples(data, format_tag, bits, channels):
+    """Interleaved sample bytes to a (frames, channels) float32 array in [-1, 1]."""
+    width = bits // 8
+    data = data[:len(data) - len(data) % (width * channels)]
+    if format_tag == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        samples = np.frombuffer(data, dtype='<f4')
+    elif format_tag == WAVE_FORMAT_PCM and bits == 8:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif format_tag == WAVE_FORMAT_PCM and bits == 16:
+        samples = np.frombuffer(data, dtype='<i2') / 32768.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 24:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.uint32)
+        # little-endian 24-bit placed in the top bytes of an int32 keeps the sign
+        packed = (raw[:, 0] << 8) | (raw[:, 1] << 16) | (raw[:, 2] << 24)
+        samples = packed.view(np.int32) / 2147483648.0
+    elif format_tag == WAVE_FORMAT_PCM and bits == 32:
+        samples = np.frombuffer(data, dtype='<i4') / 2147483648.0
+    else:
+        raise ValueError(f"unsupported WAV sample format {format_tag:#x}, {bits} bits")
+    return samples.astype(np.float32).reshape(-1, channels)
+
+
+def load_wav(path, rate=RATE, channels=CHANNELS):
+    """
+    Decode a WAV file into a (frames, channels) float32 array at the given
+    rate and channel count.
+
+    Reads the RIFF chunks directly: the clips in sound/ are 24-bit
+    WAVE_FORMAT_EXTENSIBLE files, which the wave module does not open on
+    older Pythons.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError(f"{path}: not a WAV file")
+        fmt = None
+        data = None
+        while fmt is None or data is None:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            chunk_id, size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'fmt ':
+                fmt = f.read(size)
+            elif chunk_id == b'data':
+                data = f.read(size)
+            else:
+                f.seek(size, os.SEEK_CUR)
+            if size & 1:
+                f.seek(1, os.SEEK_CUR)
+    if fmt is None or data is None:
+        raise ValueError(f"{path}: missing fmt or data chunk")
+
+    format_tag, file_channels, file_rate = struct.unpack('<HHI', fmt[:8])
+    bits = struct.unpack('<H', fmt[14:16])[0]
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # the first two bytes of the sub-format GUID are the actual format
+        format_tag = struct.unpack('<H', fmt[24:26])[0]
+    samples = _decode_samples(data, format_tag, bits, file_channels)
+
+    if file_channels != channels:
+        if channels == 1:
+            samples = samples.mean(axis=1, keepdims=True)
+        elif file_channels == 1:
+            samples = np.repeat(samples, channels, axis=1)
+        else:
+            samples = samples[:, :channels]
+    if file_rate != rate and len(samples) > 1:
+        # linear interpolation is plenty for sound effects
+        frames = int(round(len(samples) * rate / file_rate))
+        positions = np.arange(frames) * (file_rate / rate)
+        source = np.arange(len(samples))
+        samples = np.stack([np.interp(positions, source, samples[:, c]) for c in range(channels)],
+                           axis=1).astype(np.float32)
+    return np.ascontiguousarray(samples)
+
+
+class SoundBank:
+    """Every .wav in a folder, decoded once, keyed by file name without extension."""
+
+    def __init__(self, sound_dir=None, rate=RATE, channels=CHANNELS):
+        self.rate = rate
+        self.channels = channels
+        self.clips = {}
+        if sound_dir is not None:
+            self.load_dir(sound_dir)
+
+    def load_dir(self, sound_dir):
+        for name in sorted(os.listdir(sound_dir)):
+            if name.lower().endswith('.wav'):
+                self.load(os.path.join(sound_dir, name))
+
+    def load(self, path, name=None):
+        """Decode one file into the bank; returns its name."""
+        if name is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+        self.clips[name] = load_wav(path, self.rate, self.channels)
+        return name
+
+    def add(self, name, samples):
+        """Add already decoded (frames, channels) float samples."""
+        self.clips[name] = np.ascontiguousarray(samples, dtype=np.float32)
+
+    def discard(self, name):
+        """Drop a clip if loaded (voices already playing it are not affected)."""
+        self.clips.pop(name, None)
+
+    def duration(self, name):
+        return len(self.clips[name]) / self.rate
+
+    def __contains__(self, name):
+        return name in self.clips
+
+    def __getitem__(self, name):
+        return self.clips[name]
+
+
+# Output sinks
+# ==========================================
+class _PacedSink:
+    """
+    Consumes audio at the sample rate like a sound card with `buffer`
+    seconds of queue: write() returns at once while the queue has room and
+    sleeps otherwise.
+    """
+
+    latency = 0.0
+
+    def __init__(self, rate=RATE, channels=CHANNELS, buffer=BUFFER_TIME, realtime=True):
+        self.rate = rate
+        self.channels = channels
+        self.buffer = buffer
+        self.realtime = realtime
+        self.frames = 0
+        self._start = None
+
+    def write(self, block):
+        now = time.monotonic()
+        if self._start is None or now > self._start + self.frames / self.rate:
+            # first block, or the queue ran dry: playback restarts now
+            self._start = now - self.frames / self.rate
+        self.frames += len(block)
+        self._consume(block)
+        if self.realtime:
+            due = self._start + self.frames / self.rate - self.buffer
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _consume(self, block):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullSink(_PacedSink):
+    """Discards the audio (for testing without audio hardware)."""
+
+
+class WavFileSink(_PacedSink):
+    """Writes the mixed output to a 16-bit WAV file."""
+
+    def __init__(self, path, rate=RATE, channels=CHANNELS, buffer=BUFFER_TIME, realtime=True):
+        """
+        realtime: pace writes like a sound card, so triggers land in the
+            file where they would have been heard; False renders as fast
+            as possible
+        """
+        super().__init__(rate, channels, buffer, realtime)
+        self._file = wave.open(str(path), 'wb')
+        self._file.setnchannels(channels)
+        self._file.setsampwidth(2)
+        self._file.setframerate(rate)
+
+    def _consume(self, block):
+        self._file.writeframes(block.tobytes())
+
+    def close(self):
+        self._file.close()
+
+
+class AplaySink:
+    """Plays through ALSA with an `aplay` process reading raw PCM from a pipe."""
+
+    def __init__(self, rate=RATE, channels=CHANNELS, buffer=BUFFER_TIME, device=None):
+        """
+        buffer: ALSA buffer time (seconds); writes block once it is full
+        device: ALSA device name, e.g. "hw:0" (default: the system default)
+        """
+        self.rate = rate
+        self.channels = channels
+        self.buffer = buffer
+        # a quarter of the buffer is one ALSA period, the granularity the
+        # card takes data at
+        self.latency = buffer / 4
+        command = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(rate), "-c", str(channels),
+                   f"--buffer-time={int(buffer * 1e6)}", f"--period-time={int(buffer * 1e6 / 4)}"]
+        if device:
+            command += ["-D", device]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, block):
+        self._process.stdin.write(block.tobytes())
+        self._process.stdin.flush()
+
+    def close(self):
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.wait()
+
+
+# Mixer
+# ==========================================
+class _Voice:
+    __slots__ = ("id", "samples", "volume", "loop", "position", "trigger_time")
+
+    def __init__(self, voice_id, samples, volume, loop, trigger_time):
+        self.id = voice_id
+        self.samples = samples
+        self.volume = volume
+        self.loop = loop
+        self.position = 0
+        self.trigger_time = trigger_time
+
+
+class Mixer:
+    def __init__(self, bank, sink, block_frames=BLOCK_FRAMES, volume=1.0, clock=time.monotonic):
+        """
+        bank: SoundBank with the clips to play
+        sink: output, must match the bank's rate and channel count
+        block_frames: frames mixed per block; smaller blocks lower the
+            latency and raise the CPU cost
+        volume: master volume (0..1)
+        """
+        self.bank = bank
+        self.sink = sink
+        self.block_frames = block_frames
+        self.volume = volume
+        self.clock = clock
+
+        self._ids = itertools.count(1)
+        self._commands = deque()   # appended by play()/stop_voice(), drained by the mixer thread
+        self._voices = []
+        self._running = False
+        self._thread = None
+        self._mix_buffer = np.zeros((block_frames, bank.channels), dtype=np.float32)
+
+        # instrumentation
+        self.frames = 0
+        self.blocks = 0
+        self.underruns = 0
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.max_latency = 0.0
+        self.triggers = 0
+        self._start = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        self.sink.close()
+
+    def play(self, name, volume=1.0, loop=False):
+        """Start a clip from the bank; returns a voice id for stop_voice()."""
+        voice = _Voice(next(self._ids), self.bank[name], volume, loop, self.clock())
+        self._commands.append(("play", voice))
+        return voice.id
+
+    def stop_voice(self, voice_id):
+        self._commands.append(("stop", voice_id))
+
+    def stop_all(self):
+        self._commands.append(("stop", None))
+
+    @property
+    def active(self):
+        """Number of voices playing."""
+        return len(self._voices)
+
+    def _apply_commands(self):
+        started = []
+        while self._commands:
+            command, arg = self._commands.popleft()
+            if command == "play":
+                self._voices.append(arg)
+                started.append(arg)
+            elif arg is None:
+                self._voices = []
+                started = []
+            else:
+                self._voices = [v for v in self._voices if v.id != arg]
+                started = [v for v in started if v.id != arg]
+        return started
+
+    def mix(self):
+        """Mix the next block of every voice; returns int16 (frames, channels)."""
+        out = self._mix_buffer
+        out.fill(0)
+        frames = self.block_frames
+        playing = []
+        for voice in self._voices:
+            samples = voice.samples
+            filled = 0
+            while filled < frames:
+                n = min(frames - filled, len(samples) - voice.position)
+                if n <= 0:
+                    break
+                chunk = samples[voice.position:voice.position + n]
+                if voice.volume == 1.0:
+                    out[filled:filled + n] += chunk
+                else:
+                    out[filled:filled + n] += chunk * voice.volume
+                voice.position += n
+                filled += n
+                if voice.position >= len(samples) and voice.loop:
+                    voice.position = 0
+            if voice.position < len(samples):
+                playing.append(voice)
+        self._voices = playing
+        return (np.clip(out * (self.volume * 32767), -32768, 32767)).astype('<i2')
+
+    def _run(self):
+        rate = self.bank.rate
+        while self._running:
+            started = self._apply_commands()
+            block = self.mix()
+
+            now = self.clock()
+            if self._start is None or now > self._start + self.frames / rate:
+                # the sink's queue ran dry (or first block): it plays from now
+                if self._start is not None:
+                    self.underruns += 1
+                self._start = now - self.frames / rate
+            # time the first sample of this block reaches the output
+            output_time = self._start + self.frames / rate + self.sink.latency
+            for voice in started:
+                self._record_latency(output_time - voice.trigger_time)
+
+            try:
+                self.sink.write(block)
+            except (OSError, ValueError) as e:
+                print(f"[sound] output failed: {e}", flush=True)
+                self._running = False
+                break
+            self.frames += len(block)
+            self.blocks += 1
+
+    def _record_latency(self, latency):
+        self.triggers += 1
+        self.latencies.append(latency)
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def latency_bound(self):
+        """Worst-case trigger-to-output latency without underruns (seconds)."""
+        buffer = getattr(self.sink, "buffer", 0.0)
+        return self.block_frames / self.bank.rate + buffer + self.sink.latency
+
+    def latency_stats(self):
+        """Trigger-to-output latency over the last LATENCY_HISTORY triggers (seconds)."""
+        stats = {"triggers": self.triggers, "underruns": self.underruns,
+                 "max": self.max_latency, "bound": self.latency_bound()}
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            stats["mean"] = sum(ordered) / len(ordered)
+            stats["p50"] = ordered[len(ordered) // 2]
+            stats["p95"] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return stats
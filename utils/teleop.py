@@ -0,0 +1,271 @@
+"""
+Continuous keyboard teleoperation for the PiCar-X.
+
+The original keyboard example blocked on readkey(), drove for a fixed
+sleep(0.5) per key and ignored input meanwhile. Here the work is split:
+
+- KeyReader reads keys on its own thread and hands every key event
+  (first press and auto-repeats) to Teleop.key_event()
+- KeyCommands keeps the set of held keys and turns it into speed and
+  steering targets
+- Teleop sends those targets on a fixed-rate tick to a CoalescingPicarx,
+  which ramps them smoothly (slew-limited) and writes only on change
+
+A terminal sends no key-up events. A held key is one key event, then
+after the auto-repeat delay (typically 250-600 ms) a repeat every 30-50
+ms, so a key counts as held for INITIAL_HOLD after its first event and
+REPEAT_HOLD after each repeat. Only the last key pressed auto-repeats,
+so any key event also keeps the other held keys alive: holding w, then
+pressing a, keeps driving forward while turning. Steering keys only steer
+(the original example also drove forward on a/d, since it could not
+combine keys).
+
+Deadman: when no key event has arrived for `deadman` seconds the motors
+are stopped at once, without the ramp, and the steering is centered.
+
+Usage:
+    teleop = Teleop(Picarx())
+    reader = KeyReader(teleop.key_event)
+    reader.start()
+    teleop.run(reader.quit)
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from utils import metrics, tracing
+from utils.actuator_coalescer import CoalescingPicarx
+
+DRIVE_KEYS = {"w": 1, "s": -1}
+STEER_KEYS = {"a": -1, "d": 1}
+CAMERA_KEYS = {"i": ("tilt", 1), "k": ("tilt", -1), "l": ("pan", 1), "j": ("pan", -1)}
+OPPOSITE = {"w": "s", "s": "w", "a": "d", "d": "a"}
+CTRL_C = "\x03"
+
+INITIAL_HOLD = 0.55
+REPEAT_HOLD = 0.12
+DEADMAN = 0.6
+
+# speed: motor power (%), steering/pan/tilt: angles (degrees)
+Command = namedtuple("Command", ["speed", "steering", "pan", "tilt"])
+
+TICK_RATE = 50          # Hz
+ACCELERATION = 400      # motor power %/s
+STEER_RATE = 300        # degrees/s
+
+
+class HeldKeys:
+    """Held-key state rebuilt from key press and auto-repeat events."""
+
+    def __init__(self, initial_hold=INITIAL_HOLD, repeat_hold=REPEAT_HOLD):
+        self.initial_hold = initial_hold
+        self.repeat_hold = repeat_hold
+        self.expires = {}   # key -> time it counts as released
+
+    def press(self, key, now):
+        """Record a key event; returns True for a new press, False for a repeat."""
+        repeat = key in self.expires and self.expires[key] > now
+        # the user is still holding whatever is held, see module docstring
+        for other in self.expires:
+            self.expires[other] = max(self.expires[other], now + self.repeat_hold)
+        self.expires.pop(OPPOSITE.get(key), None)
+        self.expires[key] = now + (self.repeat_hold if repeat else self.initial_hold)
+        return not repeat
+
+    def held(self, now):
+        """Keys still held at `now` (expired keys are dropped)."""
+        for key in [k for k, t in self.expires.items() if t <= now]:
+            del self.expires[key]
+        return self.expires.keys()
+
+    def clear(self):
+        self.expires.clear()
+
+
+class KeyReader:
+    """Reads keys on a background thread; Ctrl+C sets `quit`."""
+
+    def __init__(self, on_key, read_key=None, clock=time.monotonic):
+        """
+        on_key: function (key, time) called for every key event
+        read_key: blocking function returning the next key (default readchar.readkey)
+        """
+        if read_key is None:
+            import readchar
+            read_key = readchar.readkey
+        self.on_key = on_key
+        self.read_key = read_key
+        self.clock = clock
+        self.quit = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self.quit.is_set():
+                key = self.read_key()
+                if key == CTRL_C:
+                    break
+                self.on_key(key.lower(), self.clock())
+        except KeyboardInterrupt:
+            # readchar versions that raise on Ctrl+C instead of returning it
+            pass
+        finally:
+            self.quit.set()
+
+
+class KeyCommands:
+    """
+    Driving commands from key events: held drive/steer keys and stepped
+    camera angles. Shared by the local Teleop loop and the network client.
+    """
+
+    def __init__(self, speed=80, steer_angle=30, camera_step=5, camera_limit=30,
+                 deadman=DEADMAN, clock=time.monotonic):
+        """
+        speed: motor power while a drive key is held (%)
+        steer_angle: steering angle while a steer key is held (degrees)
+        camera_step: pan/tilt change per key event (degrees)
+        deadman: seconds without key events before command() returns None
+        """
+        self.speed = speed
+        self.steer_angle = steer_angle
+        self.camera_step = camera_step
+        self.camera_limit = camera_limit
+        self.deadman = deadman
+        self.clock = clock
+
+        self.keys = HeldKeys()
+        self.pan = 0
+        self.tilt = 0
+        self.last_event = None
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def key_event(self, key, now=None):
+        """Handle one key event (press or auto-repeat); safe to call from any thread."""
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            self.events += 1
+            self.last_event = now
+            if key in CAMERA_KEYS:
+                # camera keys step once per event, repeats keep moving
+                axis, direction = CAMERA_KEYS[key]
+                value = getattr(self, axis) + direction * self.camera_step
+                setattr(self, axis, max(-self.camera_limit, min(self.camera_limit, value)))
+            elif key in DRIVE_KEYS or key in STEER_KEYS:
+                self.keys.press(key, now)
+
+    def command(self, now=None):
+        """Command for the keys held at `now`, or None once the deadman has expired."""
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            if self.last_event is None or now - self.last_event > self.deadman:
+                self.keys.clear()
+                return None
+            held = self.keys.held(now)
+            drive = sum(DRIVE_KEYS[k] for k in held if k in DRIVE_KEYS)
+            steer = sum(STEER_KEYS[k] for k in held if k in STEER_KEYS)
+            return Command(drive * self.speed, steer * self.steer_angle, self.pan, self.tilt)
+
+    def camera(self):
+        """Current (pan, tilt), kept while the deadman is expired."""
+        return self.pan, self.tilt
+
+
+class Teleop:
+    def __init__(self, px, speed=80, steer_angle=30, camera_step=5, camera_limit=30,
+                 rate=TICK_RATE, acceleration=ACCELERATION, steer_rate=STEER_RATE,
+                 deadman=DEADMAN, clock=time.monotonic):
+        """
+        px: Picarx, wrapped in a CoalescingPicarx with the slew rates
+        rate: control ticks per second
+        acceleration, steer_rate: smoothing, max change per second of
+            motor power and steering angle
+        speed, steer_angle, camera_step, camera_limit, deadman: see KeyCommands
+        """
+        if not isinstance(px, CoalescingPicarx):
+            px = CoalescingPicarx(px, slew_rates={"motor": acceleration, "steering": steer_rate})
+        self.px = px
+        self.input = KeyCommands(speed, steer_angle, camera_step, camera_limit, deadman, clock)
+        self.period = 1.0 / rate
+        self.clock = clock
+
+        # the first tick writes a stop, so ramps start from a known value
+        self.stopped = False
+
+        # instrumentation
+        self.ticks = 0
+        self.late_ticks = 0
+        self.deadman_stops = 0
+        self.loop_metrics = metrics.LoopTimer("teleop", clock=clock)
+        self.deadman_metric = metrics.counter("picarx_teleop_deadman_stops_total",
+                                              "Stops because no key was held")
+
+    def key_event(self, key, now=None):
+        """Handle one key event; safe to call from any thread (e.g. KeyReader)."""
+        self.input.key_event(key, now)
+
+    @tracing.traced("control", "teleop.tick")
+    def tick(self, now=None):
+        """Send this tick's commands."""
+        if now is None:
+            now = self.clock()
+        self.ticks += 1
+        self.loop_metrics.tick(now)
+        command = self.input.command(now)
+        if command is None:
+            pan, tilt = self.input.camera()
+            self.px.set_cam_pan_angle(pan)
+            self.px.set_cam_tilt_angle(tilt)
+            if not self.stopped:
+                self.px.stop()
+                self.stopped = True
+                if self.input.last_event is not None:
+                    self.deadman_stops += 1
+                    self.deadman_metric.inc()
+                    tracing.instant("teleop.deadman", "safety")
+            self.px.set_dir_servo_angle(0)
+            self.px.flush()
+            return
+        self.px.set_cam_pan_angle(command.pan)
+        self.px.set_cam_tilt_angle(command.tilt)
+        self.px.set_dir_servo_angle(command.steering)
+        self.px.forward(command.speed)
+        self.px.flush()
+        self.stopped = False
+
+    def run(self, quit):
+        """Tick at the fixed rate until the `quit` event is set."""
+        next_tick = self.clock()
+        while not quit.is_set():
+            self.tick()
+            next_tick += self.period
+            delay = next_tick - self.clock()
+            if delay > 0:
+                quit.wait(delay)
+            else:
+                # fell behind: skip the missed ticks instead of bursting
+                self.late_ticks += 1
+                next_tick = self.clock()
+
+    def shutdown(self):
+        """Stop the motors and center the servos."""
+        self.px.stop(force=True)
+        self.px.px.set_dir_servo_angle(0)
+        self.px.px.set_cam_pan_angle(0)
+        self.px.px.set_cam_tilt_angle(0)
+
+    def stats(self):
+        return {
+            "events": self.input.events,
+            "ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "deadman_stops": self.deadman_stops,
+        }
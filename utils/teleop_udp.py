@@ -0,0 +1,280 @@
+"""
+UDP teleoperation channel, modelled on UdpDetectionSender/DetectionReceiver.
+
+The client (a laptop) sends one small binary packet per tick, 50 times a
+second, whether or not the command changed; the car applies the newest one
+and stops when they stop arriving.
+
+Packet (30 bytes, little-endian):
+
+    magic    2s   b"PT"
+    version  B    PROTOCOL_VERSION
+    flags    B    FLAG_STOP: stop now (client exiting or deadman expired)
+    session  H    random per client run, resets sequence tracking
+    seq      I    sequence number, +1 per packet (wraps at 2**32)
+    sent     d    sender's time.monotonic() at send
+    speed    b    motor power, -100..100
+    steering b    degrees
+    pan      b    degrees
+    tilt     b    degrees
+    tag      8s   HMAC-SHA256 of the fields above with the shared key,
+                  truncated; zeros when no key is used
+
+Anyone who can reach the port could drive the car, so the receiver only
+listens on loopback unless it is given a shared key (packets without a
+valid tag are dropped) or a list of peer addresses to accept packets from.
+
+The receiver drops:
+- packets with a bad tag or from an address not in peers
+- packets with a sequence number not newer than the newest one received
+  (duplicates and out-of-order arrivals)
+- packets of another session until the current one has been silent for
+  `timeout`, so a second client (or a replayed old session) cannot take
+  over while the current client is connected
+- stale packets, delayed more than max_age beyond the fastest packet seen
+  from the session in the last OFFSET_WINDOW seconds. Sender and receiver
+  clocks are never compared directly, only the change in (arrival - sent),
+  so they need not be synchronized; the window lets the estimate follow
+  the drift between the two clocks over a long session.
+
+get_command() returns None (stop the car) once no packet has been applied
+for `timeout` seconds, or when the client asked to stop.
+"""
+
+import random
+import select
+import socket
+import struct
+import time
+from collections import deque
+
+from utils import tracing
+from utils.teleop import Command
+
+DEFAULT_PORT = 5006
+DEFAULT_ADDR = ("127.0.0.1", DEFAULT_PORT)
+
+PACKET = struct.Struct("<2sBBHIdbbbb8s")
+MAGIC = b"PT"
+PROTOCOL_VERSION = 2
+FLAG_STOP = 0x01
+TAG_SIZE = 8
+NO_TAG = bytes(TAG_SIZE)
+
+SEQ_MOD = 1 << 32
+
+# seconds of packets the fastest (arrival - sent) is taken over
+OFFSET_WINDOW = 10.0
+
+
+def clamp(value, lo=-128, hi=127):
+    return max(lo, min(hi, int(round(value))))
+
+
+def _key_bytes(key):
+    if key is None or isinstance(key, bytes):
+        return key or None
+    return key.encode("utf-8") or None
+
+
+# hmac and hashlib are only imported once a key is used
+def _tag(key, body):
+    import hashlib
+    import hmac
+
+    return hmac.new(key, body, hashlib.sha256).digest()[:TAG_SIZE]
+
+
+def _tag_matches(key, body, tag):
+    import hmac
+
+    return hmac.compare_digest(tag, _tag(key, body))
+
+
+def pack_command(session, seq, command, stop=False, sent=None, key=None):
+    """key: shared key (bytes or str) the packet is signed with, None to send it unsigned"""
+    if sent is None:
+        sent = time.monotonic()
+    flags = FLAG_STOP if stop else 0
+    data = PACKET.pack(MAGIC, PROTOCOL_VERSION, flags, session, seq % SEQ_MOD, sent,
+                       clamp(command.speed, -100, 100), clamp(command.steering),
+                       clamp(command.pan), clamp(command.tilt), NO_TAG)
+    key = _key_bytes(key)
+    if key is None:
+        return data
+    body = data[:-TAG_SIZE]
+    return body + _tag(key, body)
+
+
+def unpack_command(data, key=None):
+    """
+    (session, seq, sent, stop, Command) or None for anything that is not a
+    packet, or (with a key) not signed with that key.
+    """
+    if len(data) != PACKET.size:
+        return None
+    magic, version, flags, session, seq, sent, speed, steering, pan, tilt, tag = PACKET.unpack(data)
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        return None
+    key = _key_bytes(key)
+    if key is not None and not _tag_matches(key, data[:-TAG_SIZE], tag):
+        return None
+    return session, seq, sent, bool(flags & FLAG_STOP), Command(speed, steering, pan, tilt)
+
+
+class UdpTeleopSender:
+    def __init__(self, addr=DEFAULT_ADDR, key=None):
+        """key: shared key the car's TeleopReceiver was given, if any"""
+        self.addr = addr
+        self.key = _key_bytes(key)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.session = random.getrandbits(16)
+        self.seq = 0
+
+    def send(self, command, stop=False):
+        """Send one command (a teleop.Command); stop=True asks the car to stop."""
+        self.seq = (self.seq + 1) % SEQ_MOD
+        self.sock.sendto(pack_command(self.session, self.seq, command, stop, key=self.key), self.addr)
+
+
+def _is_loopback(host):
+    import ipaddress
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+class TeleopReceiver:
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", timeout=0.3, max_age=0.15,
+                 clock=time.monotonic, key=None, peers=None):
+        """
+        host: address to listen on; anything but loopback needs key or peers
+        timeout: seconds without an applied packet before get_command() returns None
+        max_age: extra delay (seconds) past the fastest packet before a packet is stale
+        key: shared key (bytes or str); packets not signed with it are dropped
+        peers: IP addresses packets are accepted from, e.g. ["192.168.1.20"]
+        """
+        self.key = _key_bytes(key)
+        self.peers = set(peers) if peers else None
+        if not _is_loopback(host) and self.key is None and self.peers is None:
+            raise ValueError(f"listening on {host} would let any host on the network drive the car; "
+                             "pass a shared key or the peer addresses to accept")
+        self.addr = (host, port)
+        self.timeout = timeout
+        self.max_age = max_age
+        self.clock = clock
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(self.addr)
+        self.sock.setblocking(False)
+
+        self.latest = None        # last applied Command
+        self.stop_requested = False
+        self.last_applied = None  # receive time of the last applied packet
+        self.session = None
+        self.seq = None
+        self.last_packet = None   # receive time of the last packet of the session
+        # (arrival time, arrival - sent) of the session's recent packets,
+        # increasing in both: the first is the fastest in the window
+        self._offsets = deque()
+
+        # instrumentation
+        self.packet_count = 0
+        self.applied = 0
+        self.dropped_old = 0
+        self.dropped_stale = 0
+        self.dropped_session = 0
+        self.bad = 0
+        self.rejected = 0         # from an address not in peers
+        self.last_delay = None    # arrival delay of the last applied packet past the fastest one
+        self.last_sent = None
+
+    def wait(self, timeout):
+        """Block until a packet is waiting or `timeout` seconds pass; returns True if one is."""
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        return bool(readable)
+
+    def update(self):
+        """Drain waiting packets and apply the newest valid one; returns True if one was applied."""
+        applied_any = False
+        while True:
+            try:
+                data, source = self.sock.recvfrom(64)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                print(f"[teleop] socket error: {e}", flush=True)
+                break
+            now = self.clock()
+            self.packet_count += 1
+            if self.peers is not None and source[0] not in self.peers:
+                self.rejected += 1
+                continue
+
+            with tracing.span("teleop.decode", "teleop"):
+                packet = unpack_command(data, self.key)
+            if packet is None:
+                self.bad += 1
+                continue
+            session, seq, sent, stop, command = packet
+            if session != self.session:
+                if self.session is not None and now - self.last_packet < self.timeout:
+                    # the current client is still sending (idle clients
+                    # keep sending stop packets)
+                    self.dropped_session += 1
+                    continue
+                # new client (or restarted one): start tracking afresh
+                self.session = session
+                self.seq = None
+                self._offsets.clear()
+            elif self.seq is not None and not 0 < (seq - self.seq) % SEQ_MOD < SEQ_MOD // 2:
+                self.dropped_old += 1
+                continue
+            self.last_packet = now
+
+            delay = self._delay(now, now - sent)
+            self.seq = seq
+            if delay > self.max_age:
+                self.dropped_stale += 1
+                continue
+
+            self.latest = command
+            self.stop_requested = stop
+            self.last_applied = now
+            self.last_delay = delay
+            self.last_sent = sent
+            self.applied += 1
+            applied_any = True
+        return applied_any
+
+    def _delay(self, now, offset):
+        """Delay of a packet past the fastest one of the last OFFSET_WINDOW seconds."""
+        offsets = self._offsets
+        while offsets and offsets[-1][1] >= offset:
+            offsets.pop()
+        offsets.append((now, offset))
+        while offsets[0][0] < now - OFFSET_WINDOW:
+            offsets.popleft()
+        return offset - offsets[0][1]
+
+    def get_command(self):
+        """Latest command, or None if the car should stop (timed out or stop requested)."""
+        if self.latest is None or self.stop_requested:
+            return None
+        if self.clock() - self.last_applied > self.timeout:
+            return None
+        return self.latest
+
+    def stats(self):
+        return {
+            "packets": self.packet_count,
+            "applied": self.applied,
+            "dropped_old": self.dropped_old,
+            "dropped_stale": self.dropped_stale,
+            "dropped_session": self.dropped_session,
+            "bad": self.bad,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,211 @@
+"""
+Low-overhead tracing for the control loops, exported as Chrome trace JSON.
+
+cProfile slows every Python call, so it cannot stay on while the car
+drives. Tracing here only records what the code marks: spans around sensor
+reads, actuator writes, detection decoding and control decisions, counters
+and instant events. While tracing is off, begin()/end(), counter() and
+instant() return at once and span() hands out a shared no-op context
+manager, so the cost is a function call or two (benchmarks/tracing_overhead.py
+measures it). While it is on, events go into a ring buffer preallocated at
+enable(), so a long run keeps the latest `capacity` events without growing.
+
+dump() writes the buffer in the Chrome trace event format, which
+chrome://tracing and https://ui.perfetto.dev open directly, one row per
+thread.
+
+Usage:
+    from utils import tracing
+
+    with tracing.span("grayscale.read", "sensor"):
+        values = px.get_grayscale_data()
+    tracing.counter("detections.packets", receiver.packet_count)
+
+    # cheapest form, for code that runs hundreds of times a second
+    start = tracing.begin()
+    px.forward(speed)
+    tracing.end("motor.write", start, "actuator")
+
+    @tracing.traced("control")
+    def decide(values): ...
+
+Tracing is off by default. Turn it on in code with enable() and dump(),
+or for any script with the PICARX_TRACE environment variable, which
+enables it at import and dumps to that path at exit:
+    PICARX_TRACE=/tmp/line.json python examples/05_line_following.py
+"""
+
+import atexit
+import functools
+import itertools
+import os
+import threading
+import time
+
+DEFAULT_CAPACITY = 65536
+
+_perf_ns = time.perf_counter_ns
+_get_ident = threading.get_ident
+
+_enabled = False
+_buffer = [None]
+_capacity = 1
+_index = itertools.count()
+_start_ns = 0
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _perf_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = _perf_ns()
+        _buffer[next(_index) % _capacity] = ("X", self.name, self.cat, self.start, end - self.start,
+                                            _get_ident(), self.args)
+        return False
+
+
+def span(name, cat="", args=None):
+    """Context manager timing the block as one span; args is an optional dict."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def begin():
+    """Start time for end(), 0 while tracing is off."""
+    return _perf_ns() if _enabled else 0
+
+
+def end(name, start, cat="", args=None):
+    """Record a span from begin()'s `start` to now."""
+    if not start:
+        return
+    now = _perf_ns()
+    _buffer[next(_index) % _capacity] = ("X", name, cat, start, now - start, _get_ident(), args)
+
+
+def traced(cat="", name=None):
+    """Decorator recording every call of the function as a span."""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = _perf_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = _perf_ns()
+                _buffer[next(_index) % _capacity] = ("X", span_name, cat, start, end - start,
+                                                    _get_ident(), None)
+        return wrapper
+    return decorate
+
+
+def counter(name, value):
+    """
+    Record the current value of a counter (a graph in the trace viewer);
+    value is a number or a dict of named series.
+    """
+    if not _enabled:
+        return
+    _buffer[next(_index) % _capacity] = ("C", name, "", _perf_ns(), 0, _get_ident(), value)
+
+
+def instant(name, cat="", args=None):
+    """Record a point event, e.g. a watchdog trip or a state change."""
+    if not _enabled:
+        return
+    _buffer[next(_index) % _capacity] = ("i", name, cat, _perf_ns(), 0, _get_ident(), args)
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(capacity=DEFAULT_CAPACITY):
+    """Start recording into a fresh ring buffer of `capacity` events."""
+    global _enabled, _buffer, _capacity, _index, _start_ns
+    _buffer = [None] * capacity
+    _capacity = capacity
+    _index = itertools.count()
+    _start_ns = _perf_ns()
+    _enabled = True
+
+
+def disable():
+    """Stop recording; the buffer is kept for dump()."""
+    global _enabled
+    _enabled = False
+
+
+def events():
+    """The recorded events in Chrome trace format, oldest first."""
+    pid = os.getpid()
+    records = sorted((r for r in list(_buffer) if r is not None), key=lambda r: r[3])
+    out = []
+    for ph, name, cat, start, duration, tid, args in records:
+        event = {"name": name, "ph": ph, "ts": (start - _start_ns) / 1000, "pid": pid, "tid": tid}
+        if cat:
+            event["cat"] = cat
+        if ph == "X":
+            event["dur"] = duration / 1000
+        elif ph == "C":
+            args = args if isinstance(args, dict) else {"value": args}
+        elif ph == "i":
+            event["s"] = "t"
+        if args:
+            event["args"] = args
+        out.append(event)
+
+    # thread names for the rows (threads still alive at dump time)
+    tids = {event["tid"] for event in out}
+    for thread in threading.enumerate():
+        if thread.ident in tids:
+            out.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread.ident,
+                        "args": {"name": thread.name}})
+    return out
+
+
+def dump(path):
+    """Write the buffer to `path` as Chrome trace JSON; returns the number of events."""
+    import json
+
+    trace_events = events()
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+    return len(trace_events)
+
+
+def _dump_at_exit(path):
+    count = dump(path)
+    print(f"[tracing] {count} events written to {path}", flush=True)
+
+
+if os.environ.get("PICARX_TRACE"):
+    enable(int(os.environ.get("PICARX_TRACE_CAPACITY", DEFAULT_CAPACITY)))
+    atexit.register(_dump_at_exit, os.environ["PICARX_TRACE"])
@@ -0,0 +1,239 @@
+"""
+Closed-loop steering trim and motor direction calibration.
+
+actuator_calibration.py has someone nudge the steering offset in 0.4 degree
+steps while watching the car, and flip motor directions by hand. Here the
+car calibrates itself on a straight taped line (about 60 cm), using the
+grayscale module as the drift sensor:
+
+1. Motor check: two short probes from the start of the line. Driving
+   straight, a car with one motor wired backward spins on the spot and the
+   line leaves the middle sensor within a few centimetres, on the side of
+   the reversed motor. Then, steering hard right, a car driving forward
+   sees the line on its left sensor and one driving backward (both motors
+   reversed) on its right. Reversed motors are flipped for the next runs.
+2. Trim: straight runs of RUN_TIME seconds with the current trim. The
+   distance travelled before the line reaches a side sensor gives the
+   curvature of the path, converted to the steering angle that would cause
+   it. The next trim comes from a least-squares line through all runs so
+   far (drift = slope * trim + bias), so an inexact speed or geometry only
+   costs an extra run. It stops when a full run stays on the line or the
+   trim changes by less than TOLERANCE.
+3. Both are saved through dir_servo_calibrate() and
+   motor_direction_calibrate().
+
+After every run the car backs up along its own path to the start. A speed
+difference between the motors curves the path like a steering offset does,
+and in the same proportion to speed, so the trim found also cancels it.
+
+Usage:
+    calibrator = TrimCalibrator(px)
+    result = calibrator.calibrate()
+    print(result.trim, result.converged)
+"""
+
+import math
+import time
+from collections import namedtuple
+
+from utils import tracing
+
+# Car geometry (cm)
+WHEELBASE = 9.5
+SENSOR_FORWARD = 8.0        # grayscale module ahead of the rear axle
+# Lateral offset of the car at which a side sensor starts to see the line:
+# sensor spacing (2 cm) minus half the tape width (1 cm)
+EXIT_OFFSET = 1.0
+# Approximate driving speed per percent of motor power (cm/s)
+SPEED_PER_POWER = 0.6
+
+POWER = 30
+RUN_TIME = 3.0              # seconds per trim run, about 55 cm at POWER 30
+SAMPLE_PERIOD = 0.005
+SPIN_TIME = 0.12            # a car with one reversed motor leaves the line within this
+PROBE_STEERING = 30
+PROBE_TIME = 0.5
+
+MAX_TRIM = 20               # same limit as actuator_calibration.py
+TOLERANCE = 0.1             # degrees
+MAX_RUNS = 8
+
+LEFT, MIDDLE, RIGHT = 0, 1, 2
+
+TrimResult = namedtuple("TrimResult", "trim motors_flipped runs converged")
+TrimResult.__doc__ = """\
+trim: steering calibration offset (degrees)
+motors_flipped: motors (1 left, 2 right) whose direction was reversed
+runs: (trim, drift, elapsed) per trim run, drift None if the run stayed on the line
+converged: True if the trim settled within MAX_RUNS
+"""
+
+
+def drift_angle(elapsed, speed, side):
+    """
+    Steering angle (degrees, positive right) that makes a car driving at
+    `speed` cm/s reach EXIT_OFFSET from the line after `elapsed` seconds.
+
+    side: sensor that saw the line, LEFT when the car drifted right
+    """
+    s = speed * elapsed
+    # lateral offset of the sensors on an arc of curvature k: k * (s^2/2 + SENSOR_FORWARD * s)
+    curvature = EXIT_OFFSET / (s * s / 2 + SENSOR_FORWARD * s)
+    angle = math.degrees(math.atan(curvature * WHEELBASE))
+    return angle if side == LEFT else -angle
+
+
+def fit_trim(runs):
+    """
+    Trim where the least-squares line through (trim, drift) crosses zero,
+    or None with fewer than two distinct trims.
+    """
+    points = [(trim, drift) for trim, drift, _ in runs if drift is not None]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_d = sum(d for _, d in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if var < 1e-4:
+        return None
+    slope = sum((t - mean_t) * (d - mean_d) for t, d in points) / var
+    # the drift follows the trim about one for one; a slope far from that
+    # comes from noisy runs, better stepped over with the model slope
+    if not 0.5 <= slope <= 2.0:
+        return None
+    return mean_t - mean_d / slope
+
+
+class TrimCalibrator:
+    def __init__(self, px, power=POWER, run_time=RUN_TIME, speed_per_power=SPEED_PER_POWER,
+                 max_runs=MAX_RUNS, tolerance=TOLERANCE, clock=time.monotonic, sleep=time.sleep,
+                 log=print):
+        """
+        px: Picarx standing centred on the start of a straight line, facing along it
+        power: motor power of the runs (%)
+        run_time: length of a trim run (seconds)
+        clock, sleep: time source and sleep function (swapped for a simulated clock in tests)
+        log: function taking progress messages, None for quiet
+        """
+        self.px = px
+        self.power = power
+        self.run_time = run_time
+        self.speed = power * speed_per_power
+        self.max_runs = max_runs
+        self.tolerance = tolerance
+        self.clock = clock
+        self.sleep = sleep
+        self.log = log or (lambda message: None)
+
+    def line_status(self):
+        with tracing.span("grayscale.read", "sensor"):
+            return self.px.get_line_status(self.px.get_grayscale_data())
+
+    def drive(self, steering, power, duration):
+        """
+        Drive from the start until a side sensor sees the line or `duration`
+        passes, then back up the same way to the start.
+        Returns (side, elapsed): side LEFT/RIGHT, or None if the line stayed in the middle.
+        """
+        if not self.line_status()[MIDDLE]:
+            raise RuntimeError("the car is not on the line, put it back at the start")
+        self.px.set_dir_servo_angle(steering)
+        side = None
+        start = self.clock()
+        self.px.forward(power)
+        while True:
+            self.sleep(SAMPLE_PERIOD)
+            elapsed = self.clock() - start
+            status = self.line_status()
+            if status[LEFT] or status[RIGHT]:
+                side = LEFT if status[LEFT] else RIGHT
+                break
+            if elapsed >= duration:
+                break
+        self.px.stop()
+        # retrace the path backward: same steering, same time
+        start = self.clock()
+        self.px.forward(-power)
+        self.sleep(max(0.0, elapsed - (self.clock() - start)))
+        self.px.stop()
+        self.px.set_dir_servo_angle(0)
+        self.sleep(0.2)
+        return side, elapsed
+
+    def check_motors(self):
+        """Find and fix reversed motors; returns the motors flipped."""
+        flipped = []
+        side, _ = self.drive(0, self.power, SPIN_TIME)
+        if side is not None:
+            # spinning towards the reversed motor: the line ends up on the other side
+            motor = 1 if side == RIGHT else 2
+            self._flip(motor)
+            flipped.append(motor)
+
+        side, _ = self.drive(PROBE_STEERING, self.power, PROBE_TIME)
+        if side == RIGHT:
+            # turned the wrong way: the car was driving backward
+            for motor in (1, 2):
+                self._flip(motor)
+                if motor in flipped:
+                    flipped.remove(motor)
+                else:
+                    flipped.append(motor)
+        elif side is None:
+            raise RuntimeError("no turn seen with the steering at %d degrees, check the motors"
+                               % PROBE_STEERING)
+        return sorted(flipped)
+
+    def _flip(self, motor):
+        # applied without saving, like the manual helper
+        self.px.cali_dir_value[motor - 1] = -self.px.cali_dir_value[motor - 1]
+        self.log("motor %d reversed" % motor)
+
+    def find_trim(self):
+        """Iterate straight runs until the trim settles; returns (trim, runs, converged)."""
+        trim = self.px.dir_cali_val
+        runs = []
+        for _ in range(self.max_runs):
+            # set the offset without saving it, like the manual helper
+            self.px.dir_cali_val = trim
+            side, elapsed = self.drive(0, self.power, self.run_time)
+            if side is None:
+                runs.append((trim, None, elapsed))
+                self.log("trim %+.2f: on the line for %.1f s" % (trim, elapsed))
+                return trim, runs, True
+            drift = drift_angle(elapsed, self.speed, side)
+            tracing.counter("trim", {"trim": trim, "drift": drift})
+            runs.append((trim, drift, elapsed))
+            self.log("trim %+.2f: drifted %s after %.2f s, like %+.2f degrees of steering"
+                     % (trim, "right" if side == LEFT else "left", elapsed, drift))
+
+            fitted = fit_trim(runs)
+            new_trim = fitted if fitted is not None else trim - drift
+            new_trim = round(max(-MAX_TRIM, min(MAX_TRIM, new_trim)), 2)
+            if abs(new_trim - trim) < self.tolerance:
+                # stuck at the limit: the drift is more than the trim can cancel
+                return new_trim, runs, abs(new_trim) < MAX_TRIM
+            trim = new_trim
+        return trim, runs, False
+
+    def calibrate(self, save=True):
+        """Check the motors, find the trim and (if save) store both; returns a TrimResult."""
+        old_trim = self.px.dir_cali_val
+        old_directions = list(self.px.cali_dir_value)
+        try:
+            flipped = self.check_motors()
+            trim, runs, converged = self.find_trim()
+        except BaseException:
+            # off the line or stopped: leave the car as it was
+            self.px.dir_cali_val = old_trim
+            self.px.cali_dir_value[:] = old_directions
+            raise
+        if save and converged:
+            self.px.dir_servo_calibrate(trim)
+            for motor in flipped:
+                self.px.motor_direction_calibrate(motor, self.px.cali_dir_value[motor - 1])
+        else:
+            self.px.dir_cali_val = old_trim
+            self.px.cali_dir_value[:] = old_directions
+        return TrimResult(trim, flipped, runs, converged)
@@ -0,0 +1,196 @@
+"""
+Pre-rendered text-to-speech for announcements.
+
+robot_hat's TTS.say() runs the speech synthesizer on every call and blocks
+until the phrase has been spoken, several hundred milliseconds of
+synthesis on the Pi before the first sound. The taxi repeats a small set
+of phrases, so TTSCache renders each phrase once to a WAV file, keyed by
+engine, text, language and voice settings, and plays it through the
+sound bank mixer:
+
+- prewarm() renders (or finds on disk) a list of phrases at startup and
+  decodes them into the sound bank, so saying them is just a mixer trigger
+- say() never blocks: an uncached phrase is rendered on a worker thread
+  and played when ready
+- the cache folder is kept under max_bytes by deleting the least recently
+  used files; a file's mtime is its last use, including plays from the bank
+
+Engines: pico2wave (as robot_hat uses, languages like "en-US") or espeak
+(voices like "en-us", with amplitude/speed/gap/pitch settings).
+
+Usage:
+    bank = SoundBank("sound")
+    mixer = Mixer(bank, AplaySink())
+    mixer.start()
+    tts = TTSCache(mixer, lang="en-US")
+    tts.prewarm(["Hello ducks, I am your autonomous taxi!"])
+    tts.say("Hello ducks, I am your autonomous taxi!")
+"""
+
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "picarx-tts"
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+ESPEAK_DEFAULTS = {"amp": 100, "speed": 175, "gap": 5, "pitch": 50}
+
+
+class TTSCache:
+    def __init__(self, mixer, cache_dir=CACHE_DIR, engine="pico2wave", lang="en-US",
+                 settings=None, max_bytes=MAX_CACHE_BYTES, volume=1.0):
+        """
+        mixer: sound_bank.Mixer to play through; rendered phrases are
+            decoded into its bank
+        engine: "pico2wave" or "espeak"
+        lang: language (pico2wave) or voice (espeak)
+        settings: espeak voice settings, see ESPEAK_DEFAULTS
+        max_bytes: size limit of the cache folder
+        """
+        if engine not in ("pico2wave", "espeak"):
+            raise ValueError(f"unknown TTS engine {engine!r}")
+        self.mixer = mixer
+        self.bank = mixer.bank
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = engine
+        self.lang = lang
+        self.settings = dict(ESPEAK_DEFAULTS, **(settings or {})) if engine == "espeak" else {}
+        self.max_bytes = max_bytes
+        self.volume = volume
+
+        # held from rendering a phrase until it is in the bank, so another
+        # render cannot evict the file in between
+        self._lock = threading.RLock()
+        self._queue = queue.Queue()
+        self._thread = None
+
+        # instrumentation
+        self.hits = 0
+        self.misses = 0
+        self.render_time = 0.0
+        self.evictions = 0
+
+    def key(self, text):
+        """Cache key of a phrase with the current engine and voice settings."""
+        spec = json.dumps([self.engine, text, self.lang, self.settings], sort_keys=True)
+        return "tts-" + hashlib.sha1(spec.encode('utf-8')).hexdigest()[:16]
+
+    def path(self, text):
+        return self.cache_dir / (self.key(text) + ".wav")
+
+    def _command(self, text, path):
+        if self.engine == "pico2wave":
+            return ["pico2wave", "-l", self.lang, "-w", str(path), text]
+        s = self.settings
+        return ["espeak", "-v", self.lang, "-a", str(s["amp"]), "-s", str(s["speed"]),
+                "-g", str(s["gap"]), "-p", str(s["pitch"]), "-w", str(path), text]
+
+    def render(self, text):
+        """Path of the phrase's WAV file, synthesized if not cached."""
+        path = self.path(text)
+        with self._lock:
+            if path.exists():
+                self.hits += 1
+                # mtime marks the last use for eviction
+                os.utime(path)
+                return path
+            self.misses += 1
+            start = time.perf_counter()
+            # pico2wave needs a .wav extension on its output file
+            tmp_path = path.with_name(path.stem + ".tmp.wav")
+            subprocess.run(self._command(text, tmp_path), check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            os.replace(tmp_path, path)
+            self.render_time += time.perf_counter() - start
+            self.evict(keep=path)
+        return path
+
+    def load(self, text):
+        """Render the phrase if needed and decode it into the bank; returns its clip name."""
+        name = self.key(text)
+        with self._lock:
+            if name not in self.bank:
+                self.bank.load(self.render(text), name)
+        return name
+
+    def prewarm(self, phrases):
+        """
+        Render and decode a list of phrases, so say() plays them at once.
+        A phrase that cannot be rendered (no TTS engine installed, engine
+        error) is reported and skipped; say() will try it again.
+        """
+        for text in phrases:
+            try:
+                self.load(text)
+            except (OSError, ValueError, subprocess.CalledProcessError) as e:
+                print(f"[tts] could not render {text!r}: {e}", flush=True)
+
+    def say(self, text):
+        """Speak a phrase without blocking; uncached phrases play once rendered."""
+        name = self.key(text)
+        if name in self.bank:
+            self.hits += 1
+            self.mixer.play(name, volume=self.volume)
+            # a play from the bank is a use too, or the most spoken
+            # phrases would be the first evicted
+            try:
+                os.utime(self.cache_dir / (name + ".wav"))
+            except OSError:
+                pass
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(text)
+
+    def _run(self):
+        while True:
+            text = self._queue.get()
+            try:
+                self.mixer.play(self.load(text), volume=self.volume)
+            except (OSError, ValueError, subprocess.CalledProcessError) as e:
+                print(f"[tts] could not say {text!r}: {e}", flush=True)
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used files until the folder fits in max_bytes;
+        keep: a file never deleted (the one just rendered), even if it alone
+        is over the limit.
+        """
+        files = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.wav') and entry.is_file():
+                    st = entry.stat()
+                    files.append((st.st_mtime_ns, st.st_size, entry.path, entry.name))
+                    total += st.st_size
+        files.sort()
+        keep = os.fspath(keep) if keep is not None else None
+        for _, size, path, name in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.bank.discard(name[:-len('.wav')])
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "render_time": self.render_time,
+            "evictions": self.evictions,
+        }
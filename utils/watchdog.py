@@ -0,0 +1,114 @@
+"""
+Deadline watchdog that stops the motors when the control loop stalls.
+
+The control loop calls feed() once per tick. If no feed arrives within the
+deadline (a blocking read, a long GC pause, an exception that kills the
+loop), the watchdog thread stops the motors. The watchdog sleeps until the
+exact deadline rather than polling, so the stop follows the missed deadline
+by roughly one scheduler wake-up plus the time of the stop command.
+
+Note that the watchdog is a Python thread: a stall that holds the GIL
+(a long pure-Python or C computation) delays it too, a blocking read or
+sleep does not.
+
+Usage:
+    watchdog = MotorWatchdog(px, deadline=0.25)
+    watchdog.start()
+    while True:
+        watchdog.feed()
+        ...
+"""
+
+import threading
+import time
+
+from utils import tracing
+
+
+class MotorWatchdog:
+    def __init__(self, px, deadline=0.25, stop=None, max_sleep=0.5):
+        """
+        px: Picarx to stop; when the control loop writes through a
+            CoalescingPicarx, pass that, so the stop and the loop's writes
+            are serialized by its bus lock
+        deadline: longest allowed time between feeds (seconds)
+        stop: function that stops the motors (default px.stop)
+        max_sleep: longest single wait, bounds how long stop() takes to join
+        """
+        self.px = px
+        self.deadline = deadline
+        self.stop_motors = stop if stop is not None else px.stop
+        self.max_sleep = max_sleep
+
+        self.last_feed = time.monotonic()
+        self.tripped = False
+        self._running = False
+        self._wake = threading.Event()
+        self._thread = None
+
+        # instrumentation
+        self.feeds = 0
+        self.trips = 0
+        self.last_stop_latency = None
+        self.max_stop_latency = 0.0
+        self.max_feed_interval = 0.0
+
+    def start(self):
+        self.last_feed = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def feed(self):
+        """Signal that the control loop is alive; re-arms after a trip."""
+        now = time.monotonic()
+        interval = now - self.last_feed
+        if interval > self.max_feed_interval:
+            self.max_feed_interval = interval
+        self.last_feed = now
+        self.feeds += 1
+        self.tripped = False
+
+    def _run(self):
+        while self._running:
+            due = self.last_feed + self.deadline
+            remaining = due - time.monotonic()
+            if remaining > 0:
+                self._wake.wait(min(remaining, self.max_sleep))
+                continue
+            if self.tripped:
+                # already stopped, wait for the loop to feed again
+                self._wake.wait(min(self.deadline, self.max_sleep))
+                continue
+            self._trip(due)
+
+    def _trip(self, due):
+        self.tripped = True
+        tracing.instant("watchdog.trip", "safety")
+        try:
+            self.stop_motors()
+        except Exception as e:
+            print(f"[watchdog] stop failed: {e}", flush=True)
+        # time from the missed deadline until the stop command completed
+        latency = time.monotonic() - due
+        self.trips += 1
+        self.last_stop_latency = latency
+        if latency > self.max_stop_latency:
+            self.max_stop_latency = latency
+        print(f"[watchdog] control loop missed its {self.deadline * 1000:.0f} ms deadline, "
+              f"motors stopped {latency * 1000:.1f} ms later", flush=True)
+
+    def stats(self):
+        return {
+            "feeds": self.feeds,
+            "trips": self.trips,
+            "last_stop_latency": self.last_stop_latency,
+            "max_stop_latency": self.max_stop_latency,
+            "max_feed_interval": self.max_feed_interval,
+        }
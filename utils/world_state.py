@@ -0,0 +1,168 @@
+"""
+World-state aggregator for the PiCar-X.
+
+Combines the latest grayscale reading, a filtered ultrasonic range and the
+latest DetectionReceiver frame into one timestamped, immutable snapshot.
+Sensors are polled in the background and a new snapshot is published at a
+fixed rate, so decision logic makes a single cheap read per tick.
+Grayscale reads share the I2C bus with the control loop's actuator writes
+and hold the bus lock of the CoalescingPicarx they go through:
+
+    world = WorldStateAggregator(px, DetectionReceiver())
+    world.start()
+    while True:
+        state = world.get()
+        if state.distance is not None and state.distance < 20:
+            ...
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+
+from utils import metrics, tracing
+
+# All times are time.monotonic() except detections, which carry the
+# sender's time.time() stamp; ages are in seconds at publish time and are
+# None until the input has produced a value.
+WorldState = namedtuple("WorldState", [
+    "timestamp",        # when this snapshot was published
+    "seq",              # increases by one per snapshot
+    "grayscale",        # [left, middle, right] raw values
+    "line_status",      # px.get_line_status() of those values
+    "distance",         # median-filtered ultrasonic range (cm)
+    "detections",       # latest detection message, None if stale/missing
+    "grayscale_age",
+    "distance_age",
+    "detections_age",
+])
+
+
+class WorldStateAggregator:
+    def __init__(self, px, receiver=None, rate=50, distance_window=5, bus_lock=None):
+        """
+        px: Picarx instance to read grayscale and ultrasonic from
+        receiver: optional DetectionReceiver
+        rate: snapshots published per second
+        distance_window: number of valid ultrasonic readings in the median
+        bus_lock: lock held for I2C reads, default the bus_lock of a
+            CoalescingPicarx px (a lock of its own otherwise)
+        """
+        self.px = px
+        if bus_lock is None:
+            bus_lock = getattr(px, "bus_lock", None) or threading.RLock()
+        self.bus_lock = bus_lock
+        self.receiver = receiver
+        self.period = 1.0 / rate
+
+        self._distances = deque(maxlen=distance_window)
+        self._distance = None
+        self._distance_time = None
+        self._grayscale = None
+        self._line_status = None
+        self._grayscale_time = None
+
+        self._snapshot = WorldState(time.monotonic(), 0, None, None, None, None, None, None, None)
+        self._running = False
+        self._threads = []
+
+        self.overruns = 0
+
+        self.loop_metrics = metrics.LoopTimer("world_state")
+        self.grayscale_metric = metrics.histogram("picarx_sensor_read_seconds", "Sensor read time",
+                                                  {"sensor": "grayscale"})
+        self.ultrasonic_metric = metrics.histogram("picarx_sensor_read_seconds", "Sensor read time",
+                                                   {"sensor": "ultrasonic"})
+        self.overrun_metric = metrics.counter("picarx_world_state_overruns_total",
+                                              "Snapshots published late")
+
+    def start(self):
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._ultrasonic_loop, daemon=True),
+            threading.Thread(target=self._publish_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def get(self):
+        """Return the latest snapshot; never blocks."""
+        return self._snapshot
+
+    # background threads
+    # ==========================================
+    def _ultrasonic_loop(self):
+        # the echo read blocks for up to tens of ms, so it gets its own
+        # thread. The sensor is on GPIO pins, not the I2C bus, and only this
+        # thread reads it, so it does not take the bus lock: holding it for
+        # the echo would delay the control loop's writes and watchdog stops.
+        while self._running:
+            try:
+                with tracing.span("ultrasonic.read", "sensor"), self.ultrasonic_metric.time():
+                    distance = self.px.ultrasonic.read()
+            except Exception as e:
+                print(f"[world_state] ultrasonic error: {e}", flush=True)
+                time.sleep(0.1)
+                continue
+            if distance >= 0:
+                self._distances.append(distance)
+                self._distance = sorted(self._distances)[len(self._distances) // 2]
+                self._distance_time = time.monotonic()
+            time.sleep(0.005)
+
+    def _publish_loop(self):
+        next_time = time.monotonic()
+        while self._running:
+            self.loop_metrics.tick()
+            try:
+                with tracing.span("world.publish", "world"):
+                    self._publish()
+            except Exception as e:
+                print(f"[world_state] publish error: {e}", flush=True)
+
+            next_time += self.period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # fell behind, skip the missed slots instead of bursting
+                self.overruns += 1
+                self.overrun_metric.inc()
+                tracing.instant("world.overrun", "world")
+                next_time = time.monotonic()
+
+    def _publish(self):
+        with self.bus_lock, tracing.span("grayscale.read", "sensor"), self.grayscale_metric.time():
+            grayscale = self.px.get_grayscale_data()
+        self._grayscale = grayscale
+        self._line_status = self.px.get_line_status(grayscale)
+        self._grayscale_time = time.monotonic()
+
+        detections = None
+        detections_age = None
+        if self.receiver is not None:
+            self.receiver.update()
+            latest = self.receiver.latest
+            if latest is not None:
+                detections_age = time.time() - latest["timestamp"]
+                self.receiver.observe_age(detections_age)
+                if detections_age <= self.receiver.stale_after:
+                    detections = latest
+
+        now = time.monotonic()
+        self._snapshot = WorldState(
+            timestamp=now,
+            seq=self._snapshot.seq + 1,
+            grayscale=self._grayscale,
+            line_status=self._line_status,
+            distance=self._distance,
+            detections=detections,
+            grayscale_age=now - self._grayscale_time,
+            distance_age=None if self._distance_time is None else now - self._distance_time,
+            detections_age=detections_age,
+        )